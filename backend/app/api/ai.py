@@ -1,108 +1,438 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, confloat, conint, conlist, validator
 from typing import List, Dict, Any, Optional
+from app.services import ai_service
+from app.services.data_processor import (
+    company_exists,
+    data_stamp,
+    ensure_store_version,
+    get_store,
+    list_companies,
+)
+from app.services.backtesting import backtest_company
+from app.services.executor import run_cpu
+from app.services.forecasting import DEFAULT_SEED
+from app.services.model_zoo import MODELS
+from app.services.scenarios import PERCENTILES, run_scenario
+from app.utils.config import (
+    DEFAULT_COMPANY,
+    FORECAST_MAX_YEARS,
+    SCENARIO_MAX_METRICS,
+    SCENARIO_MAX_PATHS,
+    SCENARIO_MAX_PERCENTILES,
+    SCENARIO_MAX_YEARS,
+)
+from app.utils.http_cache import cached_response_async
 
 router = APIRouter()
 
 
+# Years ahead a forecast may be requested for
+ForecastYears = conint(ge=1, le=FORECAST_MAX_YEARS)
+
+
 class ForecastRequest(BaseModel):
     metric: str
-    years: int
+    years: ForecastYears
+    seed: Optional[int] = DEFAULT_SEED
+    company: str = DEFAULT_COMPANY
+
+
+class BatchForecastRequest(BaseModel):
+    metrics: List[str]
+    years: ForecastYears = 5
+    horizons: Optional[conlist(ForecastYears, min_items=1)] = None
+    seed: Optional[int] = DEFAULT_SEED
+    company: str = DEFAULT_COMPANY
 
 
 class InsightRequest(BaseModel):
     metric: str
+    company: str = DEFAULT_COMPANY
 
 
-# Sample forecast data
-def generate_forecast_data(metric: str, years: int) -> List[Dict[str, Any]]:
-    """
-    Generate sample forecast data for a given metric and number of years.
+class BatchInsightRequest(BaseModel):
+    metrics: Optional[List[str]] = None
+    companies: Optional[List[str]] = None
 
-    Args:
-        metric (str): The metric to forecast (revenue, profit, etc.)
-        years (int): The number of years to forecast
 
-    Returns:
-        list: Forecast data for the specified metric and years
-    """
-    # Base values for different metrics
-    base_values = {
-        "revenue": 2500000,
-        "profit": 800000,
-        "profitMargin": 32.0,
-        "eps": 8.0,
-        "netAssets": 7500000,
-    }
+class BacktestRequest(BaseModel):
+    metrics: Optional[List[str]] = None
+    company: str = DEFAULT_COMPANY
+    models: Optional[List[str]] = None
+    folds: conint(ge=1, le=10) = 3
+    horizon: conint(ge=1, le=10) = 3
+
+
+class ScenarioRequest(BaseModel):
+    metrics: conlist(str, min_items=1, max_items=SCENARIO_MAX_METRICS) = [
+        "revenue",
+        "net_profit",
+    ]
+    company: str = DEFAULT_COMPANY
+    years: conint(ge=1, le=SCENARIO_MAX_YEARS) = 5
+    paths: conint(ge=1, le=SCENARIO_MAX_PATHS) = 10000
+    growth_shock: confloat(gt=-100) = 0.0
+    margin_shock: float = 0.0
+    volatility: confloat(ge=0) = 1.0
+    percentiles: conlist(
+        confloat(ge=0, le=100), min_items=1, max_items=SCENARIO_MAX_PERCENTILES
+    ) = list(PERCENTILES)
+    seed: Optional[int] = DEFAULT_SEED
+
+    @validator("metrics")
+    def unique_metrics(cls, metrics: List[str]) -> List[str]:
+        # Each metric is simulated once, however often it is listed
+        return list(dict.fromkeys(metrics))
+
+
+def _check_company(company: str) -> None:
+    if not company_exists(company):
+        raise HTTPException(status_code=404, detail=f"Unknown company: {company}")
+
+
+def _check_metrics(metrics: List[str], company: str) -> None:
+    columns = get_store(company).columns
+    unknown = [metric for metric in metrics if metric not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}"
+        )
+
+
+def _forecast_version(company: str) -> tuple:
+    """Identify the data and trained models a forecast response depends on."""
+    return get_store(company).version, ai_service.registry_source()
+
+
+# The payload functions below run in the worker process pool, so they take
+# plain arguments and the data version the request was keyed on.
+
 
-    # Growth rates for different metrics
-    growth_rates = {
-        "revenue": 0.15,
-        "profit": 0.12,
-        "profitMargin": 0.02,
-        "eps": 0.12,
-        "netAssets": 0.08,
+def _ensure_forecast_version(version: tuple, company: str):
+    store = ensure_store_version(version[0], company)
+    ai_service.ensure_registry(*version[1])
+    return store
+
+
+def _forecast_payload(
+    company: str, metric: str, years: int, seed: Optional[int], version: tuple
+) -> Dict[str, Any]:
+    _ensure_forecast_version(version, company)
+    return {"forecast": ai_service.generate_forecast(metric, years, seed, company)}
+
+
+def _batch_forecast_payload(
+    company: str,
+    metrics: List[str],
+    horizons: List[int],
+    seed: Optional[int],
+    version: tuple,
+) -> Dict[str, Any]:
+    _ensure_forecast_version(version, company)
+    return {
+        "forecasts": ai_service.generate_forecasts(metrics, horizons, seed, company)
     }
 
-    # Generate forecast data
-    forecast_data = []
-    base_value = base_values.get(metric, 1000000)
-    growth_rate = growth_rates.get(metric, 0.1)
 
-    for i in range(1, years + 1):
-        year = 2024 + i
-        value = base_value * (1 + growth_rate) ** i
+def _backtest_payload(
+    company: str,
+    metrics: Optional[List[str]],
+    models: Optional[List[str]],
+    folds: int,
+    horizon: int,
+    version: str,
+) -> Dict[str, Any]:
+    ensure_store_version(version, company)
+    return {
+        "company": company,
+        "folds": folds,
+        "horizon": horizon,
+        "metrics": backtest_company(company, metrics, folds, horizon, models),
+    }
+
 
-        # Format the value based on the metric
-        if metric in ["revenue", "profit", "netAssets"]:
-            formatted_value = round(value, 2)
-        elif metric == "profitMargin":
-            formatted_value = round(value, 1)
-        else:
-            formatted_value = round(value, 2)
+def _scenario_payload(request: ScenarioRequest, version: str) -> Dict[str, Any]:
+    ensure_store_version(version, request.company)
+    return run_scenario(
+        request.metrics,
+        request.years,
+        request.paths,
+        request.growth_shock,
+        request.margin_shock,
+        request.volatility,
+        tuple(request.percentiles),
+        request.seed,
+        request.company,
+    )
 
-        forecast_data.append({"year": year, "value": formatted_value})
 
-    return forecast_data
+def _insight_payload(company: str, metric: str, version: str) -> Dict[str, Any]:
+    ensure_store_version(version, company)
+    return {"insight": ai_service.generate_insight(metric, company)}
 
 
-# Sample insights
-INSIGHTS = {
-    "revenue": "Revenue has shown consistent growth over the past 5 years, with an average annual growth rate of 20%. This indicates strong market demand and effective business strategies.",
-    "profit": "Profit margins have improved significantly, showing a 12% increase from 2019 to 2024. This suggests improved operational efficiency and cost management.",
-    "profitMargin": "The profit margin has stabilized around 32% in recent years, indicating a healthy balance between revenue growth and cost control.",
-    "eps": "Earnings per share have doubled from 2019 to 2024, reflecting strong profitability and effective capital allocation.",
-    "netAssets": "Net assets have grown steadily, showing a 50% increase over the 5-year period. This indicates strong financial health and investment in long-term growth.",
-}
+def _batch_insight_payload(
+    companies: List[str], metrics: Optional[List[str]]
+) -> Dict[str, Any]:
+    return {"companies": ai_service.generate_insights(companies, metrics)}
 
 
 @router.post("/forecast")
-async def generate_forecast(request: ForecastRequest):
+async def generate_forecast(
+    request: ForecastRequest, http_request: Request
+) -> Response:
     """
     Generate a forecast for a specific metric.
 
     Args:
-        request (ForecastRequest): The forecast request containing the metric and number of years
+        request (ForecastRequest): The forecast request containing the metric and number of years,
+            and the company (the default company when omitted)
 
     Returns:
         dict: Forecast data for the specified metric
     """
-    forecast_data = generate_forecast_data(request.metric, request.years)
-    return {"forecast": forecast_data}
+    _check_company(request.company)
+    _check_metrics([request.metric], request.company)
+    version = _forecast_version(request.company)
+    key = (
+        "forecast",
+        request.company,
+        version,
+        request.metric,
+        request.years,
+        request.seed,
+    )
+    return await cached_response_async(
+        http_request,
+        key,
+        lambda: run_cpu(
+            _forecast_payload,
+            request.company,
+            request.metric,
+            request.years,
+            request.seed,
+            version,
+        ),
+    )
+
+
+@router.post("/forecast/batch")
+async def generate_batch_forecast(
+    request: BatchForecastRequest, http_request: Request
+) -> Response:
+    """
+    Generate forecasts for several metrics and horizons in one call.
+
+    Args:
+        request (BatchForecastRequest): The metrics to forecast, either the
+            number of years or the explicit horizons (years ahead) to forecast,
+            and the company (the default company when omitted)
+
+    Returns:
+        dict: Forecast data for each requested metric
+    """
+    _check_company(request.company)
+    _check_metrics(request.metrics, request.company)
+    horizons = request.horizons or list(range(1, request.years + 1))
+    if not request.metrics:
+        raise HTTPException(status_code=400, detail="At least one metric is required")
+
+    version = _forecast_version(request.company)
+    key = (
+        "forecast/batch",
+        request.company,
+        version,
+        tuple(request.metrics),
+        tuple(horizons),
+        request.seed,
+    )
+    return await cached_response_async(
+        http_request,
+        key,
+        lambda: run_cpu(
+            _batch_forecast_payload,
+            request.company,
+            request.metrics,
+            horizons,
+            request.seed,
+            version,
+        ),
+    )
 
 
 @router.post("/insights")
-async def generate_insight(request: InsightRequest):
+async def generate_insight(request: InsightRequest, http_request: Request) -> Response:
     """
     Generate an insight for a specific metric.
 
     Args:
-        request (InsightRequest): The insight request containing the metric
+        request (InsightRequest): The insight request containing the metric,
+            and the company (the default company when omitted)
 
     Returns:
         dict: Insight for the specified metric
     """
-    insight = INSIGHTS.get(
-        request.metric, "No specific insight available for this metric."
+    _check_company(request.company)
+    _check_metrics([request.metric], request.company)
+    version = get_store(request.company).version
+    key = ("insight", request.company, version, request.metric)
+    return await cached_response_async(
+        http_request,
+        key,
+        lambda: run_cpu(_insight_payload, request.company, request.metric, version),
+    )
+
+
+@router.post("/insights/batch")
+async def generate_batch_insights(
+    request: BatchInsightRequest, http_request: Request
+) -> Response:
+    """
+    Generate statistics and insights for several metrics and companies.
+
+    The statistics of every metric of every requested company are computed
+    in one pass; the text of each requested metric is rendered from them.
+
+    Args:
+        request (BatchInsightRequest): The metrics and companies to describe;
+            every metric of every company when omitted
+
+    Returns:
+        dict: Per company, the statistics and insight of each metric
+    """
+    companies = request.companies or list_companies()
+    missing = [company for company in companies if not company_exists(company)]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown companies: {', '.join(missing)}"
+        )
+
+    # Keyed by file stamps, like the statistics tables, so that serving a
+    # cached response does not load every company's store
+    metrics = tuple(request.metrics) if request.metrics is not None else None
+    stamps = tuple((company, data_stamp(company)) for company in companies)
+    try:
+        return await cached_response_async(
+            http_request,
+            ("insights/batch", stamps, metrics),
+            lambda: run_cpu(_batch_insight_payload, companies, request.metrics),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/models")
+async def get_models() -> Dict[str, Any]:
+    """
+    List the forecasting models and the model the registry chose per metric.
+
+    Returns:
+        dict: Every model in the model zoo, and for the loaded registry its
+        training time and each metric's chosen model and backtest scores
+    """
+    registry = ai_service.get_model_registry()
+    trained = None
+    if registry is not None:
+        trained = {
+            "version": registry["version"],
+            "trained_at": registry["trained_at"],
+            "data_version": registry["data_version"],
+            "current": registry["data_version"] == get_store().version,
+            "metrics": {
+                metric: {
+                    "model": model["kind"],
+                    "evaluation": model["evaluation"],
+                    "backtest": model["backtest"],
+                }
+                for metric, model in registry["models"].items()
+            },
+        }
+    return {
+        "models": [
+            {"name": model.name, "description": model.description}
+            for model in MODELS.values()
+        ],
+        "registry": trained,
+    }
+
+
+@router.post("/backtest")
+async def run_backtest(request: BacktestRequest, http_request: Request) -> Response:
+    """
+    Backtest forecasting models on a company's metrics.
+
+    Each of the last ``folds`` years is used as a forecast origin, predicting
+    up to ``horizon`` years ahead; the model with the lowest RMSE is
+    reported as the best for each metric.
+
+    Args:
+        request (BacktestRequest): The metrics, company, candidate models,
+            folds and horizon; every advertised metric and model by default
+
+    Returns:
+        dict: Per metric, the best model and the MAE, RMSE and MAPE of each
+    """
+    _check_company(request.company)
+    store = get_store(request.company)
+    unknown = [m for m in request.metrics or [] if m not in store.columns]
+    unknown += [m for m in request.models or [] if m not in MODELS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown metrics or models: {', '.join(unknown)}"
+        )
+
+    metrics = tuple(request.metrics) if request.metrics is not None else None
+    models = tuple(request.models) if request.models is not None else None
+    key = (
+        "backtest",
+        request.company,
+        store.version,
+        metrics,
+        models,
+        request.folds,
+        request.horizon,
+    )
+    return await cached_response_async(
+        http_request,
+        key,
+        lambda: run_cpu(
+            _backtest_payload,
+            request.company,
+            request.metrics,
+            request.models,
+            request.folds,
+            request.horizon,
+            store.version,
+        ),
+    )
+
+
+@router.post("/scenario")
+async def simulate_scenario(
+    request: ScenarioRequest, http_request: Request
+) -> Response:
+    """
+    Simulate forecast paths of metrics under a growth and margin scenario.
+
+    Each metric is simulated ``paths`` times from its annual history; the
+    response holds percentile fan bands of the simulated values per year.
+
+    Args:
+        request (ScenarioRequest): The metrics and company, the number of
+            years and paths, the growth and margin shocks in percentage
+            points, a volatility multiplier, the percentiles and the seed
+
+    Returns:
+        dict: Per metric, its last value, how it was simulated and the bands
+    """
+    _check_company(request.company)
+    _check_metrics(request.metrics, request.company)
+    store = get_store(request.company)
+
+    key = ("scenario", store.version, request.json())
+    return await cached_response_async(
+        http_request,
+        key,
+        lambda: run_cpu(_scenario_payload, request, store.version),
     )
-    return {"insight": insight}
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from app.services.events import BROADCASTER, current_versions
+from app.utils.http_cache import serialize
+
+router = APIRouter()
+
+# Milliseconds browsers wait before reconnecting a dropped session
+RECONNECT_DELAY_MS = 3000
+
+
+def _versions_frame() -> bytes:
+    versions = serialize(current_versions())
+    return b"retry: %d\nevent: versions\ndata: %s\n\n" % (RECONNECT_DELAY_MS, versions)
+
+
+async def _session(last_event_id: Optional[int]) -> AsyncIterator[bytes]:
+    # The snapshot is taken once subscribed, so no change can fall between
+    # the two; a change it already includes is at worst refetched
+    async for frame in BROADCASTER.stream(last_event_id, _versions_frame):
+        yield frame
+
+
+@router.get("/")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """
+    Stream data and model changes as server-sent events.
+
+    The first event, "versions", holds the current version of every loaded
+    company's data, of the shareholder data and of the trained models.
+    After that a "financial" event (with the periods and metrics that
+    changed), "shareholders" or "models" event is sent whenever one of
+    them changes, so clients refetch only what changed instead of polling.
+    A "resync" event means events were missed and everything should be
+    refetched. Browsers' EventSource reconnects by itself, sending the id
+    of the last event it saw; the events it missed are sent again.
+    """
+    try:
+        last_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_id = None
+    return StreamingResponse(
+        _session(last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,116 +1,330 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-from app.services.data_processor import get_financial_data, get_financial_data_range
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
+from app.models.financial import FinancialRecord
+from app.services.data_processor import (
+    METRIC_CATEGORIES,
+    company_exists,
+    get_store,
+    get_financial_data,
+    get_financial_data_range,
+    iter_financial_data_range,
+    list_companies,
+)
+from app.services.screening import screen_companies
+from app.utils.config import DEFAULT_COMPANY
+from app.utils.export import EXPORT_MEDIA_TYPES, export_chunks
+from app.utils.http_cache import cached_response
 
 router = APIRouter()
 
 
-@router.get("/{year}")
-async def get_year_data(year: int) -> Dict[str, Any]:
+def check_company(company: str) -> str:
     """
-    Get financial data for a specific year.
+    Validate a company path or query parameter.
+
+    Raises:
+        HTTPException: 404 if the company has no data.
+    """
+    if not company_exists(company):
+        raise HTTPException(status_code=404, detail=f"Unknown company: {company}")
+    return company
+
+
+def parse_metrics(
+    metrics: Optional[str], company: str = DEFAULT_COMPANY
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ``metrics`` query parameter.
+
+    Args:
+        metrics (str, optional): Comma-separated metric names.
+        company (str): The company whose store the metrics must exist in.
+
+    Returns:
+        list: The requested metrics, or None for all metrics.
+
+    Raises:
+        HTTPException: 400 if a metric is not in the store.
+    """
+    if not metrics:
+        return None
+    names = list(dict.fromkeys(m.strip() for m in metrics.split(",") if m.strip()))
+    columns = get_store(company).columns
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}"
+        )
+    return names or None
+
+
+@router.get("/metrics")
+async def get_available_metrics(request: Request) -> Response:
+    """
+    Get list of available financial metrics grouped by category.
+    """
+    return cached_response(request, ("metrics",), lambda: METRIC_CATEGORIES)
+
+
+@router.get("/companies")
+async def get_companies() -> Dict[str, Any]:
+    """
+    Get the companies with financial data and the default company.
+    """
+    return {"companies": list_companies(), "default": DEFAULT_COMPANY}
+
+
+@router.get("/screen")
+async def screen(
+    year: int,
+    where: List[str] = Query([], description='Filters such as "debt_to_equity<1"'),
+    sort: Optional[str] = None,
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=1000),
+) -> Dict[str, Any]:
+    """
+    Screen every company's annual metrics for a year.
+
+    Companies matching all ``where`` filters are ranked by ``sort`` and the
+    first ``limit`` returned, e.g. the top 20 by return_on_equity where
+    debt_to_equity<1. The screen runs in a worker thread, as building a
+    year's panel reads every company's files.
     """
     try:
-        data = get_financial_data(year)
-        if not data:
-            raise HTTPException(
-                status_code=404, detail=f"No data found for year {year}"
-            )
-        return data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return await run_in_threadpool(
+            screen_companies, year, where, sort, order == "desc", limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/range/{start_year}/{end_year}")
-async def get_year_range_data(start_year: int, end_year: int) -> List[Dict[str, Any]]:
+def stream_range(
+    start_year: int,
+    end_year: int,
+    metrics: Optional[List[str]],
+    granularity: str,
+    format: str,
+    company: str = DEFAULT_COMPANY,
+    filename: Optional[str] = None,
+) -> StreamingResponse:
     """
-    Get financial data for a range of years.
+    Stream a range of financial data as NDJSON or CSV.
+
+    Records are generated one chunk of years at a time, so the first bytes
+    are sent immediately and memory use does not grow with the range.
+
+    Raises:
+        HTTPException: 404 if the range holds no data.
+    """
+    store = get_store(company)
+    rows = store.year_slice(start_year, end_year)
+    if rows.stop == rows.start:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data found for years {start_year} to {end_year}",
+        )
+    index = ["year"] if granularity == "year" else ["year", "quarter"]
+    fieldnames = index + (metrics or store.metrics)
+    chunks = iter_financial_data_range(
+        start_year, end_year, metrics, granularity, company
+    )
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    return StreamingResponse(
+        export_chunks(chunks, format, fieldnames),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@router.get("/export")
+async def export_financial_data(
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics"),
+    granularity: str = Query("quarter", regex="^(quarter|year)$"),
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    company: str = Query(DEFAULT_COMPANY),
+) -> StreamingResponse:
     """
+    Stream a company's whole financial history, or a range of it, as NDJSON or CSV.
+    """
+    store = get_store(check_company(company))
+    if len(store) == 0:
+        raise HTTPException(status_code=404, detail="No financial data loaded")
+    start = start_year if start_year is not None else int(store.years[0])
+    end = end_year if end_year is not None else int(store.years[-1])
+    return stream_range(
+        start,
+        end,
+        parse_metrics(metrics, company),
+        granularity,
+        format,
+        company,
+        f"{company}_financial_data",
+    )
+
+
+def _year_payload(
+    company: str, year: int, metrics: Optional[List[str]], granularity: str
+) -> List[Dict[str, Any]]:
+    data = get_financial_data(year, metrics, granularity, company)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"No data found for year {year}")
+    return data
+
+
+def _range_payload(
+    company: str,
+    start_year: int,
+    end_year: int,
+    metrics: Optional[List[str]],
+    granularity: str,
+) -> List[Dict[str, Any]]:
+    data = get_financial_data_range(start_year, end_year, metrics, granularity, company)
+    if not data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data found for years {start_year} to {end_year}",
+        )
+    return data
+
+
+def year_response(
+    request: Request,
+    company: str,
+    year: int,
+    metrics: Optional[str],
+    granularity: str,
+) -> Response:
+    """Serve one year of a company's data from the response cache."""
+    try:
+        names = parse_metrics(metrics, company)
+        key = (
+            "year",
+            company,
+            get_store(company).version,
+            year,
+            tuple(names or ()),
+            granularity,
+        )
+        return cached_response(
+            request, key, lambda: _year_payload(company, year, names, granularity)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def range_response(
+    request: Request,
+    company: str,
+    start_year: int,
+    end_year: int,
+    metrics: Optional[str],
+    granularity: str,
+    format: str,
+) -> Response:
+    """Serve a range of a company's data, cached as JSON or streamed."""
     try:
         if start_year > end_year:
             raise HTTPException(
                 status_code=400,
                 detail="Start year must be less than or equal to end year",
             )
-        data = get_financial_data_range(start_year, end_year)
-        if not data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No data found for years {start_year} to {end_year}",
+        names = parse_metrics(metrics, company)
+        if format != "json":
+            return stream_range(
+                start_year, end_year, names, granularity, format, company
             )
-        return data
+        key = (
+            "range",
+            company,
+            get_store(company).version,
+            start_year,
+            end_year,
+            tuple(names or ()),
+            granularity,
+        )
+        return cached_response(
+            request,
+            key,
+            lambda: _range_payload(company, start_year, end_year, names, granularity),
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/metrics")
-async def get_available_metrics() -> Dict[str, List[str]]:
+@router.get("/{year}", response_model=List[FinancialRecord])
+async def get_year_data(
+    request: Request,
+    year: int,
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics"),
+    granularity: str = Query("quarter", regex="^(quarter|year)$"),
+) -> Response:
     """
-    Get list of available financial metrics grouped by category.
+    Get financial data for a specific year.
+    """
+    return year_response(request, DEFAULT_COMPANY, year, metrics, granularity)
+
+
+@router.get("/range/{start_year}/{end_year}", response_model=List[FinancialRecord])
+async def get_year_range_data(
+    request: Request,
+    start_year: int,
+    end_year: int,
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics"),
+    granularity: str = Query("quarter", regex="^(quarter|year)$"),
+    format: str = Query("json", regex="^(json|ndjson|csv)$"),
+) -> Response:
+    """
+    Get financial data for a range of years.
+
+    With ``format=ndjson`` or ``format=csv`` the records are streamed
+    instead of returned as one JSON array.
+    """
+    return range_response(
+        request, DEFAULT_COMPANY, start_year, end_year, metrics, granularity, format
+    )
+
+
+@router.get("/{company}/{year}", response_model=List[FinancialRecord])
+async def get_company_year_data(
+    request: Request,
+    company: str,
+    year: int,
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics"),
+    granularity: str = Query("quarter", regex="^(quarter|year)$"),
+) -> Response:
+    """
+    Get a company's financial data for a specific year.
+    """
+    check_company(company)
+    return year_response(request, company, year, metrics, granularity)
+
+
+@router.get(
+    "/{company}/range/{start_year}/{end_year}", response_model=List[FinancialRecord]
+)
+async def get_company_year_range_data(
+    request: Request,
+    company: str,
+    start_year: int,
+    end_year: int,
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics"),
+    granularity: str = Query("quarter", regex="^(quarter|year)$"),
+    format: str = Query("json", regex="^(json|ndjson|csv)$"),
+) -> Response:
+    """
+    Get a company's financial data for a range of years.
     """
-    return {
-        "core_metrics": [
-            "revenue",
-            "cost_of_sales",
-            "operating_expenses",
-            "profit",
-            "net_profit",
-        ],
-        "profitability_metrics": [
-            "gross_profit_margin",
-            "operating_margin",
-            "net_profit_margin",
-            "return_on_equity",
-            "return_on_assets",
-        ],
-        "per_share_metrics": [
-            "eps",
-            "dividend_per_share",
-            "book_value_per_share",
-            "net_asset_per_share",
-        ],
-        "liquidity_metrics": [
-            "current_ratio",
-            "quick_ratio",
-            "cash_ratio",
-            "working_capital",
-        ],
-        "efficiency_metrics": [
-            "asset_turnover",
-            "inventory_turnover",
-            "receivables_turnover",
-            "payables_turnover",
-        ],
-        "debt_metrics": [
-            "debt_to_equity",
-            "debt_ratio",
-            "interest_coverage",
-        ],
-        "growth_metrics": [
-            "revenue_growth",
-            "profit_growth",
-            "asset_growth",
-        ],
-        "balance_sheet_items": [
-            "total_assets",
-            "current_assets",
-            "fixed_assets",
-            "total_liabilities",
-            "current_liabilities",
-            "long_term_debt",
-            "shareholders_equity",
-        ],
-        "cash_flow_items": [
-            "operating_cash_flow",
-            "investing_cash_flow",
-            "financing_cash_flow",
-            "free_cash_flow",
-        ],
-        "market_metrics": [
-            "market_cap",
-            "enterprise_value",
-            "pe_ratio",
-            "pb_ratio",
-            "dividend_yield",
-        ],
-    }
+    check_company(company)
+    return range_response(
+        request, company, start_year, end_year, metrics, granularity, format
+    )
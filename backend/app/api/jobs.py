@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, conint
+from typing import List, Dict, Any, Optional
+from app.services.data_processor import COMPANY_PATTERN, refresh_stores
+from app.services.ingestion import ingest_directory
+from app.services.jobs import get_job, list_jobs, submit_job
+from app.utils.config import CPU_WORKERS, DEFAULT_COMPANY
+
+router = APIRouter()
+
+
+class IngestRequest(BaseModel):
+    company: str = DEFAULT_COMPANY
+    force: bool = False
+    # Processes to extract with, at most the CPU pool's size
+    workers: Optional[conint(ge=1, le=CPU_WORKERS)] = None
+
+
+def run_ingestion(
+    company: str, force: bool, workers: Optional[int]
+) -> Dict[str, List[int]]:
+    """
+    Ingest a company's reports and summarize the years extracted from each.
+
+    The company's store is reloaded at once if it is loaded, so live-update
+    sessions hear about the new data without waiting for the next check.
+    Extraction uses ``workers`` processes, CPU_WORKERS by default.
+    """
+    extracted = ingest_directory(
+        workers=workers or CPU_WORKERS, force=force, company=company
+    )
+    refresh_stores([company])
+    return {name: sorted(figures) for name, figures in extracted.items()}
+
+
+@router.post("/ingest", status_code=202)
+async def submit_ingestion(request: IngestRequest) -> Dict[str, Any]:
+    """
+    Queue ingestion of a company's annual reports from data/raw.
+
+    Returns at once with the queued job; poll ``GET /api/jobs/{job_id}``
+    for its status and result.
+    """
+    if not COMPANY_PATTERN.match(request.company):
+        raise HTTPException(
+            status_code=400, detail=f"Invalid company: {request.company}"
+        )
+    job = submit_job("ingest", run_ingestion, request.dict())
+    return {"job": job.to_dict()}
+
+
+@router.get("/")
+async def get_jobs() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the remembered jobs, most recent first.
+    """
+    return {"jobs": [job.to_dict() for job in list_jobs()]}
+
+
+@router.get("/{job_id}")
+async def get_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Get the status, and once finished the result or error, of a job.
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"job": job.to_dict()}
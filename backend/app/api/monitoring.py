@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Any
+from app.utils.config import PROFILER_ENABLED
+from app.utils.metrics import render_prometheus
+from app.utils.profiler import PROFILER
+
+router = APIRouter()
+
+
+def check_profiler() -> None:
+    """Hide the profiler routes unless PROFILER_ENABLED is set."""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Get request, span, cache and executor metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.post("/debug/profiler/start")
+async def start_profiler(
+    interval: float = Query(0.005, gt=0.0005, le=1.0)
+) -> Dict[str, Any]:
+    """
+    Start sampling every thread's stack in this worker.
+    """
+    check_profiler()
+    PROFILER.start(interval)
+    return {"running": True, "interval": PROFILER.interval}
+
+
+@router.post("/debug/profiler/stop", response_class=PlainTextResponse)
+async def stop_profiler() -> PlainTextResponse:
+    """
+    Stop the profiler and return the collapsed stacks, ready for a flame graph.
+    """
+    check_profiler()
+    return PlainTextResponse(PROFILER.stop())
@@ -1,65 +1,129 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Any, Dict, List, Optional, Union
+from app.models.shareholder import CategoryHistory, ShareholderRecord, TopHolders
+from app.services.shareholder_processor import (
+    get_category_changes,
+    get_category_history,
+    get_shareholder_store,
+    get_shareholders,
+    get_top_holders,
+)
+from app.utils.http_cache import cached_response
 
 router = APIRouter()
 
-# Sample shareholders data
-SAMPLE_SHAREHOLDERS = {
-    2019: [
-        {"name": "Institutional Investors", "percentage": 45, "shares": 4500000},
-        {"name": "Retail Investors", "percentage": 30, "shares": 3000000},
-        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-    2020: [
-        {"name": "Institutional Investors", "percentage": 48, "shares": 4800000},
-        {"name": "Retail Investors", "percentage": 28, "shares": 2800000},
-        {"name": "Company Executives", "percentage": 14, "shares": 1400000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-    2021: [
-        {"name": "Institutional Investors", "percentage": 50, "shares": 5000000},
-        {"name": "Retail Investors", "percentage": 25, "shares": 2500000},
-        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-    2022: [
-        {"name": "Institutional Investors", "percentage": 52, "shares": 5200000},
-        {"name": "Retail Investors", "percentage": 23, "shares": 2300000},
-        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-    2023: [
-        {"name": "Institutional Investors", "percentage": 55, "shares": 5500000},
-        {"name": "Retail Investors", "percentage": 20, "shares": 2000000},
-        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-    2024: [
-        {"name": "Institutional Investors", "percentage": 58, "shares": 5800000},
-        {"name": "Retail Investors", "percentage": 17, "shares": 1700000},
-        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
-        {"name": "Other", "percentage": 10, "shares": 1000000},
-    ],
-}
-
-
-@router.get("/")
-async def get_shareholders_data(year: int = None):
+
+def _shareholders_payload(year: Optional[int]) -> Any:
+    if year is not None:
+        # Return data for a specific year
+        data = get_shareholders(year)
+        if data:
+            return data
+        else:
+            return {"error": f"No data available for year {year}"}
+    else:
+        # Return data for all years
+        return get_shareholders()
+
+
+def parse_categories(categories: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ``categories`` query parameter.
+
+    Raises:
+        HTTPException: 400 if a category is not in the store.
+    """
+    if not categories:
+        return None
+    names = list(dict.fromkeys(c.strip() for c in categories.split(",") if c.strip()))
+    unknown = [
+        name for name in names if name not in get_shareholder_store().category_labels
+    ]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown categories: {', '.join(unknown)}"
+        )
+    return names or None
+
+
+@router.get(
+    "/",
+    response_model=Union[List[ShareholderRecord], Dict[int, List[ShareholderRecord]]],
+)
+async def get_shareholders_data(request: Request, year: int = None) -> Response:
     """
     Get shareholders data for a specific year or all years.
 
+    Responses are serialized once per data version and served with an ETag.
+
     Args:
         year (int, optional): The year to get data for. If None, returns data for all years.
 
     Returns:
         dict or list: Shareholders data for the specified year or all years.
     """
-    if year is not None:
-        # Return data for a specific year
-        if year in SAMPLE_SHAREHOLDERS:
-            return SAMPLE_SHAREHOLDERS[year]
-        else:
-            return {"error": f"No data available for year {year}"}
-    else:
-        # Return data for all years
-        return SAMPLE_SHAREHOLDERS
+    key = ("shareholders", get_shareholder_store().version, year)
+    return cached_response(request, key, lambda: _shareholders_payload(year))
+
+
+@router.get("/history", response_model=CategoryHistory)
+async def get_shareholder_history(
+    request: Request,
+    categories: Optional[str] = Query(None, description="Comma-separated categories"),
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> Response:
+    """
+    Get each holder category's shares and percentage holding per year.
+    """
+    names = parse_categories(categories)
+    key = (
+        "history",
+        get_shareholder_store().version,
+        tuple(names or ()),
+        start_year,
+        end_year,
+    )
+    return cached_response(
+        request, key, lambda: get_category_history(names, start_year, end_year)
+    )
+
+
+@router.get("/changes", response_model=CategoryHistory)
+async def get_shareholder_changes(
+    request: Request,
+    categories: Optional[str] = Query(None, description="Comma-separated categories"),
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> Response:
+    """
+    Get the year-over-year change in each holder category's holdings.
+    """
+    names = parse_categories(categories)
+    key = (
+        "changes",
+        get_shareholder_store().version,
+        tuple(names or ()),
+        start_year,
+        end_year,
+    )
+    return cached_response(
+        request, key, lambda: get_category_changes(names, start_year, end_year)
+    )
+
+
+@router.get("/top/{year}", response_model=TopHolders)
+async def get_top_shareholders(
+    request: Request, year: int, n: int = Query(10, ge=1, le=1000)
+) -> Response:
+    """
+    Get the largest holdings of a year and their combined stake.
+    """
+    store = get_shareholder_store()
+    rows = store.year_slice(year)
+    if rows.stop == rows.start:
+        raise HTTPException(
+            status_code=404, detail=f"No data available for year {year}"
+        )
+    key = ("top", store.version, year, n)
+    return cached_response(request, key, lambda: get_top_holders(year, n))
@@ -1,6 +1,18 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import financial, shareholders, ai
+from fastapi.responses import JSONResponse
+from app.api import financial, shareholders, ai, events, jobs, monitoring
+from app.services import ai_service
+from app.services.events import watch_for_updates
+from app.services.executor import CPU_EXECUTOR, ExecutorBusy
+from app.services.jobs import JOB_EXECUTOR
+from app.services.data_processor import on_financial_reload
+from app.services.warmup import warm_up
+from app.services.shareholder_processor import on_shareholder_reload
+from app.utils.config import WARMUP
+from app.utils.http_cache import RESPONSE_CACHE
+from app.utils.metrics import MetricsMiddleware
 
 app = FastAPI(title="JK Financial Dashboard API")
 
@@ -16,3 +28,53 @@ app.add_middleware(
 app.include_router(financial.router, prefix="/api/financial")
 app.include_router(shareholders.router, prefix="/api/shareholders")
 app.include_router(ai.router, prefix="/api/ai")
+app.include_router(jobs.router, prefix="/api/jobs")
+app.include_router(events.router, prefix="/api/events")
+app.include_router(monitoring.router)
+
+# Outermost, so recorded latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(ExecutorBusy)
+async def executor_busy(request: Request, exc: ExecutorBusy) -> JSONResponse:
+    """Shed load with a 503 when a worker queue is full."""
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
+
+
+@app.on_event("startup")
+async def load_models():
+    """Load the trained forecasting models once per worker."""
+    ai_service.load_model_registry()
+
+
+@app.on_event("startup")
+async def warm_up_worker():
+    """Run the configured warm-up steps (WARMUP) before serving requests."""
+    if WARMUP:
+        warm_up(WARMUP)
+
+
+@app.on_event("startup")
+async def start_event_watcher():
+    """Notice new data and models while live-update sessions are connected."""
+    app.state.event_watcher = asyncio.create_task(watch_for_updates())
+
+
+@app.on_event("shutdown")
+async def stop_executors():
+    """Stop the worker pools and the event watcher with the server."""
+    CPU_EXECUTOR.shutdown(wait=False)
+    JOB_EXECUTOR.shutdown(wait=False)
+    watcher = getattr(app.state, "event_watcher", None)
+    if watcher is not None:
+        watcher.cancel()
+
+
+@on_financial_reload
+@on_shareholder_reload
+def drop_cached_responses(store) -> None:
+    """Drop serialized responses as soon as the data they came from changes."""
+    RESPONSE_CACHE.clear()
@@ -0,0 +1,203 @@
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel, Extra
+from app.services.financial_store import QUARTERS, FinancialStore, quarter_label
+
+# Fiscal years accepted at ingest; stores keep years as int16
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+# Most problems listed in the error raised for an invalid file
+MAX_REPORTED_ERRORS = 20
+
+
+def parse_year(key: Any, errors: List[str]) -> Optional[int]:
+    """
+    Parse a year key of a year-keyed JSON file.
+
+    Args:
+        key: The key, a string in JSON files.
+        errors (list): Problems found so far; a bad key is appended to it.
+
+    Returns:
+        int or None: The year, or None if the key is not a valid year.
+    """
+    try:
+        year = int(key)
+    except (TypeError, ValueError):
+        errors.append(f"{key!r} is not a year")
+        return None
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        errors.append(f"{year} is outside {MIN_YEAR}-{MAX_YEAR}")
+        return None
+    return year
+
+
+def raise_for_errors(errors: List[str], source: str) -> None:
+    """
+    Raise one ValueError listing the problems found in a file, if any.
+
+    Raises:
+        ValueError: If ``errors`` is not empty.
+    """
+    if not errors:
+        return
+    message = "; ".join(errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        message += f"; and {len(errors) - MAX_REPORTED_ERRORS} more"
+    raise ValueError(f"Invalid {source}: {message}")
+
+
+class QuarterRecord:
+    """
+    One quarter of a company's financials.
+
+    ``quarter`` is the 1-based quarter number and ``values`` maps metric
+    names to floats, NaN where a value is explicitly missing. Records are
+    validated once, by ``parse_financial_data`` when data is ingested;
+    requests read the columnar store built from them, never the records.
+    """
+
+    __slots__ = ("year", "quarter", "values")
+
+    def __init__(self, year: int, quarter: int, values: Dict[str, float]):
+        self.year = year
+        self.quarter = quarter
+        self.values = values
+
+    @property
+    def label(self) -> str:
+        """The "Qn" label of the quarter."""
+        return quarter_label(self.quarter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a quarter dict in the financial_data.json layout."""
+        record: Dict[str, Any] = {"quarter": self.label}
+        for name, value in self.values.items():
+            record[name] = None if math.isnan(value) else value
+        return record
+
+    def __repr__(self) -> str:
+        return f"QuarterRecord({self.year}, {self.label}, {len(self.values)} metrics)"
+
+
+def parse_financial_data(
+    data: Dict[Any, Any], source: str = "financial data"
+) -> List[QuarterRecord]:
+    """
+    Validate year-keyed financial data and convert it to records.
+
+    Every problem in the data is collected before raising, so a bad file
+    is reported in one go. Metric values must be numbers or null; a
+    "year" field in a quarter dict is ignored in favour of its key.
+
+    Args:
+        data (dict): Mapping of year to a list of quarter dicts, each with a
+            "quarter" label and metric values, as in financial_data.json.
+        source (str): What the data is, for the error message.
+
+    Returns:
+        list: One record per quarter, sorted by (year, quarter).
+
+    Raises:
+        ValueError: If a year, quarter or value is invalid, or a quarter is
+            listed twice.
+    """
+    errors: List[str] = []
+    records: Dict[tuple, QuarterRecord] = {}
+    for key, items in data.items():
+        year = parse_year(key, errors)
+        if year is None:
+            continue
+        if not isinstance(items, list):
+            errors.append(f"{year}: expected a list of quarters")
+            continue
+        for item in items:
+            label = item.get("quarter") if isinstance(item, dict) else None
+            if label not in QUARTERS:
+                errors.append(f"{year}: {label!r} is not a quarter")
+                continue
+            quarter = QUARTERS.index(label) + 1
+            if (year, quarter) in records:
+                errors.append(f"{year} {label}: listed twice")
+                continue
+            values: Dict[str, float] = {}
+            for name, value in item.items():
+                if name in ("quarter", "year"):
+                    continue
+                if value is None:
+                    values[name] = math.nan
+                elif (
+                    isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and math.isfinite(value)
+                ):
+                    values[name] = float(value)
+                else:
+                    errors.append(f"{year} {label}: {name} is not a number: {value!r}")
+            records[year, quarter] = QuarterRecord(year, quarter, values)
+
+    raise_for_errors(errors, source)
+    return [records[period] for period in sorted(records)]
+
+
+def store_from_records(records: List[QuarterRecord]) -> FinancialStore:
+    """
+    Build a store from validated records in one pass per column.
+
+    Args:
+        records (list): Records sorted by (year, quarter), as returned by
+            ``parse_financial_data``.
+
+    Returns:
+        FinancialStore: Store holding the records; metrics a record lacks
+        are NaN in its row.
+    """
+    count = len(records)
+    metrics = list(dict.fromkeys(name for record in records for name in record.values))
+    columns = {
+        metric: np.fromiter(
+            (record.values.get(metric, math.nan) for record in records),
+            np.float64,
+            count,
+        )
+        for metric in metrics
+    }
+    return FinancialStore(
+        np.fromiter((record.year for record in records), np.int16, count),
+        np.fromiter((record.quarter for record in records), np.int8, count),
+        columns,
+    )
+
+
+def to_financial_data(records: List[QuarterRecord]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return records grouped by year in the financial_data.json layout."""
+    data: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        data.setdefault(str(record.year), []).append(record.to_dict())
+    return data
+
+
+class FinancialRecord(BaseModel):
+    """
+    A quarter's metrics, or a year's with ``granularity=year``, as served.
+
+    Each metric is an extra number field, null where missing. The model
+    documents the response schema: the routes return prepared JSON, which
+    FastAPI sends as is instead of validating it field by field.
+    """
+
+    year: int
+    quarter: Optional[str] = None
+
+    class Config:
+        extra = Extra.allow
+        schema_extra = {
+            "example": {
+                "year": 2023,
+                "quarter": "Q1",
+                "revenue": 1250.5,
+                "net_profit": 180.2,
+            }
+        }
@@ -0,0 +1,165 @@
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+from app.models.financial import parse_year, raise_for_errors
+from app.services.shareholder_store import ShareholderStore
+
+
+class Holding:
+    """
+    One holder's stake in one year.
+
+    ``category`` is None for a holder that is its own category. Holdings
+    are validated once, by ``parse_shareholder_data`` when data is
+    ingested; requests read the columnar store built from them.
+    """
+
+    __slots__ = ("year", "name", "category", "shares", "percentage")
+
+    def __init__(
+        self,
+        year: int,
+        name: str,
+        shares: int,
+        percentage: float,
+        category: Optional[str] = None,
+    ):
+        self.year = year
+        self.name = name
+        self.category = category
+        self.shares = shares
+        self.percentage = percentage
+
+    def __repr__(self) -> str:
+        return f"Holding({self.year}, {self.name!r}, {self.percentage}%)"
+
+
+def _is_number(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def parse_shareholder_data(
+    data: Dict[Any, Any], source: str = "shareholder data"
+) -> List[Holding]:
+    """
+    Validate year-keyed shareholder data and convert it to holdings.
+
+    Every problem in the data is collected before raising, so a bad file
+    is reported in one go.
+
+    Args:
+        data (dict): Mapping of year to a list of dicts with "name",
+            "percentage", "shares" and optionally "category", as in
+            shareholders.json.
+        source (str): What the data is, for the error message.
+
+    Returns:
+        list: The holdings, sorted by year and otherwise in file order.
+
+    Raises:
+        ValueError: If a year, name, category, share count or percentage is
+            invalid, or a holder is listed twice in a year.
+    """
+    errors: List[str] = []
+    holdings: Dict[int, List[Holding]] = {}
+    for key, items in data.items():
+        year = parse_year(key, errors)
+        if year is None:
+            continue
+        if not isinstance(items, list):
+            errors.append(f"{year}: expected a list of holdings")
+            continue
+        names = set()
+        for item in items:
+            name = item.get("name") if isinstance(item, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                errors.append(f"{year}: holding without a name")
+                continue
+            if name in names:
+                errors.append(f"{year} {name}: listed twice")
+                continue
+            names.add(name)
+            shares, percentage = item.get("shares"), item.get("percentage")
+            category = item.get("category")
+            if not _is_number(shares) or shares < 0 or shares != int(shares):
+                errors.append(f"{year} {name}: shares must be a whole number >= 0")
+            elif not _is_number(percentage) or not 0 <= percentage <= 100:
+                errors.append(f"{year} {name}: percentage must be from 0 to 100")
+            elif category is not None and not (
+                isinstance(category, str) and category.strip()
+            ):
+                errors.append(f"{year} {name}: category must be a non-empty string")
+            else:
+                holdings.setdefault(year, []).append(
+                    Holding(year, name, int(shares), float(percentage), category)
+                )
+
+    raise_for_errors(errors, source)
+    return [holding for year in sorted(holdings) for holding in holdings[year]]
+
+
+def store_from_holdings(holdings: List[Holding]) -> ShareholderStore:
+    """
+    Build a store from validated holdings, dictionary-encoding the names.
+
+    Args:
+        holdings (list): Holdings sorted by year, as returned by
+            ``parse_shareholder_data``.
+
+    Returns:
+        ShareholderStore: Store holding the same data in columnar form.
+    """
+    codes: Dict[str, int] = {}
+    category_codes: Dict[str, int] = {}
+    for holding in holdings:
+        codes.setdefault(holding.name, len(codes))
+        category_codes.setdefault(holding.category or holding.name, len(category_codes))
+
+    count = len(holdings)
+    return ShareholderStore(
+        np.fromiter((h.year for h in holdings), np.int16, count),
+        np.fromiter((codes[h.name] for h in holdings), np.int32, count),
+        np.fromiter((h.shares for h in holdings), np.int64, count),
+        np.fromiter((h.percentage for h in holdings), np.float64, count),
+        list(codes),
+        categories=np.fromiter(
+            (category_codes[h.category or h.name] for h in holdings), np.int32, count
+        ),
+        category_labels=list(category_codes),
+    )
+
+
+class ShareholderRecord(BaseModel):
+    """A holding as served by the shareholder routes."""
+
+    name: str
+    category: str
+    percentage: float
+    shares: int
+
+
+class TopHolders(BaseModel):
+    """The largest holdings of a year and their combined percentage."""
+
+    year: int
+    holders: List[ShareholderRecord]
+    percentage: float
+
+
+class CategorySeries(BaseModel):
+    """A holder category's shares and percentage holding, one entry per year."""
+
+    shares: List[float]
+    percentage: List[float]
+
+
+class CategoryHistory(BaseModel):
+    """Per-category series over the years of a range."""
+
+    years: List[int]
+    series: Dict[str, CategorySeries]
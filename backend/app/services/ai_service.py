@@ -1,216 +1,336 @@
-from typing import List, Dict, Any
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from app.services.data_processor import get_financial_data_range, SAMPLE_DATA
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from app.services.data_processor import (
+    data_stamp,
+    get_annual_history,
+    get_store,
+    on_financial_reload,
+)
+from app.services.forecasting import (
+    DEFAULT_SEED,
+    fit_annual_trends,
+    finish_forecast,
+    to_forecast_records,
+)
+from app.services.insights import (
+    StatisticsTable,
+    build_statistics_table,
+    render_insight,
+)
+from app.services.model_registry import load_registry, registry_stamp
+from app.services.model_zoo import MODELS, stack_states
+from app.utils.cache import LRUCache
+from app.utils.config import DEFAULT_COMPANY, MODEL_CACHE_SIZE, MODEL_REGISTRY_DIR
+from app.utils.metrics import span
 
+# Fitted linear trends keyed by (company, metric, data version), and insight
+# statistics tables keyed by the (company, file stamp) of each of their companies
+_TREND_CACHE = LRUCache(MODEL_CACHE_SIZE, name="trends")
+_STATISTICS_CACHE = LRUCache(MODEL_CACHE_SIZE, name="statistics")
 
-def generate_forecast(metric: str, years: int) -> List[Dict[str, Any]]:
+
+# Latest models from scripts/model_training.py, loaded once per process
+_REGISTRY: Optional[Dict[str, Any]] = None
+_REGISTRY_LOADED = False
+_REGISTRY_DIR = Path(MODEL_REGISTRY_DIR)
+_REGISTRY_STAMP: Any = None
+_REGISTRY_LISTENERS: List[
+    Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]
+] = []
+
+
+@on_financial_reload
+def _clear_caches(store) -> None:
+    _TREND_CACHE.clear()
+    _STATISTICS_CACHE.clear()
+
+
+def load_model_registry(
+    directory: Path = MODEL_REGISTRY_DIR,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the latest trained models from the registry.
+
+    Called once at startup; afterwards forecasts for metrics in the registry
+    only run inference. Models trained on a different data version than the
+    loaded store are ignored and those metrics are fitted on demand instead.
+    Listeners registered with ``on_registry_reload`` are called when the
+    loaded models change.
+
+    Args:
+        directory (Path): Root directory of the registry.
+
+    Returns:
+        dict: The loaded registry, or None if no models have been trained.
+    """
+    global _REGISTRY, _REGISTRY_LOADED, _REGISTRY_DIR, _REGISTRY_STAMP
+    previous = _REGISTRY if _REGISTRY_LOADED else None
+    _REGISTRY_DIR = Path(directory)
+    _REGISTRY_STAMP = registry_stamp(directory)
+    _REGISTRY = load_registry(directory)
+    _REGISTRY_LOADED = True
+    _TREND_CACHE.clear()
+    version = _REGISTRY["version"] if _REGISTRY else None
+    if (previous["version"] if previous else None) != version:
+        for listener in list(_REGISTRY_LISTENERS):
+            listener(previous, _REGISTRY)
+    return _REGISTRY
+
+
+def refresh_model_registry() -> bool:
+    """
+    Load the latest registry if a new version was saved since it was loaded.
+
+    Returns:
+        bool: Whether the registry was reloaded.
+    """
+    if not _REGISTRY_LOADED or registry_stamp(_REGISTRY_DIR) == _REGISTRY_STAMP:
+        return False
+    load_model_registry(_REGISTRY_DIR)
+    return True
+
+
+def on_registry_reload(
+    listener: Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]
+) -> Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]:
+    """
+    Register ``listener`` to be called after the loaded models change.
+
+    It is called with the replaced and the new registry, either of which
+    may be None when no models were or are trained.
+    """
+    _REGISTRY_LISTENERS.append(listener)
+    return listener
+
+
+def get_model_registry() -> Optional[Dict[str, Any]]:
+    """Return the loaded model registry, loading it on first use."""
+    if not _REGISTRY_LOADED:
+        load_model_registry()
+    return _REGISTRY
+
+
+def registry_source() -> Tuple[Path, Optional[str]]:
+    """Identify the loaded registry by its directory and version ID."""
+    registry = get_model_registry()
+    return _REGISTRY_DIR, registry["version"] if registry else None
+
+
+def ensure_registry(directory: Path, version: Optional[str]) -> None:
+    """
+    Load the registry from ``directory`` unless it is the one already loaded.
+
+    Worker processes load the registry on their own; tasks that must use the
+    same models as the process that submitted them call this with the
+    submitter's ``registry_source()``.
+    """
+    if registry_source() != (Path(directory), version):
+        load_model_registry(directory)
+
+
+def _get_models(
+    metrics: List[str], company: str = DEFAULT_COMPANY
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the fitted forecasting model of each metric of a company.
+
+    Models come from the model registry when it was trained on the
+    company's current data, then from the cache; the remaining metrics are
+    fitted together with a linear trend. The registry is trained on the
+    default company, so other companies' metrics are always fitted.
+
+    Args:
+        metrics (list): The metrics to forecast.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        dict: Mapping of metric to its (last year, model name, state) fit,
+        the state as single-series arrays, or None if there is not enough
+        history to fit.
+    """
+    version = get_store(company).version
+    registry = get_model_registry()
+    models = {}
+    if (
+        company == DEFAULT_COMPANY
+        and registry is not None
+        and registry["data_version"] == version
+    ):
+        models = registry["models"]
+
+    fits = {}
+    for metric in metrics:
+        if metric in models:
+            model = models[metric]
+            fits[metric] = (model["last_year"], model["kind"], model["params"])
+            continue
+        fit = _TREND_CACHE.get((company, metric, version))
+        if fit is not None:
+            fits[metric] = fit
+
+    missing = [metric for metric in metrics if metric not in fits]
+    if missing:
+        years, history = get_annual_history(missing, company=company)
+        if len(years) < 2:
+            return None
+        coef = fit_annual_trends(years, history)
+        for i, metric in enumerate(missing):
+            fits[metric] = (int(years[-1]), "linear", {"coef": coef[:, i].copy()})
+            _TREND_CACHE.set((company, metric, version), fits[metric])
+    return fits
+
+
+def generate_forecasts(
+    metrics: List[str],
+    horizons: List[int],
+    seed: Optional[int] = DEFAULT_SEED,
+    company: str = DEFAULT_COMPANY,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate forecasts for several metrics and horizons in one pass.
+
+    Each metric is forecast with the model the registry chose for it, or a
+    linear trend if it has none; those are fitted together in a single
+    least-squares solve and cached per data version, so repeated requests
+    only run the prediction. Metrics sharing a model are predicted at once.
+
+    Args:
+        metrics (list): The metrics to forecast.
+        horizons (list): Years ahead of the last historical year to forecast.
+        seed (int, optional): Seed for the forecast noise, or None for none.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        dict: Forecast data for each metric, empty without horizons.
+    """
+    if not horizons:
+        return {metric: [] for metric in metrics}
+    fits = _get_models(metrics, company)
+    if fits is None:
+        return {metric: [] for metric in metrics}
+
+    forecasts = {}
+    for last_year, kind in sorted({fits[metric][:2] for metric in metrics}):
+        group = [metric for metric in metrics if fits[metric][:2] == (last_year, kind)]
+        state = stack_states([fits[metric][2] for metric in group])
+        with span("model.predict"):
+            predictions = MODELS[kind].predict(state, horizons)
+        forecast_years, values = finish_forecast(
+            group, last_year, predictions, horizons, seed
+        )
+        for metric in group:
+            forecasts[metric] = to_forecast_records(forecast_years, values[metric])
+    return {metric: forecasts[metric] for metric in metrics}
+
+
+def generate_forecast(
+    metric: str,
+    years: int,
+    seed: Optional[int] = DEFAULT_SEED,
+    company: str = DEFAULT_COMPANY,
+) -> List[Dict[str, Any]]:
     """
     Generate forecast data for a given metric.
 
     Args:
         metric (str): The metric to forecast (revenue, profit, etc.)
         years (int): Number of years to forecast
+        seed (int, optional): Seed for the forecast noise, or None for none.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
 
     Returns:
         list: Forecast data for the specified metric
     """
-    # Get historical data
-    historical_data = get_financial_data_range(2019, 2024)
-    if not historical_data:
-        return []
-
-    # Prepare data for forecasting
-    X = np.array(range(len(historical_data))).reshape(-1, 1)
-    y = np.array([data[metric] for data in historical_data])
-
-    # Fit linear regression model
-    model = LinearRegression()
-    model.fit(X, y)
-
-    # Generate forecast
-    forecast_data = []
-    last_year = max(data["year"] for data in historical_data)
-
-    for i in range(1, years + 1):
-        year = last_year + i
-        predicted_value = model.predict([[len(historical_data) + i - 1]])[0]
-
-        # Add some randomness to make it more realistic
-        noise = np.random.normal(0, predicted_value * 0.05)  # 5% standard deviation
-        predicted_value += noise
-
-        forecast_data.append(
-            {
-                "year": year,
-                "value": round(float(predicted_value), 2),
-                "is_forecast": True,
-            }
-        )
+    horizons = list(range(1, years + 1))
+    return generate_forecasts([metric], horizons, seed, company)[metric]
+
+
+def get_statistics_table(companies: List[str]) -> StatisticsTable:
+    """
+    Get the statistics table of a list of companies, building it on first use.
+
+    Tables are keyed by the file stamps of their companies, so checking the
+    cache does not load any store, and a table is rebuilt once any of its
+    companies' data changes.
 
-    return forecast_data
+    Args:
+        companies (list): Company identifiers, in the order of the rows.
 
+    Returns:
+        StatisticsTable: Statistics of every metric of every company.
+    """
+    key = tuple((company, data_stamp(company)) for company in companies)
+    return _STATISTICS_CACHE.get_or_compute(
+        key, lambda: build_statistics_table(companies)
+    )
 
-def analyze_trend(values: List[float]) -> str:
-    """Analyze the trend of a metric."""
-    if len(values) < 2:
-        return "insufficient data"
 
-    changes = np.diff(values)
-    if all(change > 0 for change in changes):
-        return "consistently increasing"
-    elif all(change < 0 for change in changes):
-        return "consistently decreasing"
-    elif np.mean(changes) > 0:
-        return "generally increasing"
-    elif np.mean(changes) < 0:
-        return "generally decreasing"
-    else:
-        return "stable"
+def get_metric_statistics(
+    metric: str, company: str = DEFAULT_COMPANY
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the summary statistics of a metric's annual history.
 
+    Args:
+        metric (str): The metric to summarize
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
 
-def calculate_cagr(start_value: float, end_value: float, years: int) -> float:
-    """Calculate Compound Annual Growth Rate."""
-    return (pow(end_value / start_value, 1 / years) - 1) * 100
+    Returns:
+        dict: Count, mean, std, latest and previous values, percent change,
+        CAGR, volatility and trend, or None without enough data.
+    """
+    return get_statistics_table([company]).get(company, metric)
 
 
-def generate_insight(metric: str) -> str:
+def generate_insight(metric: str, company: str = DEFAULT_COMPANY) -> str:
     """
     Generate comprehensive insights about a specific metric.
 
     Args:
         metric (str): The metric to generate insight for
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
 
     Returns:
         str: Generated insight
     """
-    # Get historical data
-    historical_data = get_financial_data_range(2019, 2024)
-    if not historical_data:
+    stats = get_metric_statistics(metric, company)
+    if stats is None:
         return "No data available for analysis."
+    return render_insight(metric, stats)
 
-    values = [data[metric] for data in historical_data]
-    years = [data["year"] for data in historical_data]
-
-    # Basic statistics
-    mean_value = np.mean(values)
-    std_value = np.std(values)
-    latest_value = values[-1]
-    previous_value = values[-2]
-    percent_change = ((latest_value - previous_value) / previous_value) * 100
-    trend = analyze_trend(values)
-    cagr = calculate_cagr(values[0], values[-1], len(values) - 1)
-
-    insights = []
-
-    # Core metrics insights
-    if metric == "revenue":
-        insights.extend(
-            [
-                f"Revenue has shown a {trend} trend over the past {len(values)} years.",
-                f"Year-over-year growth is {percent_change:.1f}%.",
-                f"The compound annual growth rate (CAGR) is {cagr:.1f}%.",
-                f"Average revenue is {mean_value:,.0f} with a standard deviation of {std_value:,.0f}.",
-                "This indicates "
-                + (
-                    "strong market performance"
-                    if percent_change > 10
-                    else (
-                        "stable market presence"
-                        if percent_change > 0
-                        else "challenging market conditions"
-                    )
-                )
-                + ".",
-            ]
-        )
-
-    elif metric == "net_profit":
-        insights.extend(
-            [
-                f"Net profit has shown a {trend} trend over the analyzed period.",
-                f"Year-over-year change is {percent_change:.1f}%.",
-                f"The compound annual growth rate (CAGR) is {cagr:.1f}%.",
-                f"Average net profit is {mean_value:,.0f}.",
-                "This suggests "
-                + (
-                    "improving operational efficiency"
-                    if percent_change > 10
-                    else (
-                        "stable operations"
-                        if percent_change > 0
-                        else "pressure on profitability"
-                    )
-                )
-                + ".",
-            ]
-        )
-
-    elif "margin" in metric:
-        insights.extend(
-            [
-                f"The {metric.replace('_', ' ')} has been {trend}.",
-                f"Current margin is {latest_value:.1f}%, compared to {previous_value:.1f}% in the previous year.",
-                f"Average margin is {mean_value:.1f}% with a standard deviation of {std_value:.1f}%.",
-                "This indicates "
-                + ("improving efficiency" if percent_change > 0 else "cost pressure")
-                + ".",
-            ]
-        )
 
-    elif metric == "eps":
-        insights.extend(
-            [
-                f"Earnings per share (EPS) shows a {trend} trend.",
-                f"Year-over-year growth is {percent_change:.1f}%.",
-                f"CAGR of {cagr:.1f}% over the period.",
-                f"Current EPS is {latest_value:.2f}, with a historical average of {mean_value:.2f}.",
-                "This suggests "
-                + (
-                    "strong shareholder value creation"
-                    if percent_change > 10
-                    else (
-                        "stable performance"
-                        if percent_change > 0
-                        else "challenges in profitability"
-                    )
-                )
-                + ".",
-            ]
-        )
+def generate_insights(
+    companies: List[str], metrics: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Generate insights for several metrics of several companies at once.
 
-    elif "ratio" in metric:
-        insights.extend(
-            [
-                f"The {metric.replace('_', ' ')} is currently at {latest_value:.2f}.",
-                f"This represents a {abs(percent_change):.1f}% {'increase' if percent_change > 0 else 'decrease'} from the previous period.",
-                f"The historical average is {mean_value:.2f}.",
-                "This indicates "
-                + ("strong" if latest_value > mean_value else "weakening")
-                + f" {metric.replace('_', ' ')}.",
-            ]
-        )
+    The statistics of every metric of every company come from one
+    statistics table; only the text of the requested metrics is rendered.
 
-    elif "cash_flow" in metric:
-        insights.extend(
-            [
-                f"The {metric.replace('_', ' ')} shows a {trend} pattern.",
-                f"Current value is {latest_value:,.0f}, a {percent_change:.1f}% change from previous year.",
-                f"Average {metric.replace('_', ' ')} is {mean_value:,.0f}.",
-                "This suggests "
-                + ("improving" if percent_change > 0 else "deteriorating")
-                + " cash management.",
-            ]
-        )
+    Args:
+        companies (list): Company identifiers.
+        metrics (list, optional): Metrics to describe. Defaults to every
+            metric of any of the companies.
 
-    else:
-        insights.extend(
-            [
-                f"The {metric.replace('_', ' ')} shows a {trend} trend.",
-                f"Current value is {latest_value:,.2f}, representing a {percent_change:.1f}% change.",
-                f"Historical average is {mean_value:.2f} with a standard deviation of {std_value:.2f}.",
-                f"The metric has grown at a CAGR of {cagr:.1f}% over the period.",
-            ]
-        )
+    Returns:
+        dict: Per company, the statistics and the insight text of each
+        metric with enough data.
 
-    return " ".join(insights)
+    Raises:
+        ValueError: If a metric is not held by any of the companies.
+    """
+    table = get_statistics_table(companies)
+    unknown = [metric for metric in metrics or [] if metric not in table.metrics]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    results = {}
+    for company in companies:
+        statistics, insights = {}, {}
+        for metric in table.metrics if metrics is None else metrics:
+            stats = table.get(company, metric)
+            if stats is not None:
+                statistics[metric] = stats
+                insights[metric] = render_insight(metric, stats)
+        results[company] = {"statistics": statistics, "insights": insights}
+    return results
@@ -0,0 +1,234 @@
+import math
+import os
+import warnings
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+import numpy as np
+from app.services.data_processor import (
+    advertised_metrics,
+    annual_aggregation,
+    get_annual_history,
+    get_quarterly_history,
+    get_store,
+    list_companies,
+)
+from app.services.forecasting import forecast_errors
+from app.services.model_zoo import AGGREGATIONS, MODELS, SeriesPanel
+from app.utils.config import DEFAULT_COMPANY
+from app.utils.metrics import timed
+
+# Error metric that picks the best model of each series
+SELECTION_SCORE = "rmse"
+
+
+def load_panel(metrics: List[str], company: str = DEFAULT_COMPANY) -> SeriesPanel:
+    """
+    Load the annual and quarterly history of a company's metrics.
+
+    Args:
+        metrics (list): The metrics, one series each, in this order.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        SeriesPanel: The history of every metric.
+    """
+    years, annual = get_annual_history(metrics, company=company)
+    _, quarterly = get_quarterly_history(metrics, company=company)
+    return SeriesPanel(
+        years,
+        np.column_stack([annual[metric] for metric in metrics]),
+        np.stack([quarterly[metric] for metric in metrics], axis=-1),
+        np.array([AGGREGATIONS.index(annual_aggregation(m)) for m in metrics]),
+    )
+
+
+@timed("model.backtest")
+def backtest(
+    panel: SeriesPanel, models: List[str], folds: int, horizon: int
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Score models on every series of a panel by rolling-origin backtesting.
+
+    Each of the last ``folds`` years is used in turn as a forecast origin:
+    models are fitted on the years before it and predict up to ``horizon``
+    years from there, as far as the history goes. Errors are pooled over
+    all origins and horizons. A model that cannot predict every one of
+    those years for a series gets no score for it.
+
+    Args:
+        panel (SeriesPanel): History of the series.
+        models (list): Names of the models in MODELS to score.
+        folds (int): Number of forecast origins.
+        horizon (int): Most years ahead predicted from each origin.
+
+    Returns:
+        dict: For each model, MAE, RMSE and MAPE arrays with one entry per
+        series, NaN where it has no score.
+    """
+    origins = range(max(2, len(panel.years) - folds), len(panel.years))
+    scores = {}
+    for name in models:
+        model = MODELS[name]
+        predicted, actual = [], []
+        for origin in origins:
+            steps = list(range(1, min(horizon, len(panel.years) - origin) + 1))
+            state = model.fit(panel.head(origin))
+            predicted.append(model.predict(state, steps))
+            actual.append(panel.annual[origin : origin + len(steps)])
+
+        if not predicted:
+            nan = np.full(panel.annual.shape[1], np.nan)
+            scores[name] = {"mae": nan, "rmse": nan, "mape": nan}
+            continue
+        predicted, actual = np.vstack(predicted), np.vstack(actual)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            errors = forecast_errors(actual, predicted)
+        missed = (np.isnan(predicted) & ~np.isnan(actual)).any(axis=0)
+        scores[name] = {
+            key: np.where(missed, np.nan, value) for key, value in errors.items()
+        }
+    return scores
+
+
+def select_best(scores: Dict[str, Dict[str, np.ndarray]]) -> List[Optional[str]]:
+    """
+    Pick the model with the lowest SELECTION_SCORE for every series.
+
+    Returns:
+        list: The best model name per series, or None where no model has a
+        score. Ties go to the model listed first.
+    """
+    names = list(scores)
+    table = np.vstack([scores[name][SELECTION_SCORE] for name in names])
+    best = np.argmin(np.where(np.isnan(table), np.inf, table), axis=0)
+    scored = ~np.isnan(table).all(axis=0)
+    return [names[i] if ok else None for i, ok in zip(best.tolist(), scored.tolist())]
+
+
+def _score_dict(
+    scores: Dict[str, np.ndarray], column: int
+) -> Dict[str, Optional[float]]:
+    """Return one series' error metrics as floats, None where undefined."""
+    values = {key: float(value[column]) for key, value in scores.items()}
+    return {key: None if math.isnan(value) else value for key, value in values.items()}
+
+
+def summarize_backtest(
+    metrics: List[str], scores: Dict[str, Dict[str, np.ndarray]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Format backtest scores per metric.
+
+    Returns:
+        dict: For each metric, the "best" model (None if no model could be
+        scored) and the "scores" of every model.
+    """
+    best = select_best(scores)
+    return {
+        metric: {
+            "best": best[i],
+            "scores": {name: _score_dict(values, i) for name, values in scores.items()},
+        }
+        for i, metric in enumerate(metrics)
+    }
+
+
+def backtest_company(
+    company: str = DEFAULT_COMPANY,
+    metrics: Optional[List[str]] = None,
+    folds: int = 3,
+    horizon: int = 3,
+    models: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Backtest models on a company's metrics and pick the best per metric.
+
+    Args:
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+        metrics (list, optional): Metrics to backtest. Defaults to every
+            advertised metric the company's store holds; metrics it does not
+            hold are skipped.
+        folds (int): Number of forecast origins.
+        horizon (int): Most years ahead predicted from each origin.
+        models (list, optional): Models to compare. Defaults to all.
+
+    Returns:
+        dict: Best model and scores of every model, per metric.
+    """
+    store = get_store(company)
+    metrics = [
+        metric
+        for metric in (advertised_metrics() if metrics is None else metrics)
+        if metric in store.columns
+    ]
+    if not metrics:
+        return {}
+    scores = backtest(
+        load_panel(metrics, company), models or list(MODELS), folds, horizon
+    )
+    return summarize_backtest(metrics, scores)
+
+
+def backtest_universe(
+    companies: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
+    folds: int = 3,
+    horizon: int = 3,
+    models: Optional[List[str]] = None,
+    executor: Optional[Executor] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Backtest every metric of many companies in parallel.
+
+    Work is split into one task per company, and each company's metrics
+    into several tasks when there are fewer companies than workers, so a
+    single company also uses every core. Workers load the stores
+    themselves; only names and scores cross process boundaries.
+
+    Args:
+        companies (list, optional): Companies to backtest. Defaults to all.
+        metrics (list, optional): Metrics to backtest, as for
+            ``backtest_company``.
+        folds (int): Number of forecast origins.
+        horizon (int): Most years ahead predicted from each origin.
+        models (list, optional): Models to compare. Defaults to all.
+        executor (Executor, optional): Pool to run the tasks on. A process
+            pool is created for the call if not given.
+        workers (int, optional): Processes for a created pool, and the
+            parallelism tasks are split for. Defaults to the CPU count.
+
+    Returns:
+        dict: ``backtest_company`` results per company.
+    """
+    companies = companies or list_companies()
+    workers = workers or os.cpu_count() or 1
+    names = advertised_metrics() if metrics is None else metrics
+    if not names:
+        return {company: {} for company in companies}
+    shards = max(1, min(len(names), workers // len(companies)))
+    size = math.ceil(len(names) / shards)
+
+    tasks = [
+        (company, names[i : i + size])
+        for company in companies
+        for i in range(0, len(names), size)
+    ]
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        parts = pool.map(
+            backtest_company,
+            [company for company, _ in tasks],
+            [chunk for _, chunk in tasks],
+            [folds] * len(tasks),
+            [horizon] * len(tasks),
+            [models] * len(tasks),
+        )
+        results: Dict[str, Dict[str, Dict[str, Any]]] = {c: {} for c in companies}
+        for (company, _), part in zip(tasks, parts):
+            results[company].update(part)
+    finally:
+        if pool is not executor:
+            pool.shutdown()
+    return results
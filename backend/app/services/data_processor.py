@@ -1,87 +1,1129 @@
 import json
 import os
+import re
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.models.financial import (
+    QuarterRecord,
+    parse_financial_data,
+    store_from_records,
+)
+from app.services.financial_store import QUARTERS, FinancialStore
+from app.utils.cache import LRUCache
+from app.utils.config import (
+    FINANCIAL_JSON,
+    FINANCIAL_COLUMNS_DIR,
+    COMPANIES_DIR,
+    COMPANY_CACHE_SIZE,
+    DATA_RELOAD_INTERVAL,
+    DEFAULT_COMPANY,
+)
+from app.utils.metrics import timed
+from app.utils.file_utils import (
+    MANIFEST_NAME,
+    path_stamp,
+    read_json,
+    read_columns,
+    write_columns,
+)
 
-# Sample data for demonstration
+# Metrics advertised by /api/financial/metrics, grouped by category
+METRIC_CATEGORIES = {
+    "core_metrics": [
+        "revenue",
+        "cost_of_sales",
+        "operating_expenses",
+        "profit",
+        "net_profit",
+    ],
+    "profitability_metrics": [
+        "gross_profit_margin",
+        "operating_margin",
+        "net_profit_margin",
+        "return_on_equity",
+        "return_on_assets",
+    ],
+    "per_share_metrics": [
+        "eps",
+        "dividend_per_share",
+        "book_value_per_share",
+        "net_asset_per_share",
+    ],
+    "liquidity_metrics": [
+        "current_ratio",
+        "quick_ratio",
+        "cash_ratio",
+        "working_capital",
+    ],
+    "efficiency_metrics": [
+        "asset_turnover",
+        "inventory_turnover",
+        "receivables_turnover",
+        "payables_turnover",
+    ],
+    "debt_metrics": [
+        "debt_to_equity",
+        "debt_ratio",
+        "interest_coverage",
+    ],
+    "growth_metrics": [
+        "revenue_growth",
+        "profit_growth",
+        "asset_growth",
+    ],
+    "balance_sheet_items": [
+        "total_assets",
+        "current_assets",
+        "fixed_assets",
+        "total_liabilities",
+        "current_liabilities",
+        "long_term_debt",
+        "shareholders_equity",
+    ],
+    "cash_flow_items": [
+        "operating_cash_flow",
+        "investing_cash_flow",
+        "financing_cash_flow",
+        "free_cash_flow",
+    ],
+    "market_metrics": [
+        "market_cap",
+        "enterprise_value",
+        "pe_ratio",
+        "pb_ratio",
+        "dividend_yield",
+    ],
+}
+
+
+def advertised_metrics() -> List[str]:
+    """Return every metric listed in METRIC_CATEGORIES, in catalogue order."""
+    return [metric for metrics in METRIC_CATEGORIES.values() for metric in metrics]
+
+
+# Income statement and cash flow metrics, reported over a period rather than
+# as at a date. Annual figures for these are apportioned across quarters.
+FLOW_METRICS = {
+    "revenue",
+    "cost_of_sales",
+    "operating_expenses",
+    "profit",
+    "net_profit",
+    "eps",
+    "dividend_per_share",
+    "interest_expense",
+    "operating_cash_flow",
+    "investing_cash_flow",
+    "financing_cash_flow",
+    "capital_expenditure",
+}
+
+
+def annual_aggregation(metric: str) -> str:
+    """
+    How quarterly values of a metric combine into an annual value.
+
+    Returns:
+        str: "sum" for flows, "mean" for ratios and rates, "last" for
+        balance-sheet and other point-in-time values.
+    """
+    if metric in FLOW_METRICS:
+        return "sum"
+    if any(
+        word in metric
+        for word in (
+            "ratio",
+            "margin",
+            "yield",
+            "growth",
+            "turnover",
+            "coverage",
+            "return",
+        )
+    ):
+        return "mean"
+    return "last"
+
+
+# Sample data for demonstration. Later years are projected from the last
+# seeded year by _build_sample_store.
 SAMPLE_DATA = {
     2019: [
-        {"quarter": "Q1", "revenue": 200000, ...},
-        {"quarter": "Q2", "revenue": 250000, ...},
-        {"quarter": "Q3", "revenue": 300000, ...},
-        {"quarter": "Q4", "revenue": 250000, ...},
+        {
+            "quarter": "Q1",
+            "revenue": 200000,
+            "cost_of_sales": 120000,
+            "operating_expenses": 40000,
+            "profit": 40000,
+            "net_profit": 30000,
+            "eps": 3.0,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 80.0,
+            "total_assets": 1500000,
+            "current_assets": 510000,
+            "fixed_assets": 990000,
+            "inventory": 120000,
+            "receivables": 180000,
+            "cash_and_equivalents": 150000,
+            "total_liabilities": 700000,
+            "current_liabilities": 300000,
+            "payables": 108000,
+            "long_term_debt": 345000,
+            "shareholders_equity": 800000,
+            "interest_expense": 7500,
+            "operating_cash_flow": 45000,
+            "investing_cash_flow": -24000,
+            "financing_cash_flow": -10000,
+            "capital_expenditure": 20000,
+            "shares_outstanding": 10000,
+            "share_price": 150,
+        },
+        {
+            "quarter": "Q2",
+            "revenue": 250000,
+            "cost_of_sales": 148000,
+            "operating_expenses": 47000,
+            "profit": 55000,
+            "net_profit": 41000,
+            "eps": 4.1,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 82.0,
+            "total_assets": 1540000,
+            "current_assets": 524000,
+            "fixed_assets": 1016000,
+            "inventory": 150000,
+            "receivables": 225000,
+            "cash_and_equivalents": 154000,
+            "total_liabilities": 720000,
+            "current_liabilities": 308000,
+            "payables": 133000,
+            "long_term_debt": 354000,
+            "shareholders_equity": 820000,
+            "interest_expense": 7700,
+            "operating_cash_flow": 62000,
+            "investing_cash_flow": -30000,
+            "financing_cash_flow": -12000,
+            "capital_expenditure": 25000,
+            "shares_outstanding": 10000,
+            "share_price": 155,
+        },
+        {
+            "quarter": "Q3",
+            "revenue": 300000,
+            "cost_of_sales": 175000,
+            "operating_expenses": 55000,
+            "profit": 70000,
+            "net_profit": 52000,
+            "eps": 5.2,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 84.0,
+            "total_assets": 1580000,
+            "current_assets": 537000,
+            "fixed_assets": 1043000,
+            "inventory": 180000,
+            "receivables": 270000,
+            "cash_and_equivalents": 158000,
+            "total_liabilities": 740000,
+            "current_liabilities": 316000,
+            "payables": 158000,
+            "long_term_debt": 363000,
+            "shareholders_equity": 840000,
+            "interest_expense": 7900,
+            "operating_cash_flow": 78000,
+            "investing_cash_flow": -36000,
+            "financing_cash_flow": -15000,
+            "capital_expenditure": 30000,
+            "shares_outstanding": 10000,
+            "share_price": 160,
+        },
+        {
+            "quarter": "Q4",
+            "revenue": 250000,
+            "cost_of_sales": 150000,
+            "operating_expenses": 48000,
+            "profit": 52000,
+            "net_profit": 39000,
+            "eps": 3.9,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 86.0,
+            "total_assets": 1620000,
+            "current_assets": 551000,
+            "fixed_assets": 1069000,
+            "inventory": 150000,
+            "receivables": 225000,
+            "cash_and_equivalents": 162000,
+            "total_liabilities": 760000,
+            "current_liabilities": 324000,
+            "payables": 135000,
+            "long_term_debt": 373000,
+            "shareholders_equity": 860000,
+            "interest_expense": 8100,
+            "operating_cash_flow": 58000,
+            "investing_cash_flow": -30000,
+            "financing_cash_flow": -12000,
+            "capital_expenditure": 25000,
+            "shares_outstanding": 10000,
+            "share_price": 165,
+        },
     ],
     2020: [
-        {"quarter": "Q1", "revenue": 300000, ...},
-        # etc.
+        {
+            "quarter": "Q1",
+            "revenue": 300000,
+            "cost_of_sales": 178000,
+            "operating_expenses": 56000,
+            "profit": 66000,
+            "net_profit": 49000,
+            "eps": 4.9,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 88.0,
+            "total_assets": 1680000,
+            "current_assets": 571000,
+            "fixed_assets": 1109000,
+            "inventory": 180000,
+            "receivables": 270000,
+            "cash_and_equivalents": 168000,
+            "total_liabilities": 800000,
+            "current_liabilities": 336000,
+            "payables": 160000,
+            "long_term_debt": 386000,
+            "shareholders_equity": 880000,
+            "interest_expense": 8400,
+            "operating_cash_flow": 74000,
+            "investing_cash_flow": -36000,
+            "financing_cash_flow": -15000,
+            "capital_expenditure": 30000,
+            "shares_outstanding": 10000,
+            "share_price": 150,
+        },
+        {
+            "quarter": "Q2",
+            "revenue": 280000,
+            "cost_of_sales": 170000,
+            "operating_expenses": 54000,
+            "profit": 56000,
+            "net_profit": 42000,
+            "eps": 4.2,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 90.0,
+            "total_assets": 1720000,
+            "current_assets": 585000,
+            "fixed_assets": 1135000,
+            "inventory": 168000,
+            "receivables": 252000,
+            "cash_and_equivalents": 172000,
+            "total_liabilities": 820000,
+            "current_liabilities": 344000,
+            "payables": 153000,
+            "long_term_debt": 396000,
+            "shareholders_equity": 900000,
+            "interest_expense": 8600,
+            "operating_cash_flow": 63000,
+            "investing_cash_flow": -34000,
+            "financing_cash_flow": -14000,
+            "capital_expenditure": 28000,
+            "shares_outstanding": 10000,
+            "share_price": 155,
+        },
+        {
+            "quarter": "Q3",
+            "revenue": 320000,
+            "cost_of_sales": 190000,
+            "operating_expenses": 60000,
+            "profit": 70000,
+            "net_profit": 52000,
+            "eps": 5.2,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 92.0,
+            "total_assets": 1760000,
+            "current_assets": 598000,
+            "fixed_assets": 1162000,
+            "inventory": 192000,
+            "receivables": 288000,
+            "cash_and_equivalents": 176000,
+            "total_liabilities": 840000,
+            "current_liabilities": 352000,
+            "payables": 171000,
+            "long_term_debt": 405000,
+            "shareholders_equity": 920000,
+            "interest_expense": 8800,
+            "operating_cash_flow": 78000,
+            "investing_cash_flow": -38000,
+            "financing_cash_flow": -16000,
+            "capital_expenditure": 32000,
+            "shares_outstanding": 10000,
+            "share_price": 160,
+        },
+        {
+            "quarter": "Q4",
+            "revenue": 350000,
+            "cost_of_sales": 205000,
+            "operating_expenses": 64000,
+            "profit": 81000,
+            "net_profit": 60000,
+            "eps": 6.0,
+            "dividend_per_share": 1.0,
+            "net_asset_per_share": 94.0,
+            "total_assets": 1800000,
+            "current_assets": 612000,
+            "fixed_assets": 1188000,
+            "inventory": 210000,
+            "receivables": 315000,
+            "cash_and_equivalents": 180000,
+            "total_liabilities": 860000,
+            "current_liabilities": 360000,
+            "payables": 184000,
+            "long_term_debt": 414000,
+            "shareholders_equity": 940000,
+            "interest_expense": 9000,
+            "operating_cash_flow": 90000,
+            "investing_cash_flow": -42000,
+            "financing_cash_flow": -18000,
+            "capital_expenditure": 35000,
+            "shares_outstanding": 10000,
+            "share_price": 165,
+        },
     ],
-    # ...
 }
 
-# Add data for years 2021-2024 with progressive growth
-for year in range(2021, 2025):
-    prev_year = year - 1
-    prev_data = SAMPLE_DATA[prev_year]
-
-    # Calculate new data with growth
-    new_data = []
-    for quarter_data in prev_data:
-        new_quarter_data = {}
-        for key, value in quarter_data.items():
-            if isinstance(value, (int, float)) and value is not None:
-                if "ratio" in key or "margin" in key or "yield" in key:
-                    # Small increase for ratios and margins
-                    new_quarter_data[key] = value * (1 + 0.05)
-                elif "growth" in key:
-                    # Maintain similar growth rates
-                    new_quarter_data[key] = value * 0.9
-                else:
-                    # General growth for other metrics
-                    new_quarter_data[key] = value * (1 + 0.15)
-        new_data.append(new_quarter_data)
-
-    SAMPLE_DATA[year] = new_data
-
-
-def get_financial_data(year: Optional[int] = None) -> Dict[str, Any]:
+
+def _growth_factor(metric: str) -> float:
+    """Annual growth factor applied when projecting a sample metric forward."""
+    if "ratio" in metric or "margin" in metric or "yield" in metric:
+        # Small increase for ratios and margins
+        return 1 + 0.05
+    elif "growth" in metric:
+        # Maintain similar growth rates
+        return 0.9
+    # General growth for other metrics
+    return 1 + 0.15
+
+
+def _build_sample_store(last_year: int = 2024) -> FinancialStore:
+    """
+    Build the sample store, projecting years after the seeded ones with growth.
+
+    Args:
+        last_year (int): The last year to project the sample data to.
+
+    Returns:
+        FinancialStore: Columnar store covering every sample year.
+    """
+    seed = FinancialStore.from_records(SAMPLE_DATA)
+    seed_year = int(seed.years[-1])
+    base = seed.year_slice(seed_year, seed_year)
+    steps = np.arange(1, last_year - seed_year + 1)
+    quarters_per_year = base.stop - base.start
+
+    years = np.concatenate(
+        [seed.years, np.repeat(seed_year + steps, quarters_per_year)]
+    ).astype(seed.years.dtype)
+    quarters = np.concatenate([seed.quarters, np.tile(seed.quarters[base], len(steps))])
+    columns = {}
+    for metric, column in seed.columns.items():
+        # One row of growth multipliers per projected year
+        projected = column[base][None, :] * (_growth_factor(metric) ** steps[:, None])
+        columns[metric] = np.concatenate([column, projected.ravel()])
+
+    return FinancialStore(years, quarters, columns)
+
+
+def load_financial_store(
+    columns_dir: Path = FINANCIAL_COLUMNS_DIR,
+    json_path: Path = FINANCIAL_JSON,
+    sample: bool = True,
+) -> FinancialStore:
+    """
+    Load the financial store from data/processed.
+
+    The memory-mapped column files written by ``convert_financial_json`` are
+    preferred; pages are only read from disk when a query touches them and are
+    shared between every worker process mapping the same files. Without them
+    the store is built from financial_data.json, validated as it is read,
+    and failing that from the sample data. Derived metrics missing from the source are materialized
+    once here, so requests never compute ratios.
+
+    Args:
+        columns_dir (Path): Directory of the converted column files.
+        json_path (Path): Path of financial_data.json.
+        sample (bool): Fall back to the sample data if there is no data.
+
+    Returns:
+        FinancialStore: The loaded store.
+
+    Raises:
+        ValueError: If there is no data and ``sample`` is False, or
+            financial_data.json is invalid.
+    """
+    columns = read_columns(columns_dir)
+    if columns is not None:
+        manifest, arrays = columns
+        store = FinancialStore.from_arrays(arrays, manifest["version"])
+    else:
+        data = read_json(json_path)
+        if data:
+            store = store_from_records(parse_financial_data(data, str(json_path)))
+        elif sample:
+            store = _build_sample_store()
+        else:
+            raise ValueError(f"No financial data found in {json_path}")
+    return materialize_derived_metrics(store)
+
+
+def convert_financial_json(
+    json_path: Path = FINANCIAL_JSON, columns_dir: Path = FINANCIAL_COLUMNS_DIR
+) -> Dict[str, Any]:
+    """
+    Convert financial_data.json into memory-mappable column files.
+
+    This is where data is validated; stores loaded from the column files
+    are trusted as written.
+
+    Args:
+        json_path (Path): Path of financial_data.json.
+        columns_dir (Path): Directory to write the column files to.
+
+    Returns:
+        dict: The manifest of the written columns.
+
+    Raises:
+        ValueError: If the file is missing, empty or invalid.
+    """
+    data = read_json(json_path)
+    if not data:
+        raise ValueError(f"No financial data found in {json_path}")
+    return write_financial_columns(
+        parse_financial_data(data, str(json_path)), columns_dir
+    )
+
+
+def write_financial_columns(
+    records: List[QuarterRecord], columns_dir: Path = FINANCIAL_COLUMNS_DIR
+) -> Dict[str, Any]:
+    """
+    Write validated records, with their derived metrics, as column files.
+
+    Args:
+        records (list): Records from ``parse_financial_data``.
+        columns_dir (Path): Directory to write the column files to.
+
+    Returns:
+        dict: The manifest of the written columns.
+    """
+    return write_store_columns(
+        materialize_derived_metrics(store_from_records(records)), columns_dir
+    )
+
+
+# Subdirectory of a company's column files holding its annual figures
+ANNUAL_DIR = "annual"
+
+
+def write_store_columns(
+    store: FinancialStore, columns_dir: Path = FINANCIAL_COLUMNS_DIR
+) -> Dict[str, Any]:
+    """
+    Write a store, and its annual figures for screening, as column files.
+
+    Args:
+        store (FinancialStore): The store, with its derived metrics.
+        columns_dir (Path): Directory to write the column files to.
+
+    Returns:
+        dict: The manifest of the written columns.
+    """
+    years, metrics, values = annual_table(store)
+    write_columns(
+        Path(columns_dir) / ANNUAL_DIR,
+        {"years": years, "values": values},
+        metadata={"metrics": metrics, "data_version": store.version},
+    )
+    return write_columns(columns_dir, store.to_arrays(), version=store.version)
+
+
+def annual_table(store: FinancialStore) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    Aggregate every year of a store's advertised metrics.
+
+    Args:
+        store (FinancialStore): The store to aggregate.
+
+    Returns:
+        tuple: The years, the advertised metrics, and their annual values
+        with one row per year and one column per metric, NaN where the
+        store lacks a metric.
+    """
+    metrics = advertised_metrics()
+    available = [metric for metric in metrics if metric in store.columns]
+    methods = {metric: annual_aggregation(metric) for metric in available}
+    years, annual = store.aggregate_years(slice(None), available, methods)
+    values = np.full((len(years), len(metrics)), np.nan)
+    for metric in available:
+        values[:, metrics.index(metric)] = annual[metric]
+    return years, metrics, values
+
+
+def read_annual_table(
+    columns_dir: Path,
+) -> Optional[Tuple[np.ndarray, List[str], np.ndarray]]:
+    """
+    Memory-map the annual figures written by ``write_store_columns``.
+
+    Args:
+        columns_dir (Path): Directory of a company's column files.
+
+    Returns:
+        tuple: As returned by ``annual_table``, or None if the figures were
+        not written along with the current column files.
+    """
+    manifest = read_json(Path(columns_dir) / MANIFEST_NAME)
+    annual = read_columns(Path(columns_dir) / ANNUAL_DIR)
+    if manifest is None or annual is None:
+        return None
+    annual_manifest, arrays = annual
+    if annual_manifest.get("data_version") != manifest["version"]:
+        return None
+    return arrays["years"], annual_manifest["metrics"], arrays["values"]
+
+
+# Company identifiers are also directory names under COMPANIES_DIR
+COMPANY_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,31}$")
+
+# Quarterly rows materialized at a time when streaming a range
+STREAM_CHUNK_ROWS = 1024
+
+
+class _LoadedStore:
+    """A company's loaded store with the file stamp it was loaded from."""
+
+    __slots__ = ("store", "stamp", "checked_at")
+
+    def __init__(self, store: FinancialStore, stamp: Any):
+        self.store = store
+        self.stamp = stamp
+        self.checked_at = time.monotonic()
+
+
+# Loaded stores by company; the least recently used are evicted when full
+_STORES = LRUCache(COMPANY_CACHE_SIZE, "financial_stores")
+_RELOAD_LISTENERS: List[Callable[[FinancialStore], None]] = []
+_CHANGE_LISTENERS: List[Callable[[str, FinancialStore, FinancialStore], None]] = []
+
+
+def company_paths(company: str) -> Tuple[Path, Path]:
+    """
+    Return the column directory and JSON path holding a company's data.
+
+    The default company uses the top level of data/processed; every other
+    company has its own partition under data/processed/companies.
+
+    Args:
+        company (str): The company identifier.
+
+    Returns:
+        tuple: The column files directory and the financial_data.json path.
+    """
+    if company == DEFAULT_COMPANY:
+        return FINANCIAL_COLUMNS_DIR, FINANCIAL_JSON
+    directory = COMPANIES_DIR / company
+    return directory / "financial", directory / "financial_data.json"
+
+
+def company_exists(company: str) -> bool:
+    """Return True if ``company`` is the default company or has stored data."""
+    if company == DEFAULT_COMPANY:
+        return True
+    if not COMPANY_PATTERN.match(company):
+        return False
+    columns_dir, json_path = company_paths(company)
+    return (columns_dir / MANIFEST_NAME).exists() or json_path.exists()
+
+
+def list_companies() -> List[str]:
+    """Return the default company followed by every partitioned company, sorted."""
+    companies = []
+    if COMPANIES_DIR.is_dir():
+        companies = sorted(
+            path.name
+            for path in COMPANIES_DIR.iterdir()
+            if path.is_dir()
+            and path.name != DEFAULT_COMPANY
+            and company_exists(path.name)
+        )
+    return [DEFAULT_COMPANY] + companies
+
+
+def data_stamp(company: str) -> Any:
+    """Return a cheap stamp of a company's files that changes when they do."""
+    columns_dir, json_path = company_paths(company)
+    return path_stamp(columns_dir / MANIFEST_NAME, json_path)
+
+
+def get_store(company: str = DEFAULT_COMPANY) -> FinancialStore:
+    """
+    Return a company's financial store, loading it on first use.
+
+    Every DATA_RELOAD_INTERVAL seconds the processed files are checked for
+    changes written by another process, such as an ingestion run, and the
+    store is reloaded if they changed. Only the COMPANY_CACHE_SIZE most
+    recently used companies stay loaded.
+
+    Args:
+        company (str): The company identifier.
+
+    Raises:
+        KeyError: If the company has no data.
+    """
+    entry = _STORES.get(company)
+    if entry is None:
+        return reload_financial_data(company)
+    now = time.monotonic()
+    if now - entry.checked_at >= DATA_RELOAD_INTERVAL:
+        entry.checked_at = now
+        if data_stamp(company) != entry.stamp:
+            return reload_financial_data(company)
+    return entry.store
+
+
+def reload_financial_data(company: str = DEFAULT_COMPANY) -> FinancialStore:
+    """
+    Load a company's current data/processed contents, replacing its loaded store.
+
+    Listeners registered with ``on_financial_reload`` are called with the new
+    store when its version differs from the one it replaces, then those
+    registered with ``on_company_change``.
+
+    Raises:
+        KeyError: If the company has no data.
+    """
+    if not company_exists(company):
+        raise KeyError(f"Unknown company: {company}")
+    stamp = data_stamp(company)
+    columns_dir, json_path = company_paths(company)
+    store = load_financial_store(
+        columns_dir, json_path, sample=company == DEFAULT_COMPANY
+    )
+    previous = _STORES.get(company)
+    _STORES.set(company, _LoadedStore(store, stamp))
+    if previous is not None and previous.store.version != store.version:
+        for listener in list(_RELOAD_LISTENERS):
+            listener(store)
+        for change_listener in list(_CHANGE_LISTENERS):
+            change_listener(company, previous.store, store)
+    return store
+
+
+def loaded_versions() -> Dict[str, str]:
+    """Return the data version of every loaded company, without loading any."""
+    return {company: entry.store.version for company, entry in _STORES.items()}
+
+
+def refresh_stores(companies: Optional[List[str]] = None) -> List[str]:
+    """
+    Reload the loaded stores whose files changed, without waiting for a request.
+
+    Unlike ``get_store``, this neither loads companies that are not loaded
+    nor marks the checked ones as recently used.
+
+    Args:
+        companies (list, optional): Companies to check. Defaults to every
+            loaded company.
+
+    Returns:
+        list: The companies that were reloaded.
+    """
+    reloaded = []
+    for company, entry in _STORES.items():
+        if companies is not None and company not in companies:
+            continue
+        entry.checked_at = time.monotonic()
+        if data_stamp(company) != entry.stamp and company_exists(company):
+            reload_financial_data(company)
+            reloaded.append(company)
+    return reloaded
+
+
+def ensure_store_version(
+    version: str, company: str = DEFAULT_COMPANY
+) -> FinancialStore:
+    """
+    Return a company's store, reloading it first if it is not at ``version``.
+
+    Worker processes check for new data on their own schedule; tasks that
+    must see the same data as the process that submitted them call this
+    with the submitter's version.
+    """
+    store = get_store(company)
+    if store.version != version:
+        store = reload_financial_data(company)
+    return store
+
+
+def on_financial_reload(
+    listener: Callable[[FinancialStore], None]
+) -> Callable[[FinancialStore], None]:
+    """Register ``listener`` to be called with the store after a data change."""
+    _RELOAD_LISTENERS.append(listener)
+    return listener
+
+
+def on_company_change(
+    listener: Callable[[str, FinancialStore, FinancialStore], None]
+) -> Callable[[str, FinancialStore, FinancialStore], None]:
+    """
+    Register ``listener`` to be called after a company's data changes.
+
+    It is called with the company, the replaced store and the new store.
+    """
+    _CHANGE_LISTENERS.append(listener)
+    return listener
+
+
+@timed("data.slice")
+def _select_rows(
+    store: FinancialStore,
+    rows: slice,
+    metrics: Optional[List[str]],
+    granularity: str,
+) -> List[Dict[str, Any]]:
+    """Materialize store rows with the requested columns and granularity."""
+    if granularity == "year":
+        names = store.metrics if metrics is None else metrics
+        methods = {metric: annual_aggregation(metric) for metric in names}
+        return store.to_annual_records(rows, names, methods)
+    return store.to_records(rows, metrics)
+
+
+def get_financial_data(
+    year: Optional[int] = None,
+    metrics: Optional[List[str]] = None,
+    granularity: str = "quarter",
+    company: str = DEFAULT_COMPANY,
+) -> Dict[str, Any]:
     """
     Get financial data for a specific year.
 
     Args:
         year (int, optional): The year to get data for.
+        metrics (list, optional): Metrics to include. Defaults to all.
+        granularity (str): "quarter" for one record per quarter, or "year"
+            for a single record aggregated over the year.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
 
     Returns:
         dict: Financial data for the specified year.
     """
     if year is not None:
-        if year in SAMPLE_DATA:
-            return SAMPLE_DATA[year]
+        store = get_store(company)
+        rows = store.year_slice(year, year)
+        if rows.stop > rows.start:
+            return _select_rows(store, rows, metrics, granularity)
         return {}
     return {}
 
 
-def get_financial_data_range(start_year: int, end_year: int) -> List[Dict[str, Any]]:
+def get_annual_history(
+    metrics: List[str],
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    company: str = DEFAULT_COMPANY,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Get annual values of metrics, aggregated from the quarterly data.
+
+    Args:
+        metrics (list): The metrics to aggregate.
+        start_year (int, optional): First year to include. Defaults to the first stored.
+        end_year (int, optional): Last year to include. Defaults to the last stored.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        tuple: Array of years and a mapping of metric to annual values.
+    """
+    store = get_store(company)
+    rows = store.year_slice(
+        start_year if start_year is not None else int(store.years[0]),
+        end_year if end_year is not None else int(store.years[-1]),
+    )
+    methods = {metric: annual_aggregation(metric) for metric in metrics}
+    return store.aggregate_years(rows, metrics, methods)
+
+
+def get_quarterly_history(
+    metrics: List[str],
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    company: str = DEFAULT_COMPANY,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Get quarterly values of metrics laid out as one row per year.
+
+    Args:
+        metrics (list): The metrics to lay out.
+        start_year (int, optional): First year to include. Defaults to the first stored.
+        end_year (int, optional): Last year to include. Defaults to the last stored.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        tuple: Array of years and a mapping of metric to an array of shape
+        (years, 4), NaN for quarters that are not stored.
+    """
+    store = get_store(company)
+    rows = store.year_slice(
+        start_year if start_year is not None else int(store.years[0]),
+        end_year if end_year is not None else int(store.years[-1]),
+    )
+    years, positions = np.unique(store.years[rows], return_inverse=True)
+    quarters = store.quarters[rows].astype(np.int64) - 1
+    history = {}
+    for metric in metrics:
+        values = np.full((len(years), len(QUARTERS)), np.nan)
+        values[positions, quarters] = store.column(metric, rows)
+        history[metric] = values
+    return years.astype(np.int64), history
+
+
+def get_financial_data_range(
+    start_year: int,
+    end_year: int,
+    metrics: Optional[List[str]] = None,
+    granularity: str = "quarter",
+    company: str = DEFAULT_COMPANY,
+) -> List[Dict[str, Any]]:
     """
     Get financial data for a range of years.
 
     Args:
         start_year (int): The start year of the range.
         end_year (int): The end year of the range.
+        metrics (list, optional): Metrics to include. Defaults to all.
+        granularity (str): "quarter" for one record per quarter, or "year"
+            for one record per year.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
 
     Returns:
         list: List of financial data for the specified year range.
     """
-    result = []
-    for year in range(start_year, end_year + 1):
-        if year in SAMPLE_DATA:
-            result.extend(SAMPLE_DATA[year])
-    return result
+    store = get_store(company)
+    return _select_rows(
+        store, store.year_slice(start_year, end_year), metrics, granularity
+    )
+
+
+def iter_financial_data_range(
+    start_year: int,
+    end_year: int,
+    metrics: Optional[List[str]] = None,
+    granularity: str = "quarter",
+    company: str = DEFAULT_COMPANY,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the financial data for a range of years in chunks of whole years.
+
+    Only one chunk of records exists at a time, so memory use does not grow
+    with the size of the range. The store is resolved once, so a reload
+    during iteration does not mix data versions.
+
+    Args:
+        start_year (int): The start year of the range.
+        end_year (int): The end year of the range.
+        metrics (list, optional): Metrics to include. Defaults to all.
+        granularity (str): "quarter" for one record per quarter, or "year"
+            for one record per year.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+        chunk_rows (int): Approximate number of quarterly rows per chunk.
+
+    Yields:
+        list: Consecutive records of the range.
+    """
+    store = get_store(company)
+    for rows in store.year_chunks(store.year_slice(start_year, end_year), chunk_rows):
+        yield _select_rows(store, rows, metrics, granularity)
+
+
+def _ratio(
+    numerator: np.ndarray, denominator: np.ndarray, scale: float = 1.0
+) -> np.ndarray:
+    """Element-wise ``numerator / denominator * scale``, NaN where undefined."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / denominator * scale
+    return np.where(denominator == 0, np.nan, result)
+
+
+def _lag_rows(years: np.ndarray, quarters: np.ndarray, lag: int) -> np.ndarray:
+    """
+    Row index of the quarter ``lag`` quarters before each row, -1 if absent.
+
+    Rows must be sorted by (year, quarter) with at most one row per quarter.
+    """
+    period = years.astype(np.int64) * 4 + (quarters.astype(np.int64) - 1)
+    target = period - lag
+    rows = np.minimum(np.searchsorted(period, target), max(len(period) - 1, 0))
+    found = (len(period) > 0) & (period[rows] == target)
+    return np.where(found, rows, -1)
+
+
+def _lagged(column: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Values of ``column`` at ``rows`` from ``_lag_rows``, NaN where absent."""
+    return np.where(rows >= 0, column[rows], np.nan)
+
+
+# Metrics computed by ``derive_metrics``
+DERIVED_METRICS = (
+    "gross_profit_margin",
+    "operating_margin",
+    "net_profit_margin",
+    "return_on_equity",
+    "return_on_assets",
+    "book_value_per_share",
+    "net_asset_per_share",
+    "current_ratio",
+    "quick_ratio",
+    "cash_ratio",
+    "working_capital",
+    "asset_turnover",
+    "inventory_turnover",
+    "receivables_turnover",
+    "payables_turnover",
+    "debt_to_equity",
+    "debt_ratio",
+    "interest_coverage",
+    "revenue_growth",
+    "profit_growth",
+    "asset_growth",
+    "free_cash_flow",
+    "market_cap",
+    "enterprise_value",
+    "pe_ratio",
+    "pb_ratio",
+    "dividend_yield",
+)
+
+
+def derive_metrics(
+    years: np.ndarray, quarters: np.ndarray, columns: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every derived metric advertised by /api/financial/metrics.
+
+    Each metric is one vectorized expression over whole columns, so all
+    years and quarters are derived in a single pass. Values are NaN where an
+    input is missing or a denominator is zero. Growth rates compare each
+    quarter with the same quarter of the previous year; P/E and dividend
+    yield use trailing four-quarter EPS and dividends.
+
+    Args:
+        years (ndarray): Year of each row, sorted together with ``quarters``.
+        quarters (ndarray): Quarter number (1-4) of each row.
+        columns (dict): Raw metric columns aligned with ``years``.
+
+    Returns:
+        dict: Mapping of derived metric name to its column.
+    """
+    size = len(years)
+
+    def column(name: str) -> np.ndarray:
+        if name in columns:
+            return np.asarray(columns[name], dtype=np.float64)
+        return np.full(size, np.nan)
+
+    revenue = column("revenue")
+    cost_of_sales = column("cost_of_sales")
+    operating_expenses = column("operating_expenses")
+    profit = column("profit")
+    net_profit = column("net_profit")
+    total_assets = column("total_assets")
+    current_assets = column("current_assets")
+    current_liabilities = column("current_liabilities")
+    total_liabilities = column("total_liabilities")
+    equity = column("shareholders_equity")
+    cash = column("cash_and_equivalents")
+    inventory = column("inventory")
+    long_term_debt = column("long_term_debt")
+    shares = column("shares_outstanding")
+    share_price = column("share_price")
+
+    year_ago = _lag_rows(years, quarters, 4)
+    trailing = [_lag_rows(years, quarters, lag) for lag in range(4)]
+    trailing_eps = sum(_lagged(column("eps"), rows) for rows in trailing)
+    trailing_dividends = sum(
+        _lagged(column("dividend_per_share"), rows) for rows in trailing
+    )
+
+    def growth(values: np.ndarray) -> np.ndarray:
+        previous = _lagged(values, year_ago)
+        return _ratio(values - previous, np.abs(previous), 100)
+
+    book_value_per_share = _ratio(equity, shares)
+    market_cap = share_price * shares
+    return {
+        "gross_profit_margin": _ratio(revenue - cost_of_sales, revenue, 100),
+        "operating_margin": _ratio(revenue - operating_expenses, revenue, 100),
+        "net_profit_margin": _ratio(net_profit, revenue, 100),
+        "return_on_equity": _ratio(net_profit, equity, 100),
+        "return_on_assets": _ratio(net_profit, total_assets, 100),
+        "book_value_per_share": book_value_per_share,
+        "net_asset_per_share": book_value_per_share,
+        "current_ratio": _ratio(current_assets, current_liabilities),
+        "quick_ratio": _ratio(current_assets - inventory, current_liabilities),
+        "cash_ratio": _ratio(cash, current_liabilities),
+        "working_capital": current_assets - current_liabilities,
+        "asset_turnover": _ratio(revenue, total_assets),
+        "inventory_turnover": _ratio(cost_of_sales, inventory),
+        "receivables_turnover": _ratio(revenue, column("receivables")),
+        "payables_turnover": _ratio(cost_of_sales, column("payables")),
+        "debt_to_equity": _ratio(long_term_debt, equity),
+        "debt_ratio": _ratio(total_liabilities, total_assets),
+        "interest_coverage": _ratio(profit, column("interest_expense")),
+        "revenue_growth": growth(revenue),
+        "profit_growth": growth(net_profit),
+        "asset_growth": growth(total_assets),
+        "free_cash_flow": column("operating_cash_flow") - column("capital_expenditure"),
+        "market_cap": market_cap,
+        "enterprise_value": market_cap + long_term_debt - cash,
+        "pe_ratio": _ratio(share_price, trailing_eps),
+        "pb_ratio": _ratio(share_price, book_value_per_share),
+        "dividend_yield": _ratio(trailing_dividends, share_price, 100),
+    }
+
+
+@timed("data.derive")
+def materialize_derived_metrics(store: FinancialStore) -> FinancialStore:
+    """
+    Add every derived metric the store does not hold yet as a column.
+
+    Stored columns, such as raw values reported for a derived metric or
+    derived columns already persisted by ``convert_financial_json``, are
+    kept as they are. A store holding every derived metric, such as one
+    mapped from converted column files, is returned without reading its
+    columns.
+
+    Args:
+        store (FinancialStore): The store to extend.
+
+    Returns:
+        FinancialStore: The same store, for chaining.
+    """
+    if all(metric in store.columns for metric in DERIVED_METRICS):
+        return store
+    derived = derive_metrics(store.years, store.quarters, store.columns)
+    for metric, values in derived.items():
+        if metric not in store.columns:
+            store.columns[metric] = values
+    return store
 
 
 def calculate_derived_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calculate derived financial metrics.
 
+    Only metrics computable from a single quarter are included; growth rates
+    and trailing ratios need the quarter's history and are materialized on
+    the store instead. The input is not modified.
+
     Args:
         data (dict): Raw financial data.
 
@@ -91,16 +1133,14 @@ def calculate_derived_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
     if not data:
         return {}
 
-    # Calculate gross profit margin
-    if "revenue" in data and "cost_of_sales" in data:
-        data["gross_profit_margin"] = (
-            (data["revenue"] - data["cost_of_sales"]) / data["revenue"]
-        ) * 100
-
-    # Calculate operating margin
-    if "revenue" in data and "operating_expenses" in data:
-        data["operating_margin"] = (
-            (data["revenue"] - data["operating_expenses"]) / data["revenue"]
-        ) * 100
-
-    return data
+    columns = {
+        key: np.array([value], dtype=np.float64)
+        for key, value in data.items()
+        if isinstance(value, (int, float))
+    }
+    derived = derive_metrics(np.array([0]), np.array([1]), columns)
+    result = dict(data)
+    for metric, values in derived.items():
+        if metric not in result and not np.isnan(values[0]):
+            result[metric] = float(values[0])
+    return result
@@ -0,0 +1,302 @@
+import asyncio
+import collections
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Set, Tuple
+from app.services import ai_service
+from app.services.data_processor import (
+    loaded_versions,
+    on_company_change,
+    refresh_stores,
+)
+from app.services.financial_store import FinancialStore, diff_stores
+from app.services.shareholder_processor import (
+    ShareholderStore,
+    get_shareholder_store,
+    on_shareholder_reload,
+    refresh_shareholder_store,
+)
+from app.utils.config import (
+    DATA_RELOAD_INTERVAL,
+    EVENT_HISTORY_SIZE,
+    EVENT_KEEPALIVE,
+    EVENT_QUEUE_SIZE,
+)
+from app.utils.http_cache import serialize
+from app.utils.metrics import register_stats
+
+# Sent to idle connections so proxies do not close them; not an event
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+# Queue items are (event id, frame); frames that are not events have id 0
+Item = Tuple[int, bytes]
+
+
+def format_event(event_id: int, kind: str, data: Any) -> bytes:
+    """Format one server-sent event frame."""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        event_id,
+        kind.encode("utf-8"),
+        serialize(data),
+    )
+
+
+class Broadcaster:
+    """
+    Fans events out from one in-process publisher to every live session.
+
+    Each event is serialized to its frame once, however many sessions
+    receive it, and handed to every session's bounded queue on the event
+    loop, so an idle session costs one queue and one suspended coroutine.
+    A session that falls ``queue_size`` events behind gets a single
+    "resync" event in place of its backlog, telling it to refetch.
+
+    The last ``history_size`` events are kept, so a session reconnecting
+    with the id of the last event it saw is sent the ones it missed.
+    ``publish`` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = EVENT_QUEUE_SIZE,
+        history_size: int = EVENT_HISTORY_SIZE,
+        name: str = "events",
+    ):
+        self.queue_size = queue_size
+        self.name = name
+        self.published = 0
+        self.resyncs = 0
+        self._history: Deque[Item] = collections.deque(maxlen=history_size)
+        self._next_id = 1
+        self._queues: Set["asyncio.Queue[Item]"] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        register_stats("events", self.stats)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._queues)
+
+    def publish(self, kind: str, data: Any) -> int:
+        """
+        Publish an event to every session.
+
+        Args:
+            kind (str): The event type, e.g. "financial".
+            data: JSON-compatible event payload.
+
+        Returns:
+            int: The id of the event.
+        """
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            frame = format_event(event_id, kind, data)
+            self._history.append((event_id, frame))
+            self.published += 1
+            loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._deliver, event_id, frame)
+            except RuntimeError:
+                # The loop sessions were served on has closed
+                pass
+        return event_id
+
+    def keepalive(self) -> None:
+        """Send a keep-alive comment to every session; call on the event loop."""
+        for queue in list(self._queues):
+            if not queue.full():
+                queue.put_nowait((0, KEEPALIVE_FRAME))
+
+    def _deliver(self, event_id: int, frame: bytes) -> None:
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait((event_id, frame))
+            except asyncio.QueueFull:
+                self._resync(queue, event_id)
+
+    def _resync(self, queue: "asyncio.Queue[Item]", event_id: int) -> None:
+        """Replace a session's backlog with a "resync" event."""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait((event_id, format_event(event_id, "resync", {})))
+        self.resyncs += 1
+
+    def subscribe(
+        self, last_event_id: Optional[int] = None
+    ) -> Tuple["asyncio.Queue[Item]", int]:
+        """
+        Open a session on the running event loop.
+
+        Args:
+            last_event_id (int, optional): Id of the last event the session
+                saw before reconnecting. The events after it are queued at
+                once, or a "resync" event if they are no longer all kept.
+
+        Returns:
+            tuple: The session's queue, and the id of the last event it has
+            been sent; queued items up to that id are duplicates to skip.
+        """
+        self._loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Item]" = asyncio.Queue(self.queue_size)
+        with self._lock:
+            latest = self._next_id - 1
+            last = latest
+            if last_event_id is not None and last_event_id != latest:
+                missed = [item for item in self._history if item[0] > last_event_id]
+                if (
+                    last_event_id < latest
+                    and len(missed) == latest - last_event_id
+                    and len(missed) < self.queue_size
+                ):
+                    for item in missed:
+                        queue.put_nowait(item)
+                    last = last_event_id
+                else:
+                    # Also after a restart, when ids start again from 1
+                    self._resync(queue, latest)
+                    last = latest - 1
+            self._queues.add(queue)
+        return queue, last
+
+    async def stream(
+        self,
+        last_event_id: Optional[int] = None,
+        first: Optional[Callable[[], bytes]] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the frames of one session until it is closed.
+
+        Args:
+            last_event_id (int, optional): As for ``subscribe``.
+            first (callable, optional): Returns a frame to send before any
+                event. It is called once the session is subscribed, so an
+                event published while it runs is still sent after it.
+        """
+        queue, last = self.subscribe(last_event_id)
+        try:
+            if first is not None:
+                yield first()
+            while True:
+                event_id, frame = await queue.get()
+                if event_id and event_id <= last:
+                    continue
+                last = max(last, event_id)
+                yield frame
+        finally:
+            self._queues.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the session and event counters of the broadcaster."""
+        return {
+            "name": self.name,
+            "subscribers": len(self._queues),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+
+# Publisher of the live updates served by /api/events
+BROADCASTER = Broadcaster()
+
+
+@on_company_change
+def publish_financial_change(
+    company: str, previous: FinancialStore, store: FinancialStore
+) -> None:
+    """Publish a company's new data version and what changed in it."""
+    BROADCASTER.publish(
+        "financial",
+        {
+            "company": company,
+            "version": store.version,
+            "previous_version": previous.version,
+            "delta": diff_stores(previous, store),
+        },
+    )
+
+
+@on_shareholder_reload
+def publish_shareholder_change(store: ShareholderStore) -> None:
+    """Publish the new shareholder data version."""
+    BROADCASTER.publish("shareholders", {"version": store.version})
+
+
+@ai_service.on_registry_reload
+def publish_models_change(
+    previous: Optional[Dict[str, Any]], registry: Optional[Dict[str, Any]]
+) -> None:
+    """Publish newly trained models and the metrics whose model changed."""
+    before = {
+        metric: model["kind"]
+        for metric, model in (previous or {}).get("models", {}).items()
+    }
+    after = {
+        metric: model["kind"]
+        for metric, model in (registry or {}).get("models", {}).items()
+    }
+    BROADCASTER.publish(
+        "models",
+        {
+            "version": registry["version"] if registry else None,
+            "trained_at": registry["trained_at"] if registry else None,
+            "data_version": registry["data_version"] if registry else None,
+            "changed": {m: kind for m, kind in after.items() if before.get(m) != kind},
+            "removed": [m for m in before if m not in after],
+        },
+    )
+
+
+def current_versions() -> Dict[str, Any]:
+    """Return the versions a new session starts from."""
+    registry = ai_service.get_model_registry()
+    return {
+        "financial": loaded_versions(),
+        "shareholders": get_shareholder_store().version,
+        "models": registry["version"] if registry else None,
+    }
+
+
+def check_for_updates() -> Dict[str, Any]:
+    """
+    Reload whatever data and models changed on disk, publishing the changes.
+
+    Returns:
+        dict: The reloaded "financial" companies, and whether the
+        "shareholders" and "models" were reloaded.
+    """
+    return {
+        "financial": refresh_stores(),
+        "shareholders": refresh_shareholder_store(),
+        "models": ai_service.refresh_model_registry(),
+    }
+
+
+async def watch_for_updates(
+    interval: float = DATA_RELOAD_INTERVAL, keepalive: float = EVENT_KEEPALIVE
+) -> None:
+    """
+    Check for changes and keep connections alive while sessions are open.
+
+    Data written by another process is otherwise only noticed when a
+    request reads it. One watcher per worker serves every session; it does
+    nothing while none are connected.
+
+    Args:
+        interval (float): Seconds between checks for changed files.
+        keepalive (float): Seconds between keep-alive comments.
+    """
+    loop = asyncio.get_running_loop()
+    next_check = next_keepalive = time.monotonic()
+    while True:
+        await asyncio.sleep(max(min(interval, keepalive), 0.1))
+        if not BROADCASTER.subscribers:
+            continue
+        now = time.monotonic()
+        if now >= next_check:
+            next_check = now + interval
+            await loop.run_in_executor(None, check_for_updates)
+        if now >= next_keepalive:
+            next_keepalive = now + keepalive
+            BROADCASTER.keepalive()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.utils.config import CPU_QUEUE_SIZE, CPU_WORKERS
+from app.utils.metrics import collect_spans, merge_spans, register_stats
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when an executor already holds as many tasks as it may queue."""
+
+
+class BoundedExecutor:
+    """
+    Executor that admits a bounded number of running and queued tasks.
+
+    Submitting beyond ``max_pending`` tasks raises ``ExecutorBusy`` at once
+    instead of queueing without limit, so callers can shed load (the API
+    answers 503) while the tasks already admitted finish in predictable time.
+    The underlying pool is created on first use.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        factory: Callable[..., Executor] = ProcessPoolExecutor,
+        name: Optional[str] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self.name = name
+        self.rejected = 0
+        self._factory = factory
+        self._pool: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        register_stats("executor", self.stats)
+
+    @property
+    def pool(self) -> Executor:
+        """The underlying executor, created on first use."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._factory(max_workers=self.max_workers)
+            return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule ``fn(*args, **kwargs)`` if there is room for it.
+
+        Raises:
+            ExecutorBusy: If ``max_pending`` tasks are already running or queued.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise ExecutorBusy(f"{self.name or 'executor'} is busy")
+        try:
+            future = self.pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on the executor and await its result without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the underlying pool down; it is recreated if used again."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size, load and rejection count of the executor."""
+        return {
+            "name": self.name,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self.rejected,
+        }
+
+
+# Process pool for CPU-bound request work such as forecasting
+CPU_EXECUTOR = BoundedExecutor(CPU_WORKERS, CPU_QUEUE_SIZE, name="cpu")
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a CPU-bound function in the worker process pool.
+
+    ``fn`` and its arguments must be picklable, i.e. module-level functions
+    and plain data. Service spans timed in the worker are recorded here.
+
+    Raises:
+        ExecutorBusy: If the pool's queue is full.
+    """
+    result, spans = await CPU_EXECUTOR.run(collect_spans, fn, *args, **kwargs)
+    merge_spans(spans)
+    return result
@@ -0,0 +1,91 @@
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from app.utils.config import EXTRACTION_CACHE_DIR
+from app.utils.file_utils import read_json, write_json
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of annual report extraction results.
+
+    Whole reports are keyed by the SHA-256 of the PDF, so an unchanged file
+    is answered without opening it. Pages are keyed by a digest of their
+    content streams, so when a report is replaced by a revised edition only
+    the pages that actually changed are scanned and extracted again.
+
+    Layout under ``directory``:
+        files/<file digest>.json   page digests and extracted figures
+        pages/<page digest>.json   statement type and extracted tables
+        ingested.json              digest of each report last merged
+    """
+
+    def __init__(self, directory: Path = EXTRACTION_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _file_path(self, digest: str) -> Path:
+        return self.directory / "files" / f"{digest}.json"
+
+    def _page_path(self, digest: str) -> Path:
+        return self.directory / "pages" / f"{digest}.json"
+
+    def get_file(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a whole report, if any."""
+        return read_json(self._file_path(digest))
+
+    def put_file(
+        self,
+        digest: str,
+        pages: List[str],
+        figures: Dict[int, Dict[str, float]],
+    ) -> None:
+        """
+        Cache the result of extracting a whole report.
+
+        Args:
+            digest (str): File content digest.
+            pages (list): Page content digests, in page order.
+            figures (dict): Mapping of fiscal year to extracted metric values.
+        """
+        write_json(
+            self._file_path(digest),
+            {
+                "pages": pages,
+                "figures": {str(year): values for year, values in figures.items()},
+            },
+        )
+
+    def get_page(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entry for a page, if any.
+
+        The entry holds the page's "statement" type (None for non-statement
+        pages) and, once extracted, its "tables".
+        """
+        return read_json(self._page_path(digest))
+
+    def put_page(
+        self,
+        digest: str,
+        statement: Optional[str],
+        tables: Optional[List[List[List[str]]]] = None,
+    ) -> None:
+        """Cache the scan result and extracted tables of a page."""
+        write_json(self._page_path(digest), {"statement": statement, "tables": tables})
+
+    def ingested(self) -> Dict[str, str]:
+        """Return the file digest of each report as of the last merge."""
+        return read_json(self.directory / "ingested.json", {})
+
+    def mark_ingested(self, digests: Dict[str, str]) -> None:
+        """Record the file digests of the reports merged into data/processed."""
+        write_json(self.directory / "ingested.json", digests)
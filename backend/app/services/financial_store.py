@@ -0,0 +1,303 @@
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.utils.file_utils import columns_version
+
+QUARTERS = ("Q1", "Q2", "Q3", "Q4")
+
+
+def quarter_label(quarter: int) -> str:
+    """Return the "Qn" label for a 1-based quarter number."""
+    return QUARTERS[quarter - 1]
+
+
+def quarter_number(label: str) -> int:
+    """Return the 1-based quarter number for a "Qn" label."""
+    return QUARTERS.index(label) + 1
+
+
+def _to_list(column: np.ndarray) -> List[Optional[float]]:
+    """Convert a column to Python floats, with None for missing values."""
+    if np.isnan(column).any():
+        return [None if np.isnan(v) else v for v in column.tolist()]
+    return column.tolist()
+
+
+class FinancialStore:
+    """
+    Column-oriented store of quarterly financial metrics.
+
+    Rows are kept sorted by (year, quarter) and every metric is a single
+    float64 array aligned with the ``years`` and ``quarters`` index arrays,
+    so the rows of a range of years are one contiguous slice of every column.
+    Missing values are stored as NaN and surface as ``None`` in records.
+
+    The arrays may be read-only memory maps; the store never writes to them.
+    ``version`` is a content hash that changes whenever the data does.
+    """
+
+    INDEX_COLUMNS = ("years", "quarters")
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        quarters: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        version: Optional[str] = None,
+    ):
+        self.years = years
+        self.quarters = quarters
+        self.columns = columns
+        self.version = version or columns_version(self.to_arrays())
+
+    @classmethod
+    def from_records(cls, data: Dict[int, List[Dict[str, Any]]]) -> "FinancialStore":
+        """
+        Build a store from year-keyed lists of quarter dicts.
+
+        Args:
+            data (dict): Mapping of year to a list of quarter dicts, each with a
+                "quarter" label and numeric metric values.
+
+        Returns:
+            FinancialStore: Store holding the same data in columnar form.
+        """
+        rows = sorted(
+            (int(year), quarter_number(item["quarter"]), item)
+            for year, items in data.items()
+            for item in items
+        )
+        metrics: List[str] = []
+        for _, _, item in rows:
+            for key, value in item.items():
+                if key not in ("quarter", "year") and key not in metrics:
+                    if isinstance(value, (int, float)):
+                        metrics.append(key)
+
+        years = np.array([row[0] for row in rows], dtype=np.int16)
+        quarters = np.array([row[1] for row in rows], dtype=np.int8)
+        columns = {
+            metric: np.array(
+                [row[2].get(metric, np.nan) for row in rows], dtype=np.float64
+            )
+            for metric in metrics
+        }
+        return cls(years, quarters, columns)
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, np.ndarray], version: Optional[str] = None
+    ) -> "FinancialStore":
+        """
+        Build a store from the flat array mapping produced by ``to_arrays``.
+
+        Args:
+            arrays (dict): Index arrays under "years" and "quarters" plus one
+                array per metric.
+            version (str, optional): Known content version of the arrays.
+
+        Returns:
+            FinancialStore: Store wrapping the arrays without copying them.
+        """
+        columns = {
+            name: array
+            for name, array in arrays.items()
+            if name not in cls.INDEX_COLUMNS
+        }
+        return cls(arrays["years"], arrays["quarters"], columns, version)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the index and metric arrays as one flat mapping."""
+        arrays = {"years": self.years, "quarters": self.quarters}
+        arrays.update(self.columns)
+        return arrays
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    @property
+    def metrics(self) -> List[str]:
+        """Names of the stored metric columns, in insertion order."""
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size in bytes of the index and metric arrays."""
+        return (
+            self.years.nbytes
+            + self.quarters.nbytes
+            + sum(column.nbytes for column in self.columns.values())
+        )
+
+    def year_slice(self, start_year: int, end_year: int) -> slice:
+        """
+        Locate the rows of a range of years.
+
+        Args:
+            start_year (int): The first year of the range (inclusive).
+            end_year (int): The last year of the range (inclusive).
+
+        Returns:
+            slice: Row slice covering every quarter in the range.
+        """
+        start = int(np.searchsorted(self.years, start_year, side="left"))
+        stop = int(np.searchsorted(self.years, end_year, side="right"))
+        return slice(start, max(start, stop))
+
+    def year_chunks(self, rows: slice, chunk_rows: int) -> Iterator[slice]:
+        """
+        Split a row slice into consecutive slices of about ``chunk_rows`` rows.
+
+        Chunks end on a year boundary, so each holds whole years and can be
+        aggregated to annual records on its own.
+
+        Args:
+            rows (slice): Row slice to split, as returned by ``year_slice``.
+            chunk_rows (int): Target number of rows per chunk.
+
+        Yields:
+            slice: The chunks, in row order.
+        """
+        start, stop = rows.start or 0, len(self) if rows.stop is None else rows.stop
+        while start < stop:
+            end = min(start + max(1, chunk_rows), stop)
+            end = min(
+                int(np.searchsorted(self.years, self.years[end - 1], side="right")),
+                stop,
+            )
+            yield slice(start, end)
+            start = end
+
+    def column(self, metric: str, rows: slice = slice(None)) -> np.ndarray:
+        """Return a view of one metric column restricted to ``rows``."""
+        return self.columns[metric][rows]
+
+    def aggregate_years(
+        self,
+        rows: slice = slice(None),
+        metrics: Optional[List[str]] = None,
+        methods: Optional[Dict[str, str]] = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Aggregate quarterly rows into one value per year and metric.
+
+        Args:
+            rows (slice): Row slice to aggregate.
+            metrics (list, optional): Metric columns to aggregate. Defaults to all.
+            methods (dict, optional): Per-metric method: "sum" over the year's
+                quarters, "mean" of them, or "last" (the latest quarter).
+                Metrics not listed use "last".
+
+        Returns:
+            tuple: Array of years and a mapping of metric to annual values.
+        """
+        names = self.metrics if metrics is None else metrics
+        methods = methods or {}
+        years, starts, counts = np.unique(
+            self.years[rows], return_index=True, return_counts=True
+        )
+        ends = starts + counts - 1
+        annual = {}
+        for name in names:
+            column = self.columns[name][rows]
+            method = methods.get(name, "last")
+            if len(years) == 0:
+                annual[name] = np.empty(0)
+            elif method == "sum":
+                annual[name] = np.add.reduceat(column, starts)
+            elif method == "mean":
+                annual[name] = np.add.reduceat(column, starts) / counts
+            else:
+                annual[name] = np.asarray(column[ends], dtype=np.float64)
+        return years.astype(np.int64), annual
+
+    def to_records(
+        self, rows: slice = slice(None), metrics: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Materialize rows as the dict-shaped records served by the API.
+
+        Only the requested columns are sliced and converted.
+
+        Args:
+            rows (slice): Row slice to materialize.
+            metrics (list, optional): Metric columns to include. Defaults to all.
+
+        Returns:
+            list: One dict per quarter with "year", "quarter" and metric values.
+        """
+        names = self.metrics if metrics is None else metrics
+        values = [_to_list(self.columns[name][rows]) for name in names]
+        keys = ["year", "quarter"] + names
+        labels = [QUARTERS[q - 1] for q in self.quarters[rows].tolist()]
+        return [
+            dict(zip(keys, row))
+            for row in zip(self.years[rows].tolist(), labels, *values)
+        ]
+
+    def to_annual_records(
+        self,
+        rows: slice = slice(None),
+        metrics: Optional[List[str]] = None,
+        methods: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Materialize rows aggregated to one record per year.
+
+        Args:
+            rows (slice): Row slice to aggregate.
+            metrics (list, optional): Metric columns to include. Defaults to all.
+            methods (dict, optional): Per-metric aggregation, as for
+                ``aggregate_years``.
+
+        Returns:
+            list: One dict per year with "year" and metric values.
+        """
+        names = self.metrics if metrics is None else metrics
+        years, annual = self.aggregate_years(rows, names, methods)
+        values = [_to_list(annual[name]) for name in names]
+        keys = ["year"] + names
+        return [dict(zip(keys, row)) for row in zip(years.tolist(), *values)]
+
+
+def _periods(years: np.ndarray, quarters: np.ndarray) -> List[Dict[str, Any]]:
+    return [
+        {"year": year, "quarter": quarter_label(quarter)}
+        for year, quarter in zip(years.tolist(), quarters.tolist())
+    ]
+
+
+def diff_stores(old: FinancialStore, new: FinancialStore) -> Dict[str, Any]:
+    """
+    Summarize what changed between two versions of a store.
+
+    Rows are matched by (year, quarter) and compared across the metrics
+    both versions hold, with missing values equal to each other, so the
+    comparison is a handful of array operations however large the stores.
+
+    Args:
+        old (FinancialStore): The replaced store.
+        new (FinancialStore): The store replacing it.
+
+    Returns:
+        dict: The "added", "removed" and "changed" periods, each a list of
+        year and quarter dicts, and the "added_metrics" and "removed_metrics".
+    """
+    old_keys = old.years.astype(np.int64) * 10 + old.quarters
+    new_keys = new.years.astype(np.int64) * 10 + new.quarters
+    _, old_rows, new_rows = np.intersect1d(old_keys, new_keys, return_indices=True)
+    added = ~np.isin(new_keys, old_keys)
+    removed = ~np.isin(old_keys, new_keys)
+
+    changed = np.zeros(len(new_rows), dtype=bool)
+    for metric in set(old.columns) & set(new.columns):
+        before = old.columns[metric][old_rows]
+        after = new.columns[metric][new_rows]
+        changed |= (before != after) & ~(np.isnan(before) & np.isnan(after))
+    rows = new_rows[changed]
+    return {
+        "added": _periods(new.years[added], new.quarters[added]),
+        "removed": _periods(old.years[removed], old.quarters[removed]),
+        "changed": _periods(new.years[rows], new.quarters[rows]),
+        "added_metrics": [m for m in new.metrics if m not in old.columns],
+        "removed_metrics": [m for m in old.metrics if m not in new.columns],
+    }
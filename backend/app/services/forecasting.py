@@ -0,0 +1,166 @@
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.utils.metrics import timed
+
+# Seed used when a request does not ask for a specific one
+DEFAULT_SEED = 2024
+
+# Standard deviation of the forecast noise, relative to the predicted value
+NOISE_SCALE = 0.05
+
+
+@timed("model.fit")
+def fit_linear_trends(t: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Fit a least-squares linear trend to every column of ``values`` at once.
+
+    Columns with missing values are fitted on their observed rows only.
+
+    Args:
+        t (ndarray): Time index of the observations, shape (n,).
+        values (ndarray): Observations, shape (n, m), one column per series.
+
+    Returns:
+        ndarray: Intercepts and slopes, shape (2, m).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    design = np.column_stack([np.ones_like(t), t])
+    coef = np.full((2, values.shape[1]), np.nan)
+
+    complete = ~np.isnan(values).any(axis=0)
+    if complete.any():
+        coef[:, complete] = np.linalg.lstsq(design, values[:, complete], rcond=None)[0]
+    for column in np.flatnonzero(~complete):
+        observed = ~np.isnan(values[:, column])
+        if observed.sum() >= 2:
+            coef[:, column] = np.linalg.lstsq(
+                design[observed], values[observed, column], rcond=None
+            )[0]
+    return coef
+
+
+def predict_linear_trends(coef: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    Evaluate fitted trends at every time in ``t``.
+
+    Args:
+        coef (ndarray): Intercepts and slopes from ``fit_linear_trends``, shape (2, m).
+        t (ndarray): Times to predict, shape (h,).
+
+    Returns:
+        ndarray: Predictions, shape (h, m).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    return np.column_stack([np.ones_like(t), t]) @ coef
+
+
+def forecast_noise(
+    metrics: List[str],
+    predictions: np.ndarray,
+    horizons: List[int],
+    seed: int = DEFAULT_SEED,
+) -> np.ndarray:
+    """
+    Draw reproducible noise for forecast predictions.
+
+    Each metric gets its own stream derived from ``seed`` and the metric
+    name, and each horizon a fixed position in it, so a forecast value does
+    not depend on which other metrics or horizons are requested with it.
+
+    Args:
+        metrics (list): Metric name of each prediction column.
+        predictions (ndarray): Predictions, shape (h, m).
+        horizons (list): Horizon (years ahead, from 1) of each prediction row.
+        seed (int): Base seed.
+
+    Returns:
+        ndarray: Noise with the shape of ``predictions``; empty for no horizons.
+    """
+    if not len(horizons):
+        return np.zeros_like(predictions, dtype=np.float64)
+    positions = np.asarray(horizons, dtype=np.int64) - 1
+    standard = np.column_stack(
+        [
+            np.random.default_rng([seed, zlib.crc32(metric.encode("utf-8"))]).normal(
+                size=int(positions.max()) + 1
+            )[positions]
+            for metric in metrics
+        ]
+    )
+    return standard * NOISE_SCALE * np.abs(predictions)
+
+
+def fit_annual_trends(years: np.ndarray, history: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Fit a linear trend to each annual series, with time measured from the last year.
+
+    Args:
+        years (ndarray): Years of the history.
+        history (dict): Mapping of metric to annual values aligned with ``years``.
+
+    Returns:
+        ndarray: Intercepts and slopes, shape (2, m), in ``history`` order.
+    """
+    t = np.asarray(years, dtype=np.float64) - years[-1]
+    return fit_linear_trends(t, np.column_stack(list(history.values())))
+
+
+def finish_forecast(
+    metrics: List[str],
+    last_year: int,
+    predictions: np.ndarray,
+    horizons: List[int],
+    seed: Optional[int] = DEFAULT_SEED,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Add the forecast noise to any model's predictions and label them by year.
+
+    Args:
+        metrics (list): Metric name of each column of ``predictions``.
+        last_year (int): Last historical year, the origin of the horizons.
+        predictions (ndarray): Predictions, shape (h, m).
+        horizons (list): Years ahead of ``last_year`` of each prediction row.
+        seed (int, optional): Noise seed, or None for noise-free predictions.
+
+    Returns:
+        tuple: Forecast years and a mapping of metric to forecast values,
+        empty for no horizons.
+    """
+    if not len(horizons):
+        return np.empty(0, dtype=np.int64), {m: np.empty(0) for m in metrics}
+    if seed is not None:
+        predictions = predictions + forecast_noise(metrics, predictions, horizons, seed)
+
+    forecast_years = last_year + np.asarray(horizons, dtype=np.int64)
+    return forecast_years, {m: predictions[:, i] for i, m in enumerate(metrics)}
+
+
+def to_forecast_records(years: np.ndarray, values: np.ndarray) -> List[Dict[str, Any]]:
+    """Format one metric's forecast as the records served by the API."""
+    return [
+        {"year": year, "value": round(value, 2), "is_forecast": True}
+        for year, value in zip(years.tolist(), values.tolist())
+    ]
+
+
+def forecast_errors(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute forecast error metrics column-wise.
+
+    Args:
+        actual (ndarray): Observed values, shape (h, m).
+        predicted (ndarray): Predicted values, shape (h, m).
+
+    Returns:
+        dict: MAE, RMSE and MAPE (in percent) per column, shape (m,) each.
+        MAPE is NaN where an observed value is zero.
+    """
+    error = predicted - actual
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage = np.where(actual != 0, np.abs(error / actual), np.nan)
+    return {
+        "mae": np.nanmean(np.abs(error), axis=0),
+        "rmse": np.sqrt(np.nanmean(error**2, axis=0)),
+        "mape": np.nanmean(percentage, axis=0) * 100,
+    }
@@ -0,0 +1,159 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from app.models.financial import (
+    QuarterRecord,
+    parse_financial_data,
+    to_financial_data,
+)
+from app.services.data_processor import (
+    FLOW_METRICS,
+    company_paths,
+    reload_financial_data,
+    write_financial_columns,
+)
+from app.services.extraction_cache import ExtractionCache, file_digest
+from app.services.financial_store import QUARTERS
+from app.services.pdf_parser import extract_jk_financials
+from app.utils.config import RAW_DATA_DIR, DEFAULT_COMPANY
+from app.utils.file_utils import read_json, write_json
+
+
+def annual_to_quarters(metrics: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Spread one fiscal year's figures over its four quarters.
+
+    Annual reports only carry full-year figures, so flow metrics are
+    apportioned evenly and balance-sheet items are carried as at each
+    quarter end.
+
+    Args:
+        metrics (dict): Metric values for the fiscal year.
+
+    Returns:
+        list: Four quarter dicts in the financial_data.json layout.
+    """
+    quarter = {
+        metric: value / len(QUARTERS) if metric in FLOW_METRICS else value
+        for metric, value in metrics.items()
+    }
+    return [dict(quarter, quarter=label) for label in QUARTERS]
+
+
+def merge_financials(
+    annual: Dict[int, Dict[str, float]],
+    json_path: Optional[Path] = None,
+    columns_dir: Optional[Path] = None,
+    company: str = DEFAULT_COMPANY,
+) -> Dict[str, Any]:
+    """
+    Merge extracted annual figures into data/processed and reload the store.
+
+    Extracted metrics overwrite existing values for the same year and
+    quarter; metrics that were not extracted keep their existing values.
+    Both the existing and the extracted data are validated before anything
+    is written, and the column files are built from the merged records
+    directly rather than by reading the rewritten JSON back.
+
+    Args:
+        annual (dict): Mapping of fiscal year to metric values.
+        json_path (Path, optional): Path of financial_data.json. Defaults to
+            the company's partition.
+        columns_dir (Path, optional): Directory of the converted column
+            files. Defaults to the company's partition.
+        company (str): The company the figures belong to.
+
+    Returns:
+        dict: The manifest of the rewritten column files.
+
+    Raises:
+        ValueError: If the existing or extracted data is invalid.
+    """
+    default_columns, default_json = company_paths(company)
+    json_path = json_path or default_json
+    columns_dir = columns_dir or default_columns
+    records = {
+        (record.year, record.quarter): record
+        for record in parse_financial_data(read_json(json_path, {}), str(json_path))
+    }
+    extracted = {
+        str(year): annual_to_quarters(metrics) for year, metrics in annual.items()
+    }
+    for record in parse_financial_data(extracted, "extracted figures"):
+        existing = records.setdefault(
+            (record.year, record.quarter),
+            QuarterRecord(record.year, record.quarter, {}),
+        )
+        existing.values.update(record.values)
+
+    merged = [records[period] for period in sorted(records)]
+    write_json(json_path, to_financial_data(merged))
+    manifest = write_financial_columns(merged, columns_dir)
+    reload_financial_data(company)
+    return manifest
+
+
+def ingest_directory(
+    raw_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    cache: Optional[ExtractionCache] = None,
+    force: bool = False,
+    company: str = DEFAULT_COMPANY,
+) -> Dict[str, Dict[int, Dict[str, float]]]:
+    """
+    Extract new or modified annual reports in a directory into the store.
+
+    Reports whose content digest matches the one recorded at the last merge
+    are skipped entirely. Changed reports go through the extraction cache,
+    so only their changed pages are scanned and extracted again. One
+    process pool is shared by all reports.
+
+    Args:
+        raw_dir (Path, optional): Directory of annual report PDFs. Defaults to
+            data/raw for the default company and data/raw/<company> otherwise.
+        workers (int, optional): Number of worker processes.
+        cache (ExtractionCache, optional): Extraction cache to use. Defaults
+            to the cache under data/cache/extraction.
+        force (bool): Re-merge every report, even if unchanged.
+        company (str): The company the reports belong to.
+
+    Returns:
+        dict: Mapping of PDF file name to its extracted annual figures, for
+        the reports that were merged.
+    """
+    if raw_dir is None:
+        raw_dir = RAW_DATA_DIR if company == DEFAULT_COMPANY else RAW_DATA_DIR / company
+    cache = cache or ExtractionCache()
+    workers = workers or os.cpu_count() or 1
+    ingested = cache.ingested()
+    # Reports are recorded per company, so the same file name can be reused
+    prefix = "" if company == DEFAULT_COMPANY else f"{company}/"
+    digests = {
+        path.name: file_digest(path) for path in sorted(Path(raw_dir).glob("*.pdf"))
+    }
+    changed = [
+        name
+        for name, digest in digests.items()
+        if force or ingested.get(prefix + name) != digest
+    ]
+    if not changed:
+        return {}
+
+    extracted = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for name in changed:
+            extracted[name] = extract_jk_financials(
+                Path(raw_dir) / name, executor=executor, workers=workers, cache=cache
+            )
+
+    annual: Dict[int, Dict[str, float]] = {}
+    for figures in extracted.values():
+        for year, metrics in figures.items():
+            annual.setdefault(year, {}).update(metrics)
+    if annual:
+        merge_financials(annual, company=company)
+    cache.mark_ingested(
+        dict(ingested, **{prefix + name: digest for name, digest in digests.items()})
+    )
+    return extracted
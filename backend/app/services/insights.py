@@ -0,0 +1,349 @@
+import math
+import string
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.services.data_processor import annual_aggregation, get_store
+from app.utils.metrics import timed
+
+# Trend classes, indexed by the codes in a statistics table's "trend" column
+TRENDS = (
+    "insufficient data",
+    "consistently increasing",
+    "consistently decreasing",
+    "generally increasing",
+    "generally decreasing",
+    "stable",
+)
+
+# Insight text per kind of metric: the sentences, how the outlook phrase is
+# chosen and the phrases to choose from. Sentences are str.format templates
+# over a metric's statistics; a sentence is left out when a value it needs is
+# missing, e.g. the CAGR of a series that changed sign.
+INSIGHT_TEMPLATES = {
+    "revenue": (
+        (
+            "Revenue has shown a {trend} trend over the past {count} years.",
+            "Year-over-year growth is {percent_change:.1f}%.",
+            "The compound annual growth rate (CAGR) is {cagr:.1f}%.",
+            "Average revenue is {mean:,.0f} with a standard deviation of {std:,.0f}.",
+            "This indicates {outlook}.",
+        ),
+        "growth",
+        (
+            "strong market performance",
+            "stable market presence",
+            "challenging market conditions",
+        ),
+    ),
+    "net_profit": (
+        (
+            "Net profit has shown a {trend} trend over the analyzed period.",
+            "Year-over-year change is {percent_change:.1f}%.",
+            "The compound annual growth rate (CAGR) is {cagr:.1f}%.",
+            "Average net profit is {mean:,.0f}.",
+            "This suggests {outlook}.",
+        ),
+        "growth",
+        (
+            "improving operational efficiency",
+            "stable operations",
+            "pressure on profitability",
+        ),
+    ),
+    "margin": (
+        (
+            "The {label} has been {trend}.",
+            "Current margin is {latest:.1f}%, compared to {previous:.1f}% in the "
+            "previous year.",
+            "Average margin is {mean:.1f}% with a standard deviation of {std:.1f}%.",
+            "This indicates {outlook}.",
+        ),
+        "sign",
+        ("improving efficiency", "cost pressure"),
+    ),
+    "eps": (
+        (
+            "Earnings per share (EPS) shows a {trend} trend.",
+            "Year-over-year growth is {percent_change:.1f}%.",
+            "CAGR of {cagr:.1f}% over the period.",
+            "Current EPS is {latest:.2f}, with a historical average of {mean:.2f}.",
+            "This suggests {outlook}.",
+        ),
+        "growth",
+        (
+            "strong shareholder value creation",
+            "stable performance",
+            "challenges in profitability",
+        ),
+    ),
+    "ratio": (
+        (
+            "The {label} is currently at {latest:.2f}.",
+            "This represents a {abs_change:.1f}% {direction} from the previous "
+            "period.",
+            "The historical average is {mean:.2f}.",
+            "This indicates {outlook} {label}.",
+        ),
+        "level",
+        ("strong", "weakening"),
+    ),
+    "cash_flow": (
+        (
+            "The {label} shows a {trend} pattern.",
+            "Current value is {latest:,.0f}, a {percent_change:.1f}% change from "
+            "previous year.",
+            "Average {label} is {mean:,.0f}.",
+            "This suggests {outlook} cash management.",
+        ),
+        "sign",
+        ("improving", "deteriorating"),
+    ),
+    "default": (
+        (
+            "The {label} shows a {trend} trend.",
+            "Current value is {latest:,.2f}, representing a {percent_change:.1f}% "
+            "change.",
+            "Historical average is {mean:.2f} with a standard deviation of {std:.2f}.",
+            "The metric has grown at a CAGR of {cagr:.1f}% over the period.",
+        ),
+        None,
+        (),
+    ),
+}
+
+_FORMATTER = string.Formatter()
+
+
+def compute_statistics(years: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Summarize many annual series at once.
+
+    Every statistic is computed for all series in the same array operations;
+    there is no loop over series. Missing values (NaN) are skipped, so the
+    latest and previous values are the last two observed ones and the CAGR
+    spans the years between the first and last observation.
+
+    Args:
+        years (ndarray): Years of the series, shape (y,), ascending.
+        values (ndarray): Annual values, shape (..., y), NaN where missing.
+
+    Returns:
+        dict: Arrays of shape (...,): "count" of observed years, "mean" and
+        "std" of the values, "latest" and "previous" values, "percent_change"
+        between them, "cagr" and "volatility" (standard deviation of the
+        year-over-year percent changes) in percent, and "trend" codes
+        indexing TRENDS. Statistics that are undefined for a series, such as
+        the CAGR of one that changes sign, are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=-1)
+    enough = count >= 2
+
+    # Move the observed values of each series to its front, in year order
+    order = np.argsort(~observed, axis=-1, kind="stable")
+    packed = np.take_along_axis(values, order, axis=-1)
+    packed_years = np.asarray(years, dtype=np.float64)[order]
+    last = np.maximum(count - 1, 0)[..., None]
+
+    first = packed[..., 0]
+    latest = np.take_along_axis(packed, last, axis=-1)[..., 0]
+    previous = np.take_along_axis(packed, np.maximum(count - 2, 0)[..., None], -1)
+    previous = np.where(enough, previous[..., 0], np.nan)
+    span = (
+        np.take_along_axis(packed_years, last, axis=-1)[..., 0] - packed_years[..., 0]
+    )
+
+    changes = np.diff(packed, axis=-1)
+    changed = ~np.isnan(changes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(observed, values, 0.0).sum(axis=-1) / count
+        deviation = np.where(observed, values - mean[..., None], 0.0)
+        std = np.sqrt((deviation**2).sum(axis=-1) / count)
+
+        percent_change = np.where(
+            previous != 0, (latest - previous) / previous * 100, np.nan
+        )
+        ratio = latest / first
+        cagr = np.where(
+            enough & (span > 0) & (ratio > 0) & np.isfinite(ratio),
+            (ratio ** (1 / span) - 1) * 100,
+            np.nan,
+        )
+
+        growth = changes / packed[..., :-1] * 100
+        grew = changed & np.isfinite(growth)
+        growth_count = grew.sum(axis=-1)
+        growth_mean = np.where(grew, growth, 0.0).sum(axis=-1) / growth_count
+        growth_deviation = np.where(grew, growth - growth_mean[..., None], 0.0)
+        volatility = np.where(
+            growth_count >= 2,
+            np.sqrt((growth_deviation**2).sum(axis=-1) / growth_count),
+            np.nan,
+        )
+        mean_change = np.where(changed, changes, 0.0).sum(axis=-1) / (count - 1)
+
+    trend = np.select(
+        [
+            ~enough,
+            np.all(~changed | (changes > 0), axis=-1),
+            np.all(~changed | (changes < 0), axis=-1),
+            mean_change > 0,
+            mean_change < 0,
+        ],
+        [0, 1, 2, 3, 4],
+        default=5,
+    ).astype(np.int8)
+
+    return {
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "latest": latest,
+        "previous": previous,
+        "percent_change": percent_change,
+        "cagr": cagr,
+        "volatility": volatility,
+        "trend": trend,
+    }
+
+
+def _value(value: Any) -> Any:
+    """Convert a table value to a Python number, with None for NaN."""
+    value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class StatisticsTable:
+    """
+    Summary statistics of every metric of one or more companies.
+
+    Each statistic is one array with a row per company and a column per
+    metric, as computed by ``compute_statistics``; ``get`` reads one cell
+    back as the dict that insight templates are rendered from.
+    """
+
+    def __init__(
+        self,
+        companies: List[str],
+        metrics: List[str],
+        statistics: Dict[str, np.ndarray],
+    ):
+        self.companies = companies
+        self.metrics = metrics
+        self.statistics = statistics
+        self._companies = {company: i for i, company in enumerate(companies)}
+        self._metrics = {metric: i for i, metric in enumerate(metrics)}
+
+    def column(self, name: str) -> np.ndarray:
+        """Return one statistic for every company and metric."""
+        return self.statistics[name]
+
+    def get(self, company: str, metric: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the statistics of one company's metric.
+
+        Returns:
+            dict: Every statistic, with the trend as its label and None for
+            undefined values, or None if the company has fewer than two
+            years of the metric or lacks it.
+        """
+        row = self._companies.get(company)
+        column = self._metrics.get(metric)
+        if row is None or column is None:
+            return None
+        stats = {
+            name: _value(values[row, column])
+            for name, values in self.statistics.items()
+        }
+        if stats["count"] < 2:
+            return None
+        stats["trend"] = TRENDS[stats["trend"]]
+        return stats
+
+
+@timed("insights.table")
+def build_statistics_table(companies: List[str]) -> StatisticsTable:
+    """
+    Compute the statistics of every metric of every company in one pass.
+
+    The companies' annual histories are aligned on the union of their years
+    and metrics, NaN where a company lacks a year or metric, and summarized
+    together by ``compute_statistics``.
+
+    Args:
+        companies (list): Company identifiers, in the order of the rows.
+
+    Returns:
+        StatisticsTable: The statistics table.
+    """
+    histories: List[Tuple[np.ndarray, Dict[str, np.ndarray]]] = []
+    metrics: List[str] = []
+    for company in companies:
+        store = get_store(company)
+        methods = {metric: annual_aggregation(metric) for metric in store.metrics}
+        histories.append(store.aggregate_years(slice(None), store.metrics, methods))
+        metrics.extend(metric for metric in store.metrics if metric not in metrics)
+
+    years = np.unique(np.concatenate([h[0] for h in histories] or [np.empty(0)]))
+    columns = {metric: i for i, metric in enumerate(metrics)}
+    values = np.full((len(companies), len(metrics), len(years)), np.nan)
+    for row, (company_years, annual) in enumerate(histories):
+        positions = np.searchsorted(years, company_years)
+        for metric, series in annual.items():
+            values[row, columns[metric], positions] = series
+    return StatisticsTable(companies, metrics, compute_statistics(years, values))
+
+
+def _template_key(metric: str) -> str:
+    """Pick the insight template for a metric by its name."""
+    if metric in ("revenue", "net_profit", "eps"):
+        return metric
+    for kind in ("margin", "ratio", "cash_flow"):
+        if kind in metric:
+            return kind
+    return "default"
+
+
+def _outlook(
+    rule: Optional[str], phrases: Tuple[str, ...], stats: Dict[str, Any]
+) -> Optional[str]:
+    """Choose the outlook phrase for an insight, or None if it is undefined."""
+    change = stats["percent_change"]
+    if rule == "level":
+        return phrases[0] if stats["latest"] > stats["mean"] else phrases[1]
+    if rule is None or change is None:
+        return None
+    if rule == "growth":
+        return phrases[0] if change > 10 else phrases[1] if change > 0 else phrases[2]
+    return phrases[0] if change > 0 else phrases[1]
+
+
+def render_insight(metric: str, stats: Dict[str, Any]) -> str:
+    """
+    Render the insight text for a metric from its statistics.
+
+    Args:
+        metric (str): The metric the statistics describe.
+        stats (dict): Statistics as returned by ``StatisticsTable.get``.
+
+    Returns:
+        str: The insight, one sentence per defined template.
+    """
+    sentences, rule, phrases = INSIGHT_TEMPLATES[_template_key(metric)]
+    change = stats["percent_change"]
+    fields = dict(
+        stats,
+        label=metric.replace("_", " "),
+        outlook=_outlook(rule, phrases, stats),
+        abs_change=None if change is None else abs(change),
+        direction=None if change is None else "increase" if change > 0 else "decrease",
+    )
+    rendered = []
+    for sentence in sentences:
+        names = [name for _, name, _, _ in _FORMATTER.parse(sentence) if name]
+        if all(fields[name] is not None for name in names):
+            rendered.append(sentence.format(**fields))
+    return " ".join(rendered)
@@ -0,0 +1,109 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.services.executor import BoundedExecutor
+from app.utils.config import JOB_HISTORY_SIZE, JOB_QUEUE_SIZE
+
+# Jobs run one at a time; each may use its own process pool internally
+JOB_EXECUTOR = BoundedExecutor(
+    1, JOB_QUEUE_SIZE + 1, factory=ThreadPoolExecutor, name="jobs"
+)
+
+_JOBS: "OrderedDict[str, Job]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+class Job:
+    """A background job and its progress through queued, running and finished."""
+
+    __slots__ = (
+        "id",
+        "kind",
+        "params",
+        "status",
+        "submitted_at",
+        "started_at",
+        "finished_at",
+        "result",
+        "error",
+    )
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job as served by the jobs API."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _run(job: Job, fn: Callable[..., Any]) -> None:
+    job.status, job.started_at = "running", time.time()
+    try:
+        job.result = fn(**job.params)
+        job.status = "succeeded"
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+
+
+def submit_job(kind: str, fn: Callable[..., Any], params: Dict[str, Any]) -> Job:
+    """
+    Queue ``fn(**params)`` as a background job.
+
+    Jobs run one at a time in submission order. Only the JOB_HISTORY_SIZE
+    most recent jobs are remembered; older finished jobs are forgotten.
+
+    Args:
+        kind (str): Kind of job, e.g. "ingest".
+        fn (callable): Function to run; its return value is the job result.
+        params (dict): Keyword arguments for ``fn``, reported with the job.
+
+    Returns:
+        Job: The queued job.
+
+    Raises:
+        ExecutorBusy: If JOB_QUEUE_SIZE jobs are already waiting.
+    """
+    job = Job(kind, params)
+    with _LOCK:
+        _JOBS[job.id] = job
+        while len(_JOBS) > JOB_HISTORY_SIZE:
+            oldest = next(iter(_JOBS.values()))
+            if not oldest.finished:
+                break
+            _JOBS.popitem(last=False)
+    try:
+        JOB_EXECUTOR.submit(_run, job, fn)
+    except Exception:
+        with _LOCK:
+            _JOBS.pop(job.id, None)
+        raise
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    """Return a remembered job by id, or None."""
+    return _JOBS.get(job_id)
+
+
+def list_jobs() -> List[Job]:
+    """Return the remembered jobs, most recent first."""
+    with _LOCK:
+        return list(reversed(_JOBS.values()))
@@ -0,0 +1,124 @@
+import time
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from app.services.backtesting import backtest, load_panel, summarize_backtest
+from app.services.data_processor import advertised_metrics, get_store
+from app.services.model_zoo import MODELS, state_column
+from app.utils.config import MODEL_REGISTRY_DIR
+from app.utils.file_utils import path_stamp, read_json, write_json
+
+REGISTRY_FORMAT = 2
+LATEST_NAME = "latest.json"
+REGISTRY_NAME = "registry.json"
+
+
+def train_models(
+    metrics: Optional[List[str]] = None,
+    holdout: int = 2,
+    models: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Choose, fit and evaluate a forecasting model for every metric.
+
+    Every candidate model is backtested with each of the last ``holdout``
+    years as a forecast origin, predicting up to ``holdout`` years ahead.
+    The model with the lowest error is then refitted on the full history
+    for serving. Metrics no model could be scored on are left out.
+
+    Args:
+        metrics (list, optional): Metrics to train. Defaults to every
+            advertised metric that the store holds.
+        holdout (int): Number of trailing years held out for evaluation.
+        models (list, optional): Candidate models from the model zoo.
+            Defaults to all of them.
+
+    Returns:
+        dict: Registry document with the fitted models and their scores.
+    """
+    store = get_store()
+    if metrics is None:
+        metrics = [metric for metric in advertised_metrics() if metric in store.columns]
+
+    panel = load_panel(metrics)
+    scores = backtest(panel, models or list(MODELS), holdout, holdout)
+    results = summarize_backtest(metrics, scores)
+    last_year = int(panel.years[-1])
+
+    trained = {}
+    for kind in sorted({result["best"] for result in results.values()} - {None}):
+        columns = [i for i, m in enumerate(metrics) if results[m]["best"] == kind]
+        state = MODELS[kind].fit(panel.select(columns))
+        for j, i in enumerate(columns):
+            trained[metrics[i]] = {
+                "kind": kind,
+                "last_year": last_year,
+                "params": state_column(state, j),
+                "evaluation": results[metrics[i]]["scores"][kind],
+                "backtest": results[metrics[i]]["scores"],
+            }
+    return {
+        "format": REGISTRY_FORMAT,
+        "data_version": store.version,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "holdout_years": holdout,
+        "models": {metric: trained[metric] for metric in metrics if metric in trained},
+    }
+
+
+def save_registry(
+    registry: Dict[str, Any], directory: Path = MODEL_REGISTRY_DIR
+) -> Path:
+    """
+    Write a registry as a new version and make it the latest.
+
+    Versions are never overwritten, so a bad training run can be rolled back
+    by pointing latest.json at an earlier version. The version ID is the
+    save time, the data version and a random suffix, so two runs saved in
+    the same second still get their own version.
+
+    Args:
+        registry (dict): Registry document from ``train_models``.
+        directory (Path): Root directory of the registry.
+
+    Returns:
+        Path: The directory of the new version.
+    """
+    directory = Path(directory)
+    version = "-".join(
+        (
+            time.strftime("%Y%m%d%H%M%S", time.gmtime()),
+            registry["data_version"][:8],
+            uuid.uuid4().hex[:8],
+        )
+    )
+    (directory / version).mkdir(parents=True, exist_ok=False)
+    registry = dict(registry, version=version)
+    write_json(directory / version / REGISTRY_NAME, registry)
+    write_json(directory / LATEST_NAME, {"version": version})
+    return directory / version
+
+
+def registry_stamp(directory: Path = MODEL_REGISTRY_DIR) -> Any:
+    """Return a cheap stamp of the registry that changes when a version is saved."""
+    return path_stamp(Path(directory) / LATEST_NAME)
+
+
+def load_registry(directory: Path = MODEL_REGISTRY_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Load the latest registry version.
+
+    Args:
+        directory (Path): Root directory of the registry.
+
+    Returns:
+        dict: The registry document, or None if no models have been trained.
+    """
+    directory = Path(directory)
+    latest = read_json(directory / LATEST_NAME)
+    if latest is None:
+        return None
+    registry = read_json(directory / latest["version"] / REGISTRY_NAME)
+    if registry is None or registry.get("format") != REGISTRY_FORMAT:
+        return None
+    return registry
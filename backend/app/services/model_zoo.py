@@ -0,0 +1,337 @@
+import itertools
+from typing import Callable, List, Dict, Any
+import numpy as np
+from app.services.forecasting import fit_linear_trends, predict_linear_trends
+
+# How quarterly values combine into an annual value, by aggregation code
+AGGREGATIONS = ("sum", "mean", "last")
+
+# Holt-Winters smoothing parameters; each series uses the combination with
+# the lowest one-step-ahead error over its own history
+HW_ALPHAS = (0.2, 0.5, 0.8)
+HW_BETAS = (0.05, 0.2)
+HW_GAMMAS = (0.1, 0.3)
+
+# Lagged differences in the AR model and lagged levels in the ridge model
+AR_ORDER = 2
+RIDGE_LAGS = 3
+
+# Ridge penalty on the (scaled) lag coefficients; the AR model only adds a
+# negligible one to keep short histories solvable
+RIDGE_PENALTY = 0.1
+AR_PENALTY = 1e-6
+
+# State arrays, keyed by name, with one entry per series on the last axis
+State = Dict[str, np.ndarray]
+
+
+class SeriesPanel:
+    """
+    Annual history of several series, with its quarterly detail.
+
+    ``annual`` has one row per year and one column per series, and
+    ``quarterly`` the same years and series with the four quarters in
+    between, NaN where missing. ``aggregation`` holds each series' code in
+    AGGREGATIONS, which turns quarterly forecasts back into annual ones.
+    """
+
+    __slots__ = ("years", "annual", "quarterly", "aggregation")
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        annual: np.ndarray,
+        quarterly: np.ndarray,
+        aggregation: np.ndarray,
+    ):
+        self.years = years
+        self.annual = annual
+        self.quarterly = quarterly
+        self.aggregation = aggregation
+
+    def head(self, count: int) -> "SeriesPanel":
+        """Return the panel restricted to its first ``count`` years."""
+        return SeriesPanel(
+            self.years[:count],
+            self.annual[:count],
+            self.quarterly[:count],
+            self.aggregation,
+        )
+
+    def select(self, columns: List[int]) -> "SeriesPanel":
+        """Return the panel restricted to some of its series."""
+        return SeriesPanel(
+            self.years,
+            self.annual[:, columns],
+            self.quarterly[:, :, columns],
+            self.aggregation[columns],
+        )
+
+
+class ForecastModel:
+    """
+    A forecasting model that fits and predicts many series at once.
+
+    ``fit`` takes a SeriesPanel and returns the fitted state of every series;
+    ``predict`` takes a state and the horizons (years after the last fitted
+    year) and returns annual predictions of shape (horizons, series). Series
+    a model cannot fit, e.g. for lack of history, predict NaN.
+    """
+
+    __slots__ = ("name", "description", "fit", "predict")
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        fit: Callable[[SeriesPanel], State],
+        predict: Callable[[State, List[int]], np.ndarray],
+    ):
+        self.name = name
+        self.description = description
+        self.fit = fit
+        self.predict = predict
+
+
+def state_column(state: State, column: int) -> Dict[str, Any]:
+    """Return one series' state as JSON-compatible lists, for the registry."""
+    return {
+        name: np.asarray(values)[..., column].tolist() for name, values in state.items()
+    }
+
+
+def stack_states(states: List[Dict[str, Any]]) -> State:
+    """Stack single-series states, such as registry entries, into one state."""
+    return {
+        name: np.stack(
+            [np.asarray(state[name], dtype=np.float64) for state in states], axis=-1
+        )
+        for name in states[0]
+    }
+
+
+def _scale(values: np.ndarray) -> np.ndarray:
+    """Return each column's mean absolute value, or 1 where that is undefined."""
+    observed = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(observed, np.abs(values), 0.0).sum(axis=0) / observed.sum(
+            axis=0
+        )
+    return np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+
+def _lagged(values: np.ndarray, lags: int):
+    """
+    Build an autoregression of each column on its own lags.
+
+    Returns:
+        tuple: Features of shape (rows, lags + 1, series), an intercept
+        followed by the lagged values, and the targets, shape (rows, series).
+    """
+    rows = max(len(values) - lags, 0)
+    columns = [np.ones((rows, values.shape[1]))]
+    columns += [values[lags - lag : lags - lag + rows] for lag in range(1, lags + 1)]
+    return np.stack(columns, axis=1), values[lags : lags + rows]
+
+
+def _recent(values: np.ndarray, count: int) -> np.ndarray:
+    """Return the last ``count`` rows, most recent first, NaN-padded."""
+    recent = np.full((count, values.shape[1]), np.nan)
+    tail = values[::-1][:count]
+    recent[: len(tail)] = tail
+    return recent
+
+
+def _solve(
+    features: np.ndarray, targets: np.ndarray, penalty: np.ndarray, min_rows: int
+) -> np.ndarray:
+    """
+    Solve a penalized least-squares regression for every series at once.
+
+    Rows with a missing target or feature are left out of their series'
+    regression. The normal equations of all series are built with one
+    einsum each and solved as a single batch.
+
+    Args:
+        features (ndarray): Shape (rows, k, series).
+        targets (ndarray): Shape (rows, series).
+        penalty (ndarray): Ridge penalty per coefficient, shape (k,).
+        min_rows (int): Series with fewer usable rows get NaN coefficients.
+
+    Returns:
+        ndarray: Coefficients, shape (k, series).
+    """
+    usable = ~np.isnan(targets) & ~np.isnan(features).any(axis=1)
+    x = np.where(usable[:, None, :], features, 0.0)
+    y = np.where(usable, targets, 0.0)
+    gram = np.einsum("rkm,rjm->mkj", x, x) + np.diag(penalty)
+    moment = np.einsum("rkm,rm->mk", x, y)
+
+    coef = np.full((features.shape[2], features.shape[1]), np.nan)
+    solvable = usable.sum(axis=0) >= min_rows
+    if solvable.any():
+        coef[solvable] = np.linalg.solve(gram[solvable], moment[solvable][..., None])[
+            ..., 0
+        ]
+    return coef.T
+
+
+def _autoregress(coef: np.ndarray, recent: np.ndarray, steps: int) -> np.ndarray:
+    """
+    Run fitted autoregressions forward.
+
+    Args:
+        coef (ndarray): Intercept and lag coefficients, shape (lags + 1, series).
+        recent (ndarray): Latest values, most recent first, shape (lags, series).
+        steps (int): Number of steps to predict.
+
+    Returns:
+        ndarray: Predicted values, shape (steps, series).
+    """
+    path = []
+    for _ in range(steps):
+        value = coef[0] + (coef[1:] * recent).sum(axis=0)
+        recent = np.vstack([value[None], recent[:-1]])
+        path.append(value)
+    return np.array(path).reshape(steps, coef.shape[1])
+
+
+def _fit_linear(panel: SeriesPanel) -> State:
+    t = panel.years.astype(np.float64) - panel.years[-1]
+    return {"coef": fit_linear_trends(t, panel.annual)}
+
+
+def _predict_linear(state: State, horizons: List[int]) -> np.ndarray:
+    return predict_linear_trends(state["coef"], np.asarray(horizons, dtype=np.float64))
+
+
+def _column_means(values: np.ndarray) -> np.ndarray:
+    observed = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(observed, values, 0.0).sum(axis=0) / observed.sum(axis=0)
+
+
+def _fit_holt_winters(panel: SeriesPanel) -> State:
+    years, quarters, series = panel.quarterly.shape
+    values = panel.quarterly.reshape(years * quarters, series)
+    grid = np.array(list(itertools.product(HW_ALPHAS, HW_BETAS, HW_GAMMAS)))
+    alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+
+    # Start from the first year's mean, the change to the second year's and
+    # the first year's quarterly deviations; then smooth from the second year
+    first, second = _column_means(values[:quarters]), _column_means(
+        values[quarters : 2 * quarters]
+    )
+    shape = (len(grid), series)
+    level = np.broadcast_to(first, shape).copy()
+    trend = np.broadcast_to((second - first) / quarters, shape).copy()
+    season = np.broadcast_to(
+        np.nan_to_num(values[:quarters] - first)[:, None, :], (quarters,) + shape
+    ).copy()
+    error = np.zeros(shape)
+    for t in range(quarters, len(values)):
+        q = t % quarters
+        forecast = level + trend + season[q]
+        # A missing quarter is replaced by its forecast, leaving the state as is
+        value = np.where(np.isnan(values[t]), forecast, values[t])
+        error += (value - forecast) ** 2
+        new_level = alpha * (value - season[q]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[q] = gamma * (value - new_level) + (1 - gamma) * season[q]
+        level = new_level
+
+    if years < 2:
+        level = np.full(shape, np.nan)
+    best = np.argmin(np.where(np.isnan(error), np.inf, error), axis=0)
+    columns = np.arange(series)
+    return {
+        "level": level[best, columns],
+        "trend": trend[best, columns],
+        "season": season[:, best, columns],
+        "aggregation": panel.aggregation.astype(np.float64),
+    }
+
+
+def _predict_holt_winters(state: State, horizons: List[int]) -> np.ndarray:
+    quarters = len(state["season"])
+    steps = (np.asarray(horizons)[:, None] - 1) * quarters + np.arange(1, quarters + 1)
+    values = state["level"] + steps[..., None] * state["trend"] + state["season"]
+    aggregation = state["aggregation"]
+    return np.where(
+        aggregation == AGGREGATIONS.index("sum"),
+        values.sum(axis=1),
+        np.where(
+            aggregation == AGGREGATIONS.index("mean"),
+            values.mean(axis=1),
+            values[:, -1],
+        ),
+    )
+
+
+def _fit_ar(panel: SeriesPanel) -> State:
+    scale = _scale(panel.annual)
+    changes = np.diff(panel.annual / scale, axis=0)
+    features, targets = _lagged(changes, AR_ORDER)
+    penalty = np.r_[0.0, np.full(AR_ORDER, AR_PENALTY)]
+    return {
+        "coef": _solve(features, targets, penalty, AR_ORDER + 2),
+        "recent": _recent(changes, AR_ORDER),
+        "level": panel.annual[-1] / scale,
+        "scale": scale,
+    }
+
+
+def _predict_ar(state: State, horizons: List[int]) -> np.ndarray:
+    changes = _autoregress(state["coef"], state["recent"], max(horizons))
+    levels = state["level"] + np.cumsum(changes, axis=0)
+    return levels[np.asarray(horizons) - 1] * state["scale"]
+
+
+def _fit_ridge(panel: SeriesPanel) -> State:
+    scale = _scale(panel.annual)
+    values = panel.annual / scale
+    features, targets = _lagged(values, RIDGE_LAGS)
+    penalty = np.r_[0.0, np.full(RIDGE_LAGS, RIDGE_PENALTY)]
+    return {
+        "coef": _solve(features, targets, penalty, 2),
+        "recent": _recent(values, RIDGE_LAGS),
+        "scale": scale,
+    }
+
+
+def _predict_ridge(state: State, horizons: List[int]) -> np.ndarray:
+    levels = _autoregress(state["coef"], state["recent"], max(horizons))
+    return levels[np.asarray(horizons) - 1] * state["scale"]
+
+
+# Forecasting models by name; "linear" is also what metrics without a
+# trained model are forecast with
+MODELS = {
+    model.name: model
+    for model in (
+        ForecastModel(
+            "linear",
+            "Least-squares linear trend of the annual values",
+            _fit_linear,
+            _predict_linear,
+        ),
+        ForecastModel(
+            "holt_winters",
+            "Additive Holt-Winters on the quarterly values, aggregated to years",
+            _fit_holt_winters,
+            _predict_holt_winters,
+        ),
+        ForecastModel(
+            "ar",
+            f"AR({AR_ORDER}) with drift on the annual changes (ARIMA({AR_ORDER},1,0))",
+            _fit_ar,
+            _predict_ar,
+        ),
+        ForecastModel(
+            "ridge",
+            f"Ridge regression on the last {RIDGE_LAGS} annual values",
+            _fit_ridge,
+            _predict_ridge,
+        ),
+    )
+}
@@ -1,9 +1,400 @@
-import pdfplumber
-import camelot
+import hashlib
+import math
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from app.services.extraction_cache import ExtractionCache, file_digest
 
+# Headings that open each primary statement, matched against the start of a page
+STATEMENT_HEADINGS = {
+    "income_statement": ("income statement", "statement of profit or loss"),
+    "financial_position": ("statement of financial position", "balance sheet"),
+    "cash_flow": ("statement of cash flows", "cash flow statement"),
+}
 
-def extract_jk_financials(pdf_path):
-    """Extracts tables from John Keells annual reports"""
-    tables = camelot.read_pdf(pdf_path, pages="all")
+# Row labels mapped to store metrics, per statement. The first matching row
+# wins unless the metric is listed in ACCUMULATED_METRICS.
+LINE_ITEMS = {
+    "income_statement": [
+        (r"^(total )?revenue$", "revenue"),
+        (r"^cost of sales", "cost_of_sales"),
+        (r"^selling and distribution expenses", "operating_expenses"),
+        (r"^administrative expenses", "operating_expenses"),
+        (r"^other operating expenses", "operating_expenses"),
+        (r"^(results from operating activities|operating profit)", "profit"),
+        (r"^finance costs?$", "interest_expense"),
+        (r"^profit for the year", "net_profit"),
+        (r"^(basic|basic earnings per share)$", "eps"),
+        (r"^dividends? per share", "dividend_per_share"),
+    ],
+    "financial_position": [
+        (r"^property, plant and equipment", "fixed_assets"),
+        (r"^inventories", "inventory"),
+        (r"^trade and other receivables", "receivables"),
+        (
+            r"^(cash in hand and at bank|cash and cash equivalents)",
+            "cash_and_equivalents",
+        ),
+        (r"^total assets", "total_assets"),
+        (r"^total equity$", "shareholders_equity"),
+        (r"^interest-bearing loans and borrowings", "long_term_debt"),
+        (r"^trade and other payables", "payables"),
+        (r"^total liabilities$", "total_liabilities"),
+    ],
+    "cash_flow": [
+        (r"^net cash flows? .*operating activities", "operating_cash_flow"),
+        (r"^net cash flows? .*investing activities", "investing_cash_flow"),
+        (r"^net cash flows? .*financing activities", "financing_cash_flow"),
+        (
+            r"^purchase (and construction )?of property, plant and equipment",
+            "capital_expenditure",
+        ),
+    ],
+}
+
+# Section headings whose unlabelled subtotal row is a metric
+SECTION_TOTALS = {
+    "current assets": "current_assets",
+    "equity attributable to equity holders": "shareholders_equity",
+    "non-current liabilities": "non_current_liabilities",
+    "current liabilities": "current_liabilities",
+}
+
+ACCUMULATED_METRICS = {"operating_expenses"}
+
+# Metrics reported in currency units per share rather than in thousands
+PER_SHARE_METRICS = {"eps", "dividend_per_share"}
+
+# Metrics that appear as deductions in the statements but are stored positive
+ABSOLUTE_METRICS = {
+    "cost_of_sales",
+    "operating_expenses",
+    "interest_expense",
+    "capital_expenditure",
+}
+
+# Fraction of the page height scanned for a statement heading
+HEADING_FRACTION = 0.15
+
+YEAR_PATTERN = re.compile(r"^(19|20)\d{2}$")
+NUMBER_PATTERN = re.compile(r"^\(?-?[\d,]+(\.\d+)?\)?$")
+
+
+def classify_page(text: str) -> Optional[str]:
+    """
+    Identify the primary statement a page opens with.
+
+    Args:
+        text (str): Text from the top of the page.
+
+    Returns:
+        str: Statement type from STATEMENT_HEADINGS, or None.
+    """
+    first_line = text.strip().lower().split("\n", 1)[0].strip()
+    for statement, headings in STATEMENT_HEADINGS.items():
+        if first_line.startswith(headings):
+            return statement
+    return None
+
+
+def load_backends() -> None:
+    """
+    Import pdfplumber and camelot.
+
+    They are imported on first use rather than with this module, since
+    camelot brings in pandas and OpenCV and takes about half a second; API
+    workers that never extract a report do not pay for them. Call this to
+    pay the cost up front instead, e.g. when warming up a worker.
+    """
+    import pdfplumber  # noqa: F401
+    import camelot  # noqa: F401
+
+
+def count_pages(pdf_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def scan_pages(pdf_path: str, pages: List[int]) -> Dict[int, str]:
+    """
+    Find the statement pages among ``pages`` with a cheap text scan.
+
+    Only the heading strip at the top of each page is extracted, which is a
+    small fraction of the cost of a full-page text or table extraction.
+
+    Args:
+        pdf_path (str): Path of the PDF.
+        pages (list): 1-based page numbers to scan.
+
+    Returns:
+        dict: Mapping of page number to statement type for matching pages.
+    """
+    import pdfplumber
+
+    found = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        for number in pages:
+            page = pdf.pages[number - 1]
+            heading = page.crop((0, 0, page.width, page.height * HEADING_FRACTION))
+            statement = classify_page(heading.extract_text() or "")
+            if statement:
+                found[number] = statement
+    return found
+
+
+def extract_page_tables(pdf_path: str, page: int) -> List[List[List[str]]]:
+    """
+    Extract the tables on one page with camelot.
+
+    Args:
+        pdf_path (str): Path of the PDF.
+        page (int): 1-based page number.
+
+    Returns:
+        list: Tables as lists of rows of cell strings.
+    """
+    import camelot
+
+    tables = camelot.read_pdf(pdf_path, pages=str(page), flavor="stream")
+    return [table.df.values.tolist() for table in tables]
+
+
+def parse_number(cell: str) -> Optional[float]:
+    """
+    Parse a statement figure such as "1,234", "(1,234)" or "-".
+
+    Args:
+        cell (str): The cell text.
+
+    Returns:
+        float: The value, negative for bracketed figures, 0.0 for a dash, or
+        None if the cell is not a figure.
+    """
+    cell = cell.strip()
+    if cell in ("-", "–"):
+        return 0.0
+    if not NUMBER_PATTERN.match(cell):
+        return None
+    value = float(cell.strip("()").replace(",", ""))
+    return -value if cell.startswith("(") else value
+
+
+def _year_columns(rows: List[List[str]]) -> Tuple[int, Dict[int, int]]:
+    """
+    Locate the header row and the first (group) column of each year.
+
+    Returns:
+        tuple: Index of the header row and a mapping of year to column index,
+        or (-1, {}) if the table has no year header.
+    """
+    for index, row in enumerate(rows):
+        years = [
+            (column, int(cell))
+            for column, cell in enumerate(row)
+            if YEAR_PATTERN.match(cell.strip())
+        ]
+        if len(years) >= 2:
+            columns: Dict[int, int] = {}
+            for column, year in years:
+                columns.setdefault(year, column)
+            return index, columns
+    return -1, {}
+
+
+def process_tables(tables: List[Dict[str, Any]]) -> Dict[int, Dict[str, float]]:
+    """
+    Normalise extracted statement tables into metric values per fiscal year.
+
+    Group (consolidated) figures are used, i.e. the first column for each
+    year. Figures reported in thousands are scaled to currency units.
+
+    Args:
+        tables (list): Dicts with the "statement" type and table "rows".
+
+    Returns:
+        dict: Mapping of fiscal year to a dict of metric values.
+    """
+    results: Dict[int, Dict[str, float]] = {}
+    for table in tables:
+        rows = table["rows"]
+        patterns = [
+            (re.compile(pattern), metric)
+            for pattern, metric in LINE_ITEMS.get(table["statement"], [])
+        ]
+        header, year_columns = _year_columns(rows)
+        if header < 0:
+            continue
+
+        scale = 1.0
+        section = ""
+        seen = set()
+        for row in rows[header + 1 :]:
+            label = re.sub(r"\s+", " ", row[0]).strip().lower()
+            if "'000" in label or "’000" in label:
+                scale = 1000.0
+            values = {
+                year: parse_number(row[column]) if column < len(row) else None
+                for year, column in year_columns.items()
+            }
+            if all(value is None for value in values.values()):
+                if label:
+                    section = label
+                continue
+
+            metric = None
+            if label:
+                for pattern, candidate in patterns:
+                    if pattern.match(label):
+                        metric = candidate
+                        break
+            else:
+                for heading, candidate in SECTION_TOTALS.items():
+                    if section.startswith(heading):
+                        metric = candidate
+                        break
+            if metric is None or (metric in seen and metric not in ACCUMULATED_METRICS):
+                continue
+            seen.add(metric)
+
+            factor = 1.0 if metric in PER_SHARE_METRICS else scale
+            for year, value in values.items():
+                if value is None:
+                    continue
+                value *= factor
+                if metric in ABSOLUTE_METRICS:
+                    value = abs(value)
+                year_metrics = results.setdefault(year, {})
+                if metric in ACCUMULATED_METRICS:
+                    year_metrics[metric] = year_metrics.get(metric, 0.0) + value
+                else:
+                    year_metrics.setdefault(metric, value)
+
+    for year_metrics in results.values():
+        non_current = year_metrics.pop("non_current_liabilities", None)
+        if (
+            "total_liabilities" not in year_metrics
+            and non_current is not None
+            and "current_liabilities" in year_metrics
+        ):
+            year_metrics["total_liabilities"] = (
+                non_current + year_metrics["current_liabilities"]
+            )
+    return results
+
+
+def _shard(pages: List[int], shards: int) -> List[List[int]]:
+    """Split page numbers into contiguous, roughly equal shards."""
+    size = max(1, math.ceil(len(pages) / max(1, shards)))
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+def page_digests(pdf_path: str) -> List[str]:
+    """
+    Return a digest of each page's content streams, in page order.
+
+    Only the raw streams are read, without any layout analysis, so this is
+    cheap next to scanning the pages' text.
+    """
+    import pdfplumber
+    from pdfminer.pdftypes import resolve1
+
+    digests = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            digest = hashlib.sha256()
+            for stream in page.page_obj.contents:
+                digest.update(resolve1(stream).get_data())
+            digests.append(digest.hexdigest())
+    return digests
+
+
+def extract_jk_financials(
+    pdf_path,
+    executor: Optional[Executor] = None,
+    workers: Optional[int] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> Dict[int, Dict[str, float]]:
+    """
+    Extracts tables from John Keells annual reports
+
+    Pages are scanned for statement headings in parallel shards and only the
+    statement pages are passed to camelot, one page per task. With a cache,
+    an unchanged report is answered without opening it and only pages whose
+    content changed are scanned or extracted again.
+
+    Args:
+        pdf_path (str): Path of the annual report.
+        executor (Executor, optional): Pool to run page tasks on. A process
+            pool is created for the call if not given and there is work to do.
+        workers (int, optional): Number of page shards to scan, and of
+            processes for a created pool. Defaults to the CPU count.
+        cache (ExtractionCache, optional): Cache of earlier extractions.
+
+    Returns:
+        dict: Mapping of fiscal year to a dict of metric values.
+    """
+    pdf_path = str(pdf_path)
+    workers = workers or os.cpu_count() or 1
+
+    statement_pages: Dict[int, str] = {}
+    page_tables: Dict[int, List[List[List[str]]]] = {}
+    if cache is not None:
+        file_hash = file_digest(pdf_path)
+        cached = cache.get_file(file_hash)
+        if cached is not None:
+            return {int(year): values for year, values in cached["figures"].items()}
+
+        digests = page_digests(pdf_path)
+        to_scan = []
+        for number, digest in enumerate(digests, start=1):
+            entry = cache.get_page(digest)
+            if entry is None:
+                to_scan.append(number)
+                continue
+            if entry["statement"]:
+                statement_pages[number] = entry["statement"]
+            if entry["tables"] is not None:
+                page_tables[number] = entry["tables"]
+    else:
+        to_scan = list(range(1, count_pages(pdf_path) + 1))
+
+    pool = executor
+    try:
+        if to_scan:
+            pool = pool or ProcessPoolExecutor(max_workers=workers)
+            shards = _shard(to_scan, workers)
+            for shard, found in zip(
+                shards, pool.map(scan_pages, [pdf_path] * len(shards), shards)
+            ):
+                statement_pages.update(found)
+                if cache is not None:
+                    for number in shard:
+                        cache.put_page(digests[number - 1], found.get(number))
+
+        pages = [page for page in sorted(statement_pages) if page not in page_tables]
+        if pages:
+            pool = pool or ProcessPoolExecutor(max_workers=workers)
+            for page, extracted in zip(
+                pages, pool.map(extract_page_tables, [pdf_path] * len(pages), pages)
+            ):
+                page_tables[page] = extracted
+                if cache is not None:
+                    cache.put_page(digests[page - 1], statement_pages[page], extracted)
+    finally:
+        if pool is not None and pool is not executor:
+            pool.shutdown()
+
+    tables = [
+        {"page": page, "statement": statement_pages[page], "rows": rows}
+        for page in sorted(statement_pages)
+        for rows in page_tables[page]
+    ]
     # Custom extraction logic for JK reports
-    return process_tables(tables)
+    figures = process_tables(tables)
+    if cache is not None:
+        cache.put_file(file_hash, digests, figures)
+    return figures
@@ -0,0 +1,284 @@
+import math
+import warnings
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.services.data_processor import get_annual_history
+from app.services.forecasting import DEFAULT_SEED, NOISE_SCALE
+from app.utils.config import DEFAULT_COMPANY
+from app.utils.metrics import timed
+
+# Percentiles of the simulated paths reported as fan bands by default
+PERCENTILES = (5.0, 50.0, 95.0)
+
+# Metrics simulated as a share of simulated revenue: the margin that sets the
+# share, and whether the metric is the complement of it (the costs a margin
+# leaves over) rather than the margin itself
+MARGIN_DRIVERS = {
+    "net_profit": ("net_profit_margin", False),
+    "cost_of_sales": ("gross_profit_margin", True),
+    "operating_expenses": ("operating_margin", True),
+}
+
+# Smallest annual volatility simulated, as a log growth rate for growing
+# series and in percentage points for margins, so that series with a very
+# smooth history still get open fan bands
+MIN_GROWTH_VOLATILITY = NOISE_SCALE
+MIN_MARGIN_VOLATILITY = 0.5
+
+# How each simulated series moves, by the codes in a dynamics' "mode" array
+MODES = ("growth", "level", "margin")
+
+
+def is_margin(metric: str) -> bool:
+    """Whether a metric is a margin in percent, shocked by margin shocks."""
+    return "margin" in metric
+
+
+def simulated_series(metrics: List[str]) -> List[str]:
+    """
+    List the series to simulate for some metrics.
+
+    Metrics in MARGIN_DRIVERS are replaced by revenue and their margin, so a
+    margin shock moves them and they stay consistent with revenue.
+    """
+    series: List[str] = []
+    for metric in metrics:
+        needed = (
+            ["revenue", MARGIN_DRIVERS[metric][0]]
+            if metric in MARGIN_DRIVERS
+            else [metric]
+        )
+        series.extend(name for name in needed if name not in series)
+    return series
+
+
+def estimate_dynamics(names: List[str], values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Estimate how each annual series moves from year to year.
+
+    Margins follow a driftless random walk in percentage points. Series
+    that have only been positive follow a random walk in logs, i.e. grow by
+    a random rate with the mean and standard deviation of their historical
+    log growth. Other series, which can change sign, follow a random walk
+    in levels with the drift and volatility of their annual changes.
+
+    Args:
+        names (list): Metric name of each column of ``values``.
+        values (ndarray): Annual values, shape (years, series), NaN where missing.
+
+    Returns:
+        dict: Arrays of shape (series,): "mode" codes indexing MODES, the
+        "last" observed value, and the "drift" and "volatility" of a step.
+        Series with fewer than two observations have NaN last values.
+    """
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=0)
+    rows = np.where(observed, np.arange(len(values))[:, None], -1).max(axis=0)
+    last = np.where(
+        count >= 2, values[np.maximum(rows, 0), np.arange(len(names))], np.nan
+    )
+
+    margin = np.array([is_margin(name) for name in names], dtype=bool)
+    positive = ~(observed & (values <= 0)).any(axis=0) & (last > 0)
+    mode = np.where(margin, 2, np.where(positive, 0, 1))
+
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        changes = np.diff(values, axis=0)
+        log_changes = np.diff(np.log(np.where(values > 0, values, np.nan)), axis=0)
+        steps = np.where(mode == 0, log_changes, changes)
+        drift = np.nan_to_num(np.nanmean(steps, axis=0))
+        volatility = np.nan_to_num(np.nanstd(steps, axis=0))
+
+    floor = np.select(
+        [mode == 0, mode == 2],
+        [MIN_GROWTH_VOLATILITY, MIN_MARGIN_VOLATILITY],
+        default=MIN_GROWTH_VOLATILITY * np.abs(np.nan_to_num(last)),
+    )
+    return {
+        "mode": mode,
+        "last": last,
+        "drift": np.where(mode == 2, 0.0, drift),
+        "volatility": np.maximum(volatility, floor),
+    }
+
+
+def standard_draws(
+    names: List[str], paths: int, horizon: int, seed: Optional[int] = DEFAULT_SEED
+) -> np.ndarray:
+    """
+    Draw the standard normal shocks of every simulated series.
+
+    Each series gets its own stream derived from ``seed`` and its name, as
+    in ``forecast_noise``, so its paths do not depend on which other series
+    are simulated with it.
+
+    Returns:
+        ndarray: Draws of shape (series, horizon, paths).
+    """
+    draws = np.empty((len(names), horizon, paths))
+    for i, name in enumerate(names):
+        stream = None if seed is None else [seed, zlib.crc32(name.encode("utf-8"))]
+        np.random.default_rng(stream).standard_normal((horizon, paths), out=draws[i])
+    return draws
+
+
+def simulate_paths(
+    dynamics: Dict[str, np.ndarray],
+    draws: np.ndarray,
+    growth_shock: float = 0.0,
+    margin_shock: float = 0.0,
+    volatility: float = 1.0,
+) -> np.ndarray:
+    """
+    Simulate the paths of every series in one set of array operations.
+
+    Paths are the last axis, so that the cumulative sums over years and the
+    percentiles over paths both run along contiguous memory.
+
+    Args:
+        dynamics (dict): Dynamics of the series from ``estimate_dynamics``.
+        draws (ndarray): Standard normal draws, shape (series, horizon, paths).
+        growth_shock (float): Percentage points added to the annual growth
+            of every series other than margins; for series that can change
+            sign, a change of that percentage of the last value per year.
+        margin_shock (float): Percentage points added to every margin from
+            the first simulated year on.
+        volatility (float): Multiplier of the estimated volatilities.
+
+    Returns:
+        ndarray: Simulated values, shape (series, horizon, paths).
+    """
+    mode, last = dynamics["mode"], dynamics["last"]
+    shock = np.select(
+        [mode == 0, mode == 1],
+        [math.log1p(growth_shock / 100), growth_shock / 100 * np.abs(last)],
+        default=0.0,
+    )
+    walk = (volatility * dynamics["volatility"])[:, None, None] * draws
+    walk += (dynamics["drift"] + shock)[:, None, None]
+    np.cumsum(walk, axis=1, out=walk)
+
+    growth = mode == 0
+    walk[growth] = last[growth, None, None] * np.exp(walk[growth])
+    start = last + np.where(mode == 2, margin_shock, 0.0)
+    walk[~growth] += start[~growth, None, None]
+    return walk
+
+
+def fan_bands(
+    paths: np.ndarray, percentiles: Tuple[float, ...] = PERCENTILES
+) -> Dict[str, np.ndarray]:
+    """
+    Summarize simulated paths year by year.
+
+    Args:
+        paths (ndarray): Simulated values, shape (..., horizon, paths).
+        percentiles (tuple): Percentiles to report, from 0 to 100.
+
+    Returns:
+        dict: "mean" and one "p<percentile>" array per percentile, e.g. "p5",
+        each of shape (..., horizon).
+    """
+    values = np.percentile(paths, percentiles, axis=-1)
+    bands = {f"p{p:g}": band for p, band in zip(percentiles, values)}
+    bands["mean"] = paths.mean(axis=-1)
+    return bands
+
+
+def _rounded(values: np.ndarray) -> List[Optional[float]]:
+    return [None if math.isnan(value) else round(value, 2) for value in values.tolist()]
+
+
+@timed("scenario.simulate")
+def run_scenario(
+    metrics: List[str],
+    years: int = 5,
+    paths: int = 10000,
+    growth_shock: float = 0.0,
+    margin_shock: float = 0.0,
+    volatility: float = 1.0,
+    percentiles: Tuple[float, ...] = PERCENTILES,
+    seed: Optional[int] = DEFAULT_SEED,
+    company: str = DEFAULT_COMPANY,
+) -> Dict[str, Any]:
+    """
+    Simulate many forecast paths of a company's metrics under a scenario.
+
+    Every series is simulated from its own annual history (see
+    ``estimate_dynamics``) with the scenario's shocks applied; metrics in
+    MARGIN_DRIVERS are computed from the simulated revenue and margin paths.
+
+    Args:
+        metrics (list): The metrics to simulate.
+        years (int): Number of years to simulate.
+        paths (int): Number of paths per metric.
+        growth_shock (float): Percentage points added to annual growth.
+        margin_shock (float): Percentage points added to margins.
+        volatility (float): Multiplier of the historical volatilities.
+        percentiles (tuple): Percentiles reported as fan bands.
+        seed (int, optional): Seed of the draws, or None for fresh ones.
+        company (str): The company identifier. Defaults to DEFAULT_COMPANY.
+
+    Returns:
+        dict: The simulated years, and for each metric its last observed
+        value, the dynamics it was simulated with and the fan bands per year.
+    """
+    metrics = list(dict.fromkeys(metrics))
+    names = simulated_series(metrics)
+    loaded = names + [metric for metric in metrics if metric not in names]
+    history_years, history = get_annual_history(loaded, company=company)
+    dynamics = estimate_dynamics(names, np.column_stack([history[n] for n in names]))
+    draws = standard_draws(names, paths, years, seed)
+    simulated = simulate_paths(dynamics, draws, growth_shock, margin_shock, volatility)
+
+    columns = {name: i for i, name in enumerate(names)}
+    series = []
+    for metric in metrics:
+        if metric in MARGIN_DRIVERS:
+            margin, complement = MARGIN_DRIVERS[metric]
+            share = simulated[columns[margin]] / 100
+            if complement:
+                share = 1 - share
+            series.append(simulated[columns["revenue"]] * share)
+        else:
+            series.append(simulated[columns[metric]])
+    bands = fan_bands(np.stack(series), tuple(percentiles))
+
+    last_year = int(history_years[-1]) if len(history_years) else 0
+    forecast_years = list(range(last_year + 1, last_year + years + 1))
+    results = {}
+    for j, metric in enumerate(metrics):
+        if metric in MARGIN_DRIVERS:
+            assumptions = {
+                "mode": "share_of_revenue",
+                "margin": MARGIN_DRIVERS[metric][0],
+            }
+        else:
+            i = columns[metric]
+            assumptions = {
+                "mode": MODES[dynamics["mode"][i]],
+                "drift": round(float(dynamics["drift"][i]), 4),
+                "volatility": round(float(dynamics["volatility"][i]), 4),
+            }
+        band_values = {name: _rounded(band[j]) for name, band in bands.items()}
+        results[metric] = {
+            "last_value": (_rounded(history[metric][-1:]) or [None])[0],
+            "assumptions": assumptions,
+            "bands": [
+                dict(
+                    {"year": year},
+                    **{name: values[k] for name, values in band_values.items()},
+                )
+                for k, year in enumerate(forecast_years)
+            ],
+        }
+    return {
+        "company": company,
+        "last_year": last_year,
+        "years": forecast_years,
+        "paths": paths,
+        "percentiles": list(percentiles),
+        "metrics": results,
+    }
@@ -0,0 +1,273 @@
+import re
+import time
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.services.data_processor import (
+    advertised_metrics,
+    annual_table,
+    company_paths,
+    data_stamp,
+    list_companies,
+    load_financial_store,
+    on_financial_reload,
+    read_annual_table,
+)
+from app.utils.cache import LRUCache
+from app.utils.config import DATA_RELOAD_INTERVAL, DEFAULT_COMPANY
+from app.utils.metrics import timed
+
+# Comparison operators accepted in screening filters
+OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$")
+
+# Panels for the most recently screened years, keyed by year
+_PANELS = LRUCache(64, "screening_panels")
+
+
+@on_financial_reload
+def _expire_panels(store) -> None:
+    # Data changed in this process; check the panels on their next use
+    for _, panel in _PANELS.items():
+        panel.checked_at = float("-inf")
+
+
+class ScreeningPanel:
+    """
+    Annual values of every advertised metric for every company in one year.
+
+    ``values`` holds one row per company and one column per metric, NaN
+    where a company lacks the metric or the year. ``stamps`` are the file
+    stamps each row was read at. Sort orders are computed once per metric
+    and direction and reused by every screen on the panel.
+    """
+
+    def __init__(
+        self,
+        year: int,
+        companies: List[str],
+        metrics: List[str],
+        values: np.ndarray,
+        stamps: Optional[List[Any]] = None,
+    ):
+        self.year = year
+        self.companies = companies
+        self.metrics = metrics
+        self.values = values
+        self.stamps = stamps or [None] * len(companies)
+        self.checked_at = time.monotonic()
+        self._columns = {metric: i for i, metric in enumerate(metrics)}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+
+    def column(self, metric: str) -> np.ndarray:
+        """Return one metric's values for every company."""
+        return self.values[:, self._columns[metric]]
+
+    def order(self, metric: str, descending: bool = True) -> np.ndarray:
+        """
+        Return company indices sorted by a metric, missing values last.
+
+        The order is computed on first use and cached on the panel.
+        """
+        key = (metric, descending)
+        if key not in self._orders:
+            column = self.column(metric)
+            self._orders[key] = np.argsort(
+                -column if descending else column, kind="stable"
+            )
+        return self._orders[key]
+
+
+def company_year(company: str, year: int, metrics: List[str]) -> np.ndarray:
+    """
+    Read one year of a company's annual figures.
+
+    The figures written along with the company's column files are
+    memory-mapped; without them the company's data is loaded and
+    aggregated. Either way the loaded stores are left alone, so screening
+    every company does not evict the ones requests are using.
+
+    Args:
+        company (str): The company identifier.
+        year (int): The fiscal year.
+        metrics (list): The metrics to read, in order.
+
+    Returns:
+        ndarray: The value of each metric, NaN where it is missing.
+    """
+    columns_dir, json_path = company_paths(company)
+    table = read_annual_table(columns_dir)
+    if table is None:
+        store = load_financial_store(
+            columns_dir, json_path, sample=company == DEFAULT_COMPANY
+        )
+        table = annual_table(store)
+    years, names, values = table
+
+    row = np.full(len(metrics), np.nan)
+    index = int(np.searchsorted(years, year))
+    if index == len(years) or years[index] != year:
+        return row
+    if names == metrics:
+        row[:] = values[index]
+    else:
+        columns = {name: i for i, name in enumerate(names)}
+        for i, metric in enumerate(metrics):
+            if metric in columns:
+                row[i] = values[index, columns[metric]]
+    return row
+
+
+@timed("screen.panel")
+def build_panel(
+    year: int,
+    companies: Optional[List[str]] = None,
+    stamps: Optional[List[Any]] = None,
+    previous: Optional[ScreeningPanel] = None,
+) -> ScreeningPanel:
+    """
+    Gather one year of every company's annual figures into a screening panel.
+
+    Args:
+        year (int): The fiscal year to screen.
+        companies (list, optional): The companies. Defaults to every company.
+        stamps (list, optional): The file stamp of each company.
+        previous (ScreeningPanel, optional): An older panel of the year; the
+            rows of companies whose stamp is unchanged are copied from it.
+
+    Returns:
+        ScreeningPanel: The panel, with a row for every company.
+    """
+    companies = list_companies() if companies is None else companies
+    stamps = [data_stamp(c) for c in companies] if stamps is None else stamps
+    metrics = advertised_metrics()
+    reuse = {}
+    if previous is not None and previous.metrics == metrics:
+        reuse = {
+            (company, stamp): row
+            for row, (company, stamp) in enumerate(
+                zip(previous.companies, previous.stamps)
+            )
+            if stamp is not None
+        }
+
+    values = np.full((len(companies), len(metrics)), np.nan)
+    for row, (company, stamp) in enumerate(zip(companies, stamps)):
+        old = reuse.get((company, stamp))
+        if old is not None:
+            values[row] = previous.values[old]
+        else:
+            values[row] = company_year(company, year, metrics)
+    return ScreeningPanel(year, companies, metrics, values, stamps)
+
+
+def get_panel(year: int) -> ScreeningPanel:
+    """
+    Return the screening panel for a year, building it on first use.
+
+    Every DATA_RELOAD_INTERVAL seconds the companies and their file stamps
+    are checked; only the rows of companies whose files changed are read
+    again.
+    """
+    panel = _PANELS.get(year)
+    now = time.monotonic()
+    if panel is not None and now - panel.checked_at < DATA_RELOAD_INTERVAL:
+        return panel
+
+    companies = list_companies()
+    stamps = [data_stamp(company) for company in companies]
+    if panel is not None and panel.companies == companies and panel.stamps == stamps:
+        panel.checked_at = now
+        return panel
+    panel = build_panel(year, companies, stamps, panel)
+    _PANELS.set(year, panel)
+    return panel
+
+
+def parse_filter(expression: str) -> Tuple[str, str, float]:
+    """
+    Parse a filter such as "debt_to_equity<1".
+
+    Returns:
+        tuple: The metric, operator and threshold.
+
+    Raises:
+        ValueError: If the expression is malformed or the metric unknown.
+    """
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter: {expression}")
+    metric, operator, threshold = match.groups()
+    if metric not in advertised_metrics():
+        raise ValueError(f"Unknown metric: {metric}")
+    try:
+        return metric, operator, float(threshold)
+    except ValueError:
+        raise ValueError(f"Invalid filter value: {expression}")
+
+
+def screen_companies(
+    year: int,
+    filters: Optional[List[str]] = None,
+    sort: Optional[str] = None,
+    descending: bool = True,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    Filter, rank and truncate companies by their annual metrics.
+
+    Every filter is one vectorized comparison over the panel; ranking walks
+    the cached sort order of ``sort`` and keeps the first ``limit`` matches.
+    Companies missing a filtered or sorted metric never match.
+
+    Args:
+        year (int): The fiscal year to screen.
+        filters (list, optional): Expressions such as "debt_to_equity<1",
+            all of which must hold.
+        sort (str, optional): Metric to rank by. Defaults to company order.
+        descending (bool): Rank the largest values first.
+        limit (int): Maximum number of companies to return.
+
+    Returns:
+        dict: The "year", the number of companies that "matched", and the
+        ranked "results" with each company's filtered and sorted metrics.
+
+    Raises:
+        ValueError: If a filter or the sort metric is invalid.
+    """
+    conditions = [parse_filter(expression) for expression in filters or []]
+    if sort is not None and sort not in advertised_metrics():
+        raise ValueError(f"Unknown metric: {sort}")
+
+    panel = get_panel(year)
+    mask = np.ones(len(panel.companies), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for metric, operator, threshold in conditions:
+            mask &= OPERATORS[operator](panel.column(metric), threshold)
+
+    if sort is not None:
+        mask &= ~np.isnan(panel.column(sort))
+        order = panel.order(sort, descending)
+        matched = order[mask[order]]
+    else:
+        matched = np.flatnonzero(mask)
+
+    fields = [] if sort is None else [sort]
+    for metric, _, _ in conditions:
+        if metric not in fields:
+            fields.append(metric)
+
+    results = []
+    for index in matched[:limit].tolist():
+        record: Dict[str, Any] = {"company": panel.companies[index]}
+        for metric in fields:
+            record[metric] = float(panel.column(metric)[index])
+        results.append(record)
+    return {"year": year, "matched": int(len(matched)), "results": results}
@@ -0,0 +1,333 @@
+import time
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional
+import numpy as np
+from app.models.shareholder import parse_shareholder_data, store_from_holdings
+from app.services.shareholder_store import ShareholderStore
+from app.utils.config import (
+    SHAREHOLDERS_JSON,
+    SHAREHOLDERS_COLUMNS_DIR,
+    DATA_RELOAD_INTERVAL,
+)
+from app.utils.file_utils import (
+    MANIFEST_NAME,
+    path_stamp,
+    read_json,
+    read_columns,
+    write_columns,
+)
+
+# Sample shareholders data
+SAMPLE_SHAREHOLDERS = {
+    2019: [
+        {"name": "Institutional Investors", "percentage": 45, "shares": 4500000},
+        {"name": "Retail Investors", "percentage": 30, "shares": 3000000},
+        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+    2020: [
+        {"name": "Institutional Investors", "percentage": 48, "shares": 4800000},
+        {"name": "Retail Investors", "percentage": 28, "shares": 2800000},
+        {"name": "Company Executives", "percentage": 14, "shares": 1400000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+    2021: [
+        {"name": "Institutional Investors", "percentage": 50, "shares": 5000000},
+        {"name": "Retail Investors", "percentage": 25, "shares": 2500000},
+        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+    2022: [
+        {"name": "Institutional Investors", "percentage": 52, "shares": 5200000},
+        {"name": "Retail Investors", "percentage": 23, "shares": 2300000},
+        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+    2023: [
+        {"name": "Institutional Investors", "percentage": 55, "shares": 5500000},
+        {"name": "Retail Investors", "percentage": 20, "shares": 2000000},
+        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+    2024: [
+        {"name": "Institutional Investors", "percentage": 58, "shares": 5800000},
+        {"name": "Retail Investors", "percentage": 17, "shares": 1700000},
+        {"name": "Company Executives", "percentage": 15, "shares": 1500000},
+        {"name": "Other", "percentage": 10, "shares": 1000000},
+    ],
+}
+
+
+def load_shareholder_store(
+    columns_dir: Path = SHAREHOLDERS_COLUMNS_DIR, json_path: Path = SHAREHOLDERS_JSON
+) -> ShareholderStore:
+    """
+    Load the shareholder store from data/processed.
+
+    Prefers the memory-mapped column files written by
+    ``convert_shareholders_json``, then shareholders.json, then the sample data.
+
+    Args:
+        columns_dir (Path): Directory of the converted column files.
+        json_path (Path): Path of shareholders.json.
+
+    Returns:
+        ShareholderStore: The loaded store.
+
+    Raises:
+        ValueError: If shareholders.json is invalid.
+    """
+    columns = read_columns(columns_dir)
+    if columns is not None:
+        manifest, arrays = columns
+        return ShareholderStore.from_arrays(
+            arrays,
+            manifest["labels"],
+            manifest["version"],
+            manifest.get("category_labels"),
+        )
+
+    data = read_json(json_path)
+    if not data:
+        return ShareholderStore.from_records(SAMPLE_SHAREHOLDERS)
+    return store_from_holdings(parse_shareholder_data(data, str(json_path)))
+
+
+def convert_shareholders_json(
+    json_path: Path = SHAREHOLDERS_JSON, columns_dir: Path = SHAREHOLDERS_COLUMNS_DIR
+) -> Dict[str, Any]:
+    """
+    Convert shareholders.json into memory-mappable column files.
+
+    Args:
+        json_path (Path): Path of shareholders.json.
+        columns_dir (Path): Directory to write the column files to.
+
+    Returns:
+        dict: The manifest of the written columns.
+
+    Raises:
+        ValueError: If the file is missing, empty or invalid.
+    """
+    data = read_json(json_path)
+    if not data:
+        raise ValueError(f"No shareholder data found in {json_path}")
+    store = store_from_holdings(parse_shareholder_data(data, str(json_path)))
+    return write_shareholder_columns(store, columns_dir)
+
+
+def write_shareholder_columns(
+    store: ShareholderStore, columns_dir: Path = SHAREHOLDERS_COLUMNS_DIR
+) -> Dict[str, Any]:
+    """
+    Write a store as memory-mappable column files, with its labels.
+
+    Args:
+        store (ShareholderStore): The store to write.
+        columns_dir (Path): Directory to write the column files to.
+
+    Returns:
+        dict: The manifest of the written columns.
+    """
+    return write_columns(
+        columns_dir,
+        store.to_arrays(),
+        {"labels": store.labels, "category_labels": store.category_labels},
+        store.version,
+    )
+
+
+_STORE: Optional[ShareholderStore] = None
+_STORE_STAMP: Any = None
+_CHECKED_AT = 0.0
+_RELOAD_LISTENERS: List[Callable[[ShareholderStore], None]] = []
+
+
+def _data_stamp() -> Any:
+    return path_stamp(SHAREHOLDERS_COLUMNS_DIR / MANIFEST_NAME, SHAREHOLDERS_JSON)
+
+
+def get_shareholder_store() -> ShareholderStore:
+    """
+    Return the shareholder store, loading it on first use.
+
+    Every DATA_RELOAD_INTERVAL seconds the processed files are checked for
+    changes written by another process, such as an ingestion run, and the
+    store is reloaded if they changed.
+    """
+    global _CHECKED_AT
+    if _STORE is None:
+        return reload_shareholder_data()
+    now = time.monotonic()
+    if now - _CHECKED_AT >= DATA_RELOAD_INTERVAL:
+        _CHECKED_AT = now
+        if _data_stamp() != _STORE_STAMP:
+            return reload_shareholder_data()
+    return _STORE
+
+
+def reload_shareholder_data() -> ShareholderStore:
+    """
+    Load the current data/processed contents, replacing the loaded store.
+
+    Listeners registered with ``on_shareholder_reload`` are called with the new
+    store when its version differs from the one it replaces.
+    """
+    global _STORE, _STORE_STAMP, _CHECKED_AT
+    stamp = _data_stamp()
+    store = load_shareholder_store()
+    previous = _STORE
+    _STORE, _STORE_STAMP, _CHECKED_AT = store, stamp, time.monotonic()
+    if previous is not None and previous.version != store.version:
+        for listener in list(_RELOAD_LISTENERS):
+            listener(store)
+    return store
+
+
+def refresh_shareholder_store() -> bool:
+    """
+    Reload the loaded shareholder store if its files changed.
+
+    Returns:
+        bool: Whether the store was reloaded.
+    """
+    global _CHECKED_AT
+    if _STORE is None:
+        return False
+    _CHECKED_AT = time.monotonic()
+    if _data_stamp() == _STORE_STAMP:
+        return False
+    reload_shareholder_data()
+    return True
+
+
+def on_shareholder_reload(
+    listener: Callable[[ShareholderStore], None]
+) -> Callable[[ShareholderStore], None]:
+    """Register ``listener`` to be called with the store after a data change."""
+    _RELOAD_LISTENERS.append(listener)
+    return listener
+
+
+def get_shareholders(year: Optional[int] = None) -> Any:
+    """
+    Get shareholders data for a specific year or all years.
+
+    Args:
+        year (int, optional): The year to get data for. If None, returns data for all years.
+
+    Returns:
+        list or dict: Holdings for the year (empty if unknown), or a mapping of
+        year to holdings for all years.
+    """
+    store = get_shareholder_store()
+    if year is not None:
+        return store.to_records(store.year_slice(year))
+    return {y: store.to_records(store.year_slice(y)) for y in store.available_years}
+
+
+def _category_rows(
+    store: ShareholderStore, categories: Optional[List[str]]
+) -> List[int]:
+    if categories is None:
+        return list(range(len(store.category_labels)))
+    return [store.category_labels.index(category) for category in categories]
+
+
+def get_category_history(
+    categories: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Get the holdings of each holder category over a range of years.
+
+    Args:
+        categories (list, optional): Categories to include. Defaults to all.
+        start_year (int, optional): The first year of the range.
+        end_year (int, optional): The last year of the range.
+
+    Returns:
+        dict: The "years" of the range and, per category, its "shares" and
+        "percentage" in each of those years.
+    """
+    store = get_shareholder_store()
+    years, shares, percentage = store.category_matrix()
+    lo = 0 if start_year is None else int(np.searchsorted(years, start_year))
+    hi = (
+        len(years)
+        if end_year is None
+        else max(lo, int(np.searchsorted(years, end_year, "right")))
+    )
+    return {
+        "years": years[lo:hi].tolist(),
+        "series": {
+            store.category_labels[row]: {
+                "shares": shares[row, lo:hi].tolist(),
+                "percentage": percentage[row, lo:hi].tolist(),
+            }
+            for row in _category_rows(store, categories)
+        },
+    }
+
+
+def get_category_changes(
+    categories: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Get the change in each holder category's holdings between consecutive years.
+
+    Changes are taken between consecutive years that have data, and the
+    first change in the range is relative to the year before it.
+
+    Args:
+        categories (list, optional): Categories to include. Defaults to all.
+        start_year (int, optional): The first year of the range.
+        end_year (int, optional): The last year of the range.
+
+    Returns:
+        dict: The "years" of the range that follow a year with data and, per
+        category, the change in its "shares" and "percentage" into each year.
+    """
+    store = get_shareholder_store()
+    years, shares, percentage = store.category_matrix()
+    lo = 1 if start_year is None else max(1, int(np.searchsorted(years, start_year)))
+    hi = (
+        len(years)
+        if end_year is None
+        else max(lo, int(np.searchsorted(years, end_year, "right")))
+    )
+    share_changes = np.diff(shares, axis=1)
+    percentage_changes = np.diff(percentage, axis=1)
+    return {
+        "years": years[lo:hi].tolist(),
+        "series": {
+            store.category_labels[row]: {
+                "shares": share_changes[row, lo - 1 : hi - 1].tolist(),
+                "percentage": percentage_changes[row, lo - 1 : hi - 1].tolist(),
+            }
+            for row in _category_rows(store, categories)
+        },
+    }
+
+
+def get_top_holders(year: int, n: int = 10) -> Dict[str, Any]:
+    """
+    Get the largest holdings of a year and their combined stake.
+
+    Args:
+        year (int): The year to get holdings for.
+        n (int): Number of holdings to return.
+
+    Returns:
+        dict: The "holders", largest first, and their combined "percentage".
+    """
+    store = get_shareholder_store()
+    top = store.top_holders(year, n)
+    return {
+        "year": year,
+        "holders": store.to_records(top),
+        "percentage": float(store.percentage[top].sum()),
+    }
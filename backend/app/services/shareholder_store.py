@@ -0,0 +1,209 @@
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from app.utils.file_utils import columns_version
+
+
+class ShareholderStore:
+    """
+    Column-oriented store of shareholder holdings by year.
+
+    Rows are sorted by year; holder names are dictionary-encoded into
+    ``labels`` and holder categories into ``category_labels``, so every row
+    is a year, a holder code, a category code, a share count and a
+    percentage holding. ``version`` is a content hash of the data.
+
+    Category totals per year are aggregated once into a category-by-year
+    matrix on first use, so history and change queries never scan the
+    individual holdings.
+    """
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        codes: np.ndarray,
+        shares: np.ndarray,
+        percentage: np.ndarray,
+        labels: List[str],
+        version: Optional[str] = None,
+        categories: Optional[np.ndarray] = None,
+        category_labels: Optional[List[str]] = None,
+    ):
+        self.years = years
+        self.codes = codes
+        self.shares = shares
+        self.percentage = percentage
+        self.labels = labels
+        # Holders without a category are their own category
+        self.categories = codes if categories is None else categories
+        self.category_labels = labels if category_labels is None else category_labels
+        self.version = version or columns_version(
+            dict(
+                self.to_arrays(),
+                labels=np.array(labels),
+                category_labels=np.array(self.category_labels),
+            )
+        )
+        self._matrix: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_records(cls, data: Dict[int, List[Dict[str, Any]]]) -> "ShareholderStore":
+        """
+        Build a store from year-keyed lists of holding dicts.
+
+        Args:
+            data (dict): Mapping of year to a list of dicts with "name",
+                "percentage", "shares" and optionally "category". A holding
+                without a category is its own category.
+
+        Returns:
+            ShareholderStore: Store holding the same data in columnar form.
+        """
+        labels: List[str] = []
+        codes: Dict[str, int] = {}
+        category_labels: List[str] = []
+        category_codes: Dict[str, int] = {}
+        rows = []
+        for year in sorted(data, key=int):
+            for item in data[year]:
+                name = item["name"]
+                category = item.get("category") or name
+                if name not in codes:
+                    codes[name] = len(labels)
+                    labels.append(name)
+                if category not in category_codes:
+                    category_codes[category] = len(category_labels)
+                    category_labels.append(category)
+                rows.append(
+                    (
+                        int(year),
+                        codes[name],
+                        category_codes[category],
+                        item["shares"],
+                        item["percentage"],
+                    )
+                )
+
+        return cls(
+            np.array([row[0] for row in rows], dtype=np.int16),
+            np.array([row[1] for row in rows], dtype=np.int32),
+            np.array([row[3] for row in rows], dtype=np.int64),
+            np.array([row[4] for row in rows], dtype=np.float64),
+            labels,
+            categories=np.array([row[2] for row in rows], dtype=np.int32),
+            category_labels=category_labels,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: Dict[str, np.ndarray],
+        labels: List[str],
+        version: Optional[str] = None,
+        category_labels: Optional[List[str]] = None,
+    ) -> "ShareholderStore":
+        """Build a store from the mapping produced by ``to_arrays``."""
+        return cls(
+            arrays["years"],
+            arrays["codes"],
+            arrays["shares"],
+            arrays["percentage"],
+            labels,
+            version,
+            arrays.get("categories"),
+            category_labels,
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the store's arrays as one flat mapping."""
+        return {
+            "years": self.years,
+            "codes": self.codes,
+            "categories": self.categories,
+            "shares": self.shares,
+            "percentage": self.percentage,
+        }
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    @property
+    def available_years(self) -> List[int]:
+        """Years that have at least one holding, ascending."""
+        return np.unique(self.years).tolist()
+
+    def year_slice(self, year: int) -> slice:
+        """Return the row slice holding one year's holdings."""
+        start = int(np.searchsorted(self.years, year, side="left"))
+        stop = int(np.searchsorted(self.years, year, side="right"))
+        return slice(start, stop)
+
+    def to_records(self, rows: Any = slice(None)) -> List[Dict[str, Any]]:
+        """
+        Materialize rows as the holding dicts served by the API.
+
+        Args:
+            rows (slice or ndarray): Row slice, or array of row indices, to
+                materialize.
+
+        Returns:
+            list: One dict per holding with "name", "category", "percentage"
+            and "shares".
+        """
+        return [
+            {
+                "name": self.labels[code],
+                "category": self.category_labels[category],
+                "percentage": percentage,
+                "shares": shares,
+            }
+            for code, category, percentage, shares in zip(
+                self.codes[rows].tolist(),
+                self.categories[rows].tolist(),
+                self.percentage[rows].tolist(),
+                self.shares[rows].tolist(),
+            )
+        ]
+
+    def category_matrix(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the holdings of every category in every year.
+
+        The matrices are aggregated from the holdings once and reused.
+
+        Returns:
+            tuple: Years (ascending), shares and percentages, each matrix of
+            shape (categories, years). Categories absent in a year hold 0.
+        """
+        if self._matrix is None:
+            years, year_index = np.unique(self.years, return_inverse=True)
+            cells = self.categories.astype(np.int64) * len(years) + year_index
+            size = len(self.category_labels) * len(years)
+            shape = (len(self.category_labels), len(years))
+            shares = np.bincount(cells, weights=self.shares, minlength=size)
+            percentage = np.bincount(cells, weights=self.percentage, minlength=size)
+            self._matrix = (
+                years.astype(np.int64),
+                np.rint(shares).astype(np.int64).reshape(shape),
+                percentage.reshape(shape),
+            )
+        return self._matrix
+
+    def top_holders(self, year: int, n: int) -> np.ndarray:
+        """
+        Locate the ``n`` largest holdings of a year.
+
+        Args:
+            year (int): The year.
+            n (int): Number of holdings to return.
+
+        Returns:
+            ndarray: Row indices of the holdings, largest first.
+        """
+        rows = self.year_slice(year)
+        shares = self.shares[rows]
+        if n < len(shares):
+            top = np.argpartition(-shares, n - 1)[:n]
+        else:
+            top = np.arange(len(shares))
+        top = top[np.argsort(-shares[top], kind="stable")]
+        return rows.start + top
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List, Optional
+from app.services.data_processor import get_store
+from app.services.executor import CPU_EXECUTOR, BoundedExecutor
+from app.services.shareholder_processor import get_shareholder_store
+
+# Warm-up steps, in the order they run
+WARMUP_TARGETS = ("data", "pool", "pdf")
+
+# Seconds pool processes wait for each other while warming up
+POOL_WARMUP_TIMEOUT = 60.0
+
+
+def warm_data() -> None:
+    """Open the default company's financial and shareholder stores."""
+    get_store()
+    get_shareholder_store()
+
+
+def warm_worker(barrier: Optional[Any] = None) -> int:
+    """
+    Load the default financial store in a CPU pool process.
+
+    Args:
+        barrier (Barrier, optional): Shared barrier to wait on once loaded,
+            so the process takes no other warm-up task.
+
+    Returns:
+        int: The id of the process.
+    """
+    get_store()
+    if barrier is not None:
+        barrier.wait(POOL_WARMUP_TIMEOUT)
+    return os.getpid()
+
+
+def warm_pool(executor: Optional[BoundedExecutor] = None) -> List[int]:
+    """
+    Start every CPU pool process and load the data in it.
+
+    Without this the processes are started by the first forecast or insight
+    requests, which then wait for the fork and the data load. Each warm-up
+    task waits on a shared barrier until all of them are running, so no
+    process can finish its task and take another's, and every process of
+    the pool is started and warmed.
+
+    Args:
+        executor (BoundedExecutor, optional): Pool to warm. Defaults to the
+            CPU pool.
+
+    Returns:
+        list: The id of the process each warm-up task ran in.
+
+    Raises:
+        BrokenBarrierError: If the processes did not all start within
+            POOL_WARMUP_TIMEOUT seconds.
+    """
+    executor = executor or CPU_EXECUTOR
+    with multiprocessing.Manager() as manager:
+        barrier = manager.Barrier(executor.max_workers)
+        futures = [
+            executor.submit(warm_worker, barrier) for _ in range(executor.max_workers)
+        ]
+        return [future.result() for future in futures]
+
+
+def warm_pdf() -> None:
+    """Import the PDF extraction libraries, for workers that ingest reports."""
+    from app.services.pdf_parser import load_backends
+
+    load_backends()
+
+
+def warm_up(targets: List[str]) -> Dict[str, float]:
+    """
+    Do the one-off work of a cold worker before it serves requests.
+
+    Startup itself stays minimal: stores are opened, pool processes started
+    and heavy libraries imported on first use. Warming up moves that cost
+    from the first requests to startup, for deployments that only route
+    traffic to a worker once it has started.
+
+    Args:
+        targets (list): Steps to run: "data" opens the default company's
+            financial and shareholder stores, "pool" starts the CPU pool
+            processes and "pdf" imports the PDF extraction libraries.
+
+    Returns:
+        dict: Seconds taken by each step that ran.
+
+    Raises:
+        ValueError: If a target is not one of WARMUP_TARGETS.
+    """
+    unknown = sorted(set(targets) - set(WARMUP_TARGETS))
+    if unknown:
+        raise ValueError(f"Unknown warm-up targets: {', '.join(unknown)}")
+
+    steps = {
+        "data": warm_data,
+        "pool": warm_pool,
+        "pdf": warm_pdf,
+    }
+    timings = {}
+    for target in WARMUP_TARGETS:
+        if target in targets:
+            started = time.perf_counter()
+            steps[target]()
+            timings[target] = time.perf_counter() - started
+    return timings
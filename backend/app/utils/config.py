@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Root of the backend package (the directory holding app/, data/ and scripts/)
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data"))
+RAW_DATA_DIR = Path(os.getenv("RAW_DATA_DIR", DATA_DIR / "raw"))
+PROCESSED_DATA_DIR = Path(os.getenv("PROCESSED_DATA_DIR", DATA_DIR / "processed"))
+
+FINANCIAL_JSON = PROCESSED_DATA_DIR / "financial_data.json"
+SHAREHOLDERS_JSON = PROCESSED_DATA_DIR / "shareholders.json"
+FINANCIAL_COLUMNS_DIR = PROCESSED_DATA_DIR / "financial"
+SHAREHOLDERS_COLUMNS_DIR = PROCESSED_DATA_DIR / "shareholders"
+EXTRACTION_CACHE_DIR = Path(
+    os.getenv("EXTRACTION_CACHE_DIR", DATA_DIR / "cache" / "extraction")
+)
+
+# Seconds between checks of data/processed for data written by another process
+DATA_RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "5"))
+
+# Maximum entries kept in each in-process model and statistics cache
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "512"))
+
+# Versioned forecasting models written by scripts/model_training.py
+MODEL_REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", DATA_DIR / "models"))
+
+# Maximum serialized API responses kept in memory
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# Companies other than the default keep their data in companies/<company>/
+COMPANIES_DIR = PROCESSED_DATA_DIR / "companies"
+
+# Company served by the routes without a company, stored in data/processed
+DEFAULT_COMPANY = os.getenv("DEFAULT_COMPANY", "jkh")
+
+# Maximum company stores a worker keeps loaded at once
+COMPANY_CACHE_SIZE = int(os.getenv("COMPANY_CACHE_SIZE", "32"))
+
+# Worker processes for CPU-bound request work, and tasks allowed to wait for them
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 1)))
+CPU_QUEUE_SIZE = int(os.getenv("CPU_QUEUE_SIZE", "64"))
+
+# Most years ahead a forecast may reach
+FORECAST_MAX_YEARS = int(os.getenv("FORECAST_MAX_YEARS", "50"))
+
+# Most simulated paths, years simulated, metrics and percentiles allowed in
+# one scenario request
+SCENARIO_MAX_PATHS = int(os.getenv("SCENARIO_MAX_PATHS", "50000"))
+SCENARIO_MAX_YEARS = int(os.getenv("SCENARIO_MAX_YEARS", "20"))
+SCENARIO_MAX_METRICS = int(os.getenv("SCENARIO_MAX_METRICS", "10"))
+SCENARIO_MAX_PERCENTILES = int(os.getenv("SCENARIO_MAX_PERCENTILES", "20"))
+
+# Background jobs allowed to wait behind the running one, and jobs remembered
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "8"))
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "100"))
+
+# Live updates (/api/events): events buffered per session before it is told
+# to resync, events kept for sessions that reconnect, and seconds between
+# keep-alive comments on idle connections
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "64"))
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "256"))
+EVENT_KEEPALIVE = float(os.getenv("EVENT_KEEPALIVE", "15"))
+
+# Allow starting the sampling profiler over HTTP (/debug/profiler); off by default
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+
+# Work done when a worker starts, before it serves requests: comma-separated
+# "data", "pool" and/or "pdf" (see app/services/warmup.py); none by default
+WARMUP = [name.strip() for name in os.getenv("WARMUP", "").split(",") if name.strip()]
@@ -0,0 +1,56 @@
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, List
+from app.utils.http_cache import serialize
+
+# Media type of each streaming export format
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunks(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encode chunks of records as newline-delimited JSON, one chunk at a time."""
+    for records in chunks:
+        if records:
+            yield b"".join(serialize(record) + b"\n" for record in records)
+
+
+def csv_chunks(
+    chunks: Iterable[List[Dict[str, Any]]], fieldnames: List[str]
+) -> Iterator[bytes]:
+    """
+    Encode chunks of records as CSV, header first, one chunk at a time.
+
+    Missing values are written as empty fields.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    for records in chunks:
+        writer.writerows(records)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export_chunks(
+    chunks: Iterable[List[Dict[str, Any]]], format: str, fieldnames: List[str]
+) -> Iterator[bytes]:
+    """
+    Encode chunks of records in a streaming export format.
+
+    Args:
+        chunks (iterable): Chunks of records sharing ``fieldnames``.
+        format (str): "ndjson" or "csv".
+        fieldnames (list): Record keys, in column order for CSV.
+
+    Returns:
+        iterator: Encoded byte chunks.
+    """
+    if format == "csv":
+        return csv_chunks(chunks, fieldnames)
+    return ndjson_chunks(chunks)
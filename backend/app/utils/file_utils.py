@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+COLUMN_FORMAT = 1
+
+# Names of the version folders written by ``write_columns``
+VERSION_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """
+    Read a JSON file, treating a missing or empty file as ``default``.
+
+    Args:
+        path (Path): The file to read.
+        default: Value returned when the file is missing or empty.
+
+    Returns:
+        The decoded JSON document or ``default``.
+    """
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically write ``data`` as JSON, replacing any existing file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def path_stamp(*paths: Path) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """
+    Return the modification time and size of each path, None if missing.
+
+    Comparing stamps is a cheap way to notice files rewritten by another
+    process without reading them.
+    """
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stamps.append(None)
+        else:
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def columns_version(arrays: Dict[str, np.ndarray]) -> str:
+    """Return a short content hash identifying a set of named arrays."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode("utf-8"))
+        digest.update(array.dtype.str.encode("ascii"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def write_columns(
+    directory: Path,
+    arrays: Dict[str, np.ndarray],
+    metadata: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Persist named arrays as one ``.npy`` file each plus a manifest.
+
+    Arrays are written into a subdirectory named after their content version
+    and the manifest is swapped in last, so readers that already mapped an
+    older version keep working while new readers pick up the new one. The
+    version the manifest pointed at before is kept for readers that read
+    the old manifest just before it was replaced; older versions are
+    deleted.
+
+    Args:
+        directory (Path): Directory holding the manifest and version folders.
+        arrays (dict): Mapping of column name to a 1-D array.
+        metadata (dict, optional): Extra JSON-serializable manifest entries.
+        version (str, optional): Version to record. Defaults to the content
+            hash of ``arrays``.
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    directory = Path(directory)
+    version = version or columns_version(arrays)
+    previous = read_json(directory / MANIFEST_NAME, {}).get("version")
+    version_dir = directory / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(version_dir / f"{name}.npy", np.ascontiguousarray(array))
+
+    manifest = {
+        "format": COLUMN_FORMAT,
+        "version": version,
+        "rows": int(len(next(iter(arrays.values())))) if arrays else 0,
+        "columns": {name: array.dtype.str for name, array in arrays.items()},
+    }
+    manifest.update(metadata or {})
+    write_json(directory / MANIFEST_NAME, manifest)
+
+    for path in directory.iterdir():
+        if (
+            path.is_dir()
+            and VERSION_PATTERN.match(path.name)
+            and path.name not in (version, previous)
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+    return manifest
+
+
+def read_columns(
+    directory: Path, mmap: bool = True
+) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """
+    Open the arrays written by ``write_columns``.
+
+    Args:
+        directory (Path): Directory holding the manifest.
+        mmap (bool): Memory-map the arrays read-only instead of reading them.
+
+    Returns:
+        tuple: The manifest and a mapping of column name to array, or None if
+        no manifest exists.
+    """
+    directory = Path(directory)
+    manifest = read_json(directory / MANIFEST_NAME)
+    if manifest is None:
+        return None
+    if manifest.get("format") != COLUMN_FORMAT:
+        raise ValueError(
+            f"Unsupported column format {manifest.get('format')} in {directory}"
+        )
+
+    version_dir = directory / manifest["version"]
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(version_dir / f"{name}.npy", mmap_mode=mmap_mode)
+        for name in manifest["columns"]
+    }
+    return manifest, arrays
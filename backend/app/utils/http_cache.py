@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import orjson
+from fastapi import Request, Response
+from app.utils.cache import LRUCache
+from app.utils.config import RESPONSE_CACHE_SIZE
+from app.utils.metrics import timed
+from app.utils.singleflight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# Preferred content encodings, best first
+ENCODINGS = ("br", "gzip")
+
+# Suffix of each encoding's ETag, after the digest of the uncompressed body
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+RESPONSE_CACHE = LRUCache(RESPONSE_CACHE_SIZE, "responses")
+
+# Misses for the same key computed concurrently share one computation
+RESPONSE_FLIGHTS = SingleFlight("responses")
+
+
+@timed("serialize")
+def serialize(payload: Any) -> bytes:
+    """
+    Serialize a JSON-compatible payload to compact UTF-8 bytes with orjson.
+
+    Non-string dict keys, such as years, are written as strings, and NaN and
+    infinite floats as null.
+    """
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+class PreparedResponse:
+    """
+    A serialized response body with its compressed variants and their ETags.
+
+    Each encoding is a different representation, so each has its own
+    strong ETag: the body's digest, suffixed with "-gz" or "-br" for the
+    compressed ones. Instances are built once per cache key and shared
+    between requests, so serving a cached response never touches the
+    original payload.
+    """
+
+    __slots__ = ("etags", "bodies")
+
+    def __init__(self, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body)
+        self.etags = {
+            encoding: f'"{digest}{ETAG_SUFFIXES[encoding]}"' for encoding in self.bodies
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "PreparedResponse":
+        """Serialize ``payload`` and prepare it for serving."""
+        return cls(serialize(payload))
+
+    def respond(self, request: Request) -> Response:
+        """
+        Build the response for ``request``.
+
+        The best encoding the client accepts is chosen first. GET and HEAD
+        requests whose If-None-Match lists that encoding's ETag get an empty
+        304; otherwise the body in that encoding is served.
+        """
+        encoding = negotiate_encoding(
+            request.headers.get("accept-encoding"), self.bodies
+        )
+        headers = {"ETag": self.etags[encoding], "Vary": "Accept-Encoding"}
+        if request.method in ("GET", "HEAD") and etag_matches(
+            request.headers.get("if-none-match"), self.etags[encoding]
+        ):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header value matches ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates
+    )
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str], available: Dict[str, bytes]
+) -> str:
+    """
+    Pick the content encoding to serve.
+
+    Args:
+        accept_encoding (str, optional): The request's Accept-Encoding header.
+        available (dict): Prepared bodies keyed by encoding.
+
+    Returns:
+        str: The preferred available encoding the client accepts, or "identity".
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and quality > 0:
+            return encoding
+    return "identity"
+
+
+def cached_response(
+    request: Request, key: Hashable, compute: Callable[[], Any]
+) -> Response:
+    """
+    Serve a payload from the response cache, computing it on a miss.
+
+    The key must identify the payload completely, including the version of
+    every dataset it is computed from. Exceptions raised by ``compute``,
+    such as an HTTPException for missing data, propagate and are not cached.
+
+    Args:
+        request (Request): The incoming request.
+        key (hashable): Cache key of the payload.
+        compute (callable): Builds the JSON-compatible payload.
+
+    Returns:
+        Response: The serialized, possibly compressed, response.
+    """
+    prepared = RESPONSE_CACHE.get_or_compute(
+        key, lambda: PreparedResponse.from_payload(compute())
+    )
+    return prepared.respond(request)
+
+
+async def cached_response_async(
+    request: Request, key: Hashable, compute: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Serve a payload from the response cache, awaiting ``compute`` on a miss.
+
+    Like ``cached_response``, for payloads computed off the event loop.
+    Concurrent misses for the same key share a single ``compute`` call.
+    """
+    prepared = RESPONSE_CACHE.get(key)
+    if prepared is None:
+        prepared = await RESPONSE_FLIGHTS.do(key, lambda: _prepare(key, compute))
+    return prepared.respond(request)
+
+
+async def _prepare(
+    key: Hashable, compute: Callable[[], Awaitable[Any]]
+) -> PreparedResponse:
+    prepared = PreparedResponse.from_payload(await compute())
+    RESPONSE_CACHE.set(key, prepared)
+    return prepared
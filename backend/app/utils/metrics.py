@@ -0,0 +1,278 @@
+import bisect
+import functools
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Upper bounds (bytes) of the payload size histogram buckets
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets, one series per label set.
+
+    Rendered in the Prometheus text format with cumulative ``_bucket``
+    counts and ``_sum``/``_count`` series.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...],
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Bucket counts, then +Inf, sum and count
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.snapshot().items()):
+            base = _labels(zip(self.labels, labels))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-2]):
+                cumulative += count
+                le = _labels(list(zip(self.labels, labels)) + [("le", str(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative:g}")
+            lines.append(f"{self.name}_sum{base} {series[-2]:.6g}")
+            lines.append(f"{self.name}_count{base} {series[-1]:g}")
+        return lines
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Any) -> str:
+    text = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + text + "}" if text else ""
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, by route template and status",
+    ("method", "route", "status"),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size, by route template",
+    ("method", "route"),
+    SIZE_BUCKETS,
+)
+SPAN_LATENCY = Histogram(
+    "service_span_duration_seconds",
+    "Time spent in instrumented service-layer spans",
+    ("span",),
+)
+
+# Span timings recorded by the current worker task, shipped back to the
+# submitting process (see ``collect_spans``)
+_SPAN_BUFFER = threading.local()
+
+
+def record_span(span: str, seconds: float) -> None:
+    """Record one span duration, or buffer it if spans are being collected."""
+    buffer = getattr(_SPAN_BUFFER, "spans", None)
+    if buffer is None:
+        SPAN_LATENCY.observe(seconds, span)
+    else:
+        buffer.append((span, seconds))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a service span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator timing every call of a function as a service span."""
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_span(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def collect_spans(
+    fn: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Tuple[Any, List[Tuple[str, float]]]:
+    """
+    Call ``fn`` and return its result with the spans it recorded.
+
+    Used to run tasks in worker processes, whose span timings would
+    otherwise never reach the process serving ``/metrics``; pass the spans
+    to ``merge_spans`` there.
+    """
+    _SPAN_BUFFER.spans = []
+    try:
+        result = fn(*args, **kwargs)
+        return result, _SPAN_BUFFER.spans
+    finally:
+        _SPAN_BUFFER.spans = None
+
+
+def merge_spans(spans: List[Tuple[str, float]]) -> None:
+    """Record span timings collected in another process."""
+    for name, seconds in spans:
+        SPAN_LATENCY.observe(seconds, name)
+
+
+# Sources of point-in-time statistics, such as caches and executors
+_STATS_SOURCES: List[Tuple[str, Callable[[], Any]]] = []
+
+
+def register_stats(kind: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Expose the numeric fields of ``stats()`` as ``<kind>_<field>`` gauges.
+
+    The source is labelled by the "name" field of its stats. Bound methods
+    are held weakly, so registering does not keep their object alive.
+    """
+    if hasattr(stats, "__self__"):
+        ref: Callable[[], Any] = weakref.WeakMethod(stats)
+    else:
+
+        def ref() -> Callable[[], Dict[str, Any]]:
+            return stats
+
+    _STATS_SOURCES.append((kind, ref))
+
+
+def _render_stats() -> List[str]:
+    values: Dict[str, List[str]] = {}
+    live = []
+    for kind, ref in _STATS_SOURCES:
+        stats = ref()
+        if stats is None:
+            continue
+        live.append((kind, ref))
+        snapshot = stats()
+        label = _labels([("name", snapshot.get("name") or kind)])
+        for field, value in snapshot.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.setdefault(f"{kind}_{field}", []).append(f"{label} {value:g}")
+    _STATS_SOURCES[:] = live
+
+    lines = []
+    for metric in sorted(values):
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(f"{metric}{sample}" for sample in values[metric])
+    return lines
+
+
+def render_prometheus() -> str:
+    """Render every histogram and statistics source in the Prometheus text format."""
+    lines: List[str] = []
+    for histogram in (REQUEST_LATENCY, RESPONSE_SIZE, SPAN_LATENCY):
+        lines.extend(histogram.render())
+    lines.extend(_render_stats())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and response size per route template.
+
+    Routes are labelled by their path template (e.g. ``/api/financial/{year}``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._templates: Dict[Any, str] = {}
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            router = scope.get("router")
+            for route in getattr(router, "routes", []):
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = self._templates[endpoint] = route.path
+                    break
+        return template or "unmatched"
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route(scope)
+            method = scope["method"]
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, method, route, str(response["status"])
+            )
+            RESPONSE_SIZE.observe(response["size"], method, route)
@@ -0,0 +1,77 @@
+import collections
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples every thread's stack at an interval.
+
+    Samples are aggregated as collapsed stacks ("outer;inner count" lines),
+    the input format of flame graph tools such as flamegraph.pl and
+    speedscope. Sampling runs in a daemon thread and costs nothing when
+    stopped.
+    """
+
+    def __init__(self) -> None:
+        self.interval = 0.005
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self._stacks: Dict[str, int] = collections.Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.005) -> None:
+        """Discard earlier samples and start sampling every ``interval`` seconds."""
+        with self._lock:
+            if self.running:
+                return
+            self.interval = interval
+            self.samples = 0
+            self._stacks = collections.Counter()
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks collected."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Return the samples so far as collapsed stack lines, most frequent first."""
+        stacks = sorted(self._stacks.items(), key=lambda item: -item[1])
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.utils.metrics import register_stats
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving while it is in flight await the same task instead of starting
+    their own, and all of them receive its result or exception. The key is
+    forgotten once the task finishes, so later calls compute afresh (callers
+    cache results separately if they want them reused).
+
+    A caller being cancelled does not cancel the shared computation.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        register_stats("singleflight", self.stats)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return ``fn()``, sharing it with concurrent calls for ``key``.
+
+        Args:
+            key (hashable): Identifies calls that compute the same result.
+            fn (callable): Starts the computation; only called by the first
+                caller for an idle key.
+
+        Returns:
+            The computation's result.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the call, shared-call and in-flight counts."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1 @@
+"""Throughput and latency benchmarks for the services and the HTTP API."""
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class ASGIResponse:
+    """Status, headers and body of a response collected from an ASGI app."""
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ASGIClient:
+    """
+    Minimal in-process HTTP client for an ASGI app.
+
+    Requests are passed straight to the app callable, without sockets or
+    an HTTP parser, so timings measure the application alone. Bodies are
+    sent in one message and streamed responses are collected in full.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def startup(self) -> None:
+        """Run the app's startup handlers."""
+        await self.app.router.startup()
+
+    async def shutdown(self) -> None:
+        """Run the app's shutdown handlers."""
+        await self.app.router.shutdown()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> ASGIResponse:
+        """
+        Send one request to the app and collect its response.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            params (dict, optional): Query parameters; lists repeat the key.
+            json_body (optional): Payload sent as a JSON body.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            ASGIResponse: The collected response.
+        """
+        body = b"" if json_body is None else json.dumps(json_body).encode("utf-8")
+        raw_headers: List[Tuple[bytes, bytes]] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (headers or {}).items()
+        ]
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+            raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "query_string": urlencode(params or {}, doseq=True).encode("latin-1"),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+
+        complete = asyncio.Event()
+        sent_body = False
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Only report a disconnect once the response is complete, or
+            # streaming responses would stop early
+            await complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    complete.set()
+
+        await self.app(scope, receive, send)
+        complete.set()
+        headers_out = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in start.get("headers", [])
+        }
+        return ASGIResponse(start.get("status", 500), headers_out, b"".join(chunks))
+
+    async def get(self, path: str, **kwargs: Any) -> ASGIResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(
+        self, path: str, json_body: Any = None, **kwargs: Any
+    ) -> ASGIResponse:
+        return await self.request("POST", path, json_body=json_body, **kwargs)
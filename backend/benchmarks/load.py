@@ -0,0 +1,523 @@
+"""
+Load-test every API route in-process at a fixed concurrency.
+
+Usage:
+    python -m benchmarks.load [--data-dir DIR] [--companies N] [--years N]
+        [--metrics N] [--holders N] [--concurrency N] [--duration SECONDS]
+        [--warmup SECONDS] [--filter TEXT] [--seed N] [--output FILE]
+
+Without --data-dir a universe is generated in a temporary directory; pass a
+directory written by ``benchmarks.generate`` to test a larger one without
+regenerating it. Requests go straight to the ASGI app, so throughput and
+latency are the application's own, without a server or network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.run import BACKEND_DIR, configure_data_dir, git_commit
+
+# A request to send: path, query parameters and JSON body
+Request = Tuple[str, Optional[Dict[str, Any]], Any]
+
+# Routes left out of the mix, and why
+SKIPPED_ROUTES = {
+    ("GET", "/api/events/"): "event stream never completes",
+    ("POST", "/api/jobs/ingest"): "rewrites the data under test",
+    ("POST", "/debug/profiler/start"): "debugging only",
+    ("POST", "/debug/profiler/stop"): "debugging only",
+    ("GET", "/docs"): "static page",
+    ("GET", "/docs/oauth2-redirect"): "static page",
+    ("GET", "/redoc"): "static page",
+}
+
+# Metrics requested by the AI routes
+LOAD_METRICS = ("revenue", "net_profit", "profit", "total_assets", "eps")
+
+# Latency percentiles reported per route
+LOAD_PERCENTILES = (50, 90, 99)
+
+
+class Target:
+    """
+    One route of the load mix.
+
+    ``build`` draws the parameters of a request from a random source, so
+    requests spread over companies and years like real traffic; ``expect``
+    holds the statuses that count as success.
+    """
+
+    __slots__ = ("method", "route", "build", "expect")
+
+    def __init__(
+        self,
+        method: str,
+        route: str,
+        build: Callable[[random.Random], Request],
+        expect: Tuple[int, ...] = (200,),
+    ):
+        self.method = method
+        self.route = route
+        self.build = build
+        self.expect = expect
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+def build_targets(
+    companies: List[str], years: List[int], holder_years: List[int]
+) -> List[Target]:
+    """
+    Build one target per route served by the app, except SKIPPED_ROUTES.
+
+    Args:
+        companies (list): Companies with data.
+        years (list): Years the companies have data for.
+        holder_years (list): Years the shareholder register covers.
+
+    Returns:
+        list: The targets.
+    """
+
+    def span(rng: random.Random) -> Tuple[int, int]:
+        start = rng.choice(years)
+        return start, min(start + rng.randrange(10), years[-1])
+
+    def company_range(rng: random.Random) -> Request:
+        start, end = span(rng)
+        granularity = rng.choice(("quarter", "year"))
+        path = f"/api/financial/{rng.choice(companies)}/range/{start}/{end}"
+        return path, {"granularity": granularity}, None
+
+    return [
+        Target("GET", "/openapi.json", lambda rng: ("/openapi.json", None, None)),
+        Target(
+            "GET",
+            "/api/financial/metrics",
+            lambda rng: ("/api/financial/metrics", None, None),
+        ),
+        Target(
+            "GET",
+            "/api/financial/companies",
+            lambda rng: ("/api/financial/companies", None, None),
+        ),
+        Target(
+            "GET",
+            "/api/financial/screen",
+            lambda rng: (
+                "/api/financial/screen",
+                {
+                    "year": rng.choice(years),
+                    "where": "debt_to_equity<1",
+                    "sort": "return_on_equity",
+                },
+                None,
+            ),
+        ),
+        Target(
+            "GET",
+            "/api/financial/export",
+            lambda rng: (
+                "/api/financial/export",
+                {"company": rng.choice(companies), "metrics": "revenue,net_profit"},
+                None,
+            ),
+        ),
+        Target(
+            "GET",
+            "/api/financial/{year}",
+            lambda rng: (f"/api/financial/{rng.choice(years)}", None, None),
+        ),
+        Target(
+            "GET",
+            "/api/financial/range/{start_year}/{end_year}",
+            lambda rng: ("/api/financial/range/%d/%d" % span(rng), None, None),
+        ),
+        Target(
+            "GET",
+            "/api/financial/{company}/{year}",
+            lambda rng: (
+                f"/api/financial/{rng.choice(companies)}/{rng.choice(years)}",
+                None,
+                None,
+            ),
+        ),
+        Target(
+            "GET",
+            "/api/financial/{company}/range/{start_year}/{end_year}",
+            company_range,
+        ),
+        Target(
+            "GET",
+            "/api/shareholders/",
+            lambda rng: (
+                "/api/shareholders/",
+                {"year": rng.choice(holder_years)},
+                None,
+            ),
+        ),
+        Target(
+            "GET",
+            "/api/shareholders/history",
+            lambda rng: ("/api/shareholders/history", None, None),
+        ),
+        Target(
+            "GET",
+            "/api/shareholders/changes",
+            lambda rng: ("/api/shareholders/changes", None, None),
+        ),
+        Target(
+            "GET",
+            "/api/shareholders/top/{year}",
+            lambda rng: (
+                f"/api/shareholders/top/{rng.choice(holder_years)}",
+                {"n": 20},
+                None,
+            ),
+        ),
+        Target(
+            "POST",
+            "/api/ai/forecast",
+            lambda rng: (
+                "/api/ai/forecast",
+                None,
+                {"metric": rng.choice(LOAD_METRICS), "years": 5},
+            ),
+        ),
+        Target(
+            "POST",
+            "/api/ai/forecast/batch",
+            lambda rng: (
+                "/api/ai/forecast/batch",
+                None,
+                {"metrics": rng.sample(LOAD_METRICS, 3), "years": 5},
+            ),
+        ),
+        Target(
+            "POST",
+            "/api/ai/insights",
+            lambda rng: (
+                "/api/ai/insights",
+                None,
+                {"metric": rng.choice(LOAD_METRICS)},
+            ),
+        ),
+        Target(
+            "POST",
+            "/api/ai/insights/batch",
+            lambda rng: (
+                "/api/ai/insights/batch",
+                None,
+                {
+                    "metrics": [rng.choice(LOAD_METRICS)],
+                    "companies": rng.sample(companies, min(10, len(companies))),
+                },
+            ),
+        ),
+        Target("GET", "/api/ai/models", lambda rng: ("/api/ai/models", None, None)),
+        Target(
+            "POST",
+            "/api/ai/backtest",
+            lambda rng: (
+                "/api/ai/backtest",
+                None,
+                {
+                    "company": rng.choice(companies),
+                    "metrics": ["revenue", "net_profit"],
+                },
+            ),
+        ),
+        Target(
+            "POST",
+            "/api/ai/scenario",
+            lambda rng: (
+                "/api/ai/scenario",
+                None,
+                {"company": rng.choice(companies), "years": 5, "paths": 2000},
+            ),
+        ),
+        Target("GET", "/api/jobs/", lambda rng: ("/api/jobs/", None, None)),
+        Target(
+            "GET",
+            "/api/jobs/{job_id}",
+            lambda rng: ("/api/jobs/unknown", None, None),
+            expect=(404,),
+        ),
+        Target("GET", "/metrics", lambda rng: ("/metrics", None, None)),
+    ]
+
+
+def uncovered_routes(app: Any, targets: List[Target]) -> List[str]:
+    """List the app's routes that are neither targeted nor in SKIPPED_ROUTES."""
+    covered = {(target.method, target.route) for target in targets}
+    return [
+        f"{method} {route.path}"
+        for route in app.routes
+        for method in sorted(getattr(route, "methods", None) or ())
+        if method != "HEAD"
+        and (method, route.path) not in covered
+        and (method, route.path) not in SKIPPED_ROUTES
+    ]
+
+
+def summarize_latencies(
+    durations: List[float], errors: int, statuses: Dict[int, int], elapsed: float
+) -> Dict[str, Any]:
+    """
+    Summarize the requests of one route.
+
+    Args:
+        durations (list): Latency of every request, in seconds.
+        errors (int): Requests answered with an unexpected status or failing.
+        statuses (dict): Count of requests per response status.
+        elapsed (float): Length of the measured period, in seconds.
+
+    Returns:
+        dict: Request and error counts, throughput, and latency percentiles
+        and maximum in milliseconds.
+    """
+    ordered = sorted(durations)
+    summary: Dict[str, Any] = {
+        "requests": len(ordered),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": len(ordered) / elapsed if elapsed > 0 else 0.0,
+    }
+    for percentile in LOAD_PERCENTILES:
+        rank = max(0, -(-percentile * len(ordered) // 100) - 1)
+        summary[f"p{percentile}_ms"] = ordered[rank] * 1000 if ordered else None
+    summary["max_ms"] = ordered[-1] * 1000 if ordered else None
+    return summary
+
+
+async def run_load(
+    client: ASGIClient,
+    targets: List[Target],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Keep ``concurrency`` requests in flight, then summarize them per route.
+
+    Each session picks targets uniformly at random and sends its next
+    request as soon as the previous one completes. Requests sent during
+    the ``warmup`` seconds fill the caches and are not counted.
+
+    Args:
+        client (ASGIClient): Client for the app.
+        targets (list): The routes to load.
+        concurrency (int): Number of concurrent sessions.
+        duration (float): Seconds measured after the warm-up.
+        warmup (float): Seconds run before measuring.
+        seed (int): Seed of the target and parameter choices.
+
+    Returns:
+        dict: ``summarize_latencies`` per target name, and for all of them
+        under "total".
+
+    Raises:
+        ValueError: If ``duration`` is not positive.
+    """
+    if duration <= 0:
+        raise ValueError("duration must be positive")
+    durations: Dict[str, List[float]] = {target.name: [] for target in targets}
+    errors = dict.fromkeys(durations, 0)
+    statuses: Dict[str, Dict[int, int]] = {name: {} for name in durations}
+
+    async def session(index: int, deadline: float, record: bool) -> None:
+        rng = random.Random(seed * 100003 + index)
+        while time.perf_counter() < deadline:
+            target = targets[rng.randrange(len(targets))]
+            path, params, body = target.build(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    target.method, path, params=params, json_body=body
+                )
+                status = response.status_code
+            except Exception:
+                status = 0
+            if not record:
+                continue
+            durations[target.name].append(time.perf_counter() - started)
+            counts = statuses[target.name]
+            counts[status] = counts.get(status, 0) + 1
+            if status not in target.expect:
+                errors[target.name] += 1
+
+    for record, seconds in ((False, warmup), (True, duration)):
+        if seconds <= 0:
+            continue
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(
+            *(session(index, deadline, record) for index in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    results = {
+        name: summarize_latencies(
+            durations[name], errors[name], statuses[name], elapsed
+        )
+        for name in durations
+    }
+    total_statuses: Dict[int, int] = {}
+    for counts in statuses.values():
+        for status, count in counts.items():
+            total_statuses[status] = total_statuses.get(status, 0) + count
+    results["total"] = summarize_latencies(
+        [value for values in durations.values() for value in values],
+        sum(errors.values()),
+        total_statuses,
+        elapsed,
+    )
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print the per-route summary as a table."""
+    columns = ["p%d_ms" % p for p in LOAD_PERCENTILES] + ["max_ms"]
+    header = f"{'route':<60} {'reqs':>7} {'errs':>5} {'rps':>8}"
+    print(header + "".join(f" {column[:-3]:>8}" for column in columns) + "  (ms)")
+    for name, summary in results.items():
+        latencies = "".join(
+            f" {summary[column]:>8.2f}" if summary[column] is not None else f" {'-':>8}"
+            for column in columns
+        )
+        print(
+            f"{name:<60} {summary['requests']:>7} {summary['errors']:>5}"
+            f" {summary['throughput_rps']:>8.1f}{latencies}"
+        )
+
+
+async def load_test(
+    companies: int,
+    years: int,
+    metrics: int,
+    holders: int,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    pattern: Optional[str] = None,
+    seed: int = 0,
+    generate: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load-test the app on the configured data directory.
+
+    Returns:
+        dict: Summary per route, as from ``run_load``.
+    """
+    from app.main import app
+    from app.services.data_processor import get_store, list_companies
+    from app.services.shareholder_processor import get_shareholder_store
+    from benchmarks.synthetic import generate_universe
+
+    if generate:
+        generate_universe(companies, years, metrics, seed, holders)
+    store = get_store()
+    targets = build_targets(
+        list_companies(),
+        sorted(set(store.years.tolist())),
+        get_shareholder_store().available_years,
+    )
+    for route in uncovered_routes(app, targets):
+        print(f"warning: {route} is not load-tested", file=sys.stderr)
+    if pattern:
+        targets = [target for target in targets if pattern in target.name]
+
+    client = ASGIClient(app)
+    await client.startup()
+    try:
+        return await run_load(client, targets, concurrency, duration, warmup, seed)
+    finally:
+        await client.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=None, help="existing universe")
+    parser.add_argument("--companies", type=int, default=200, help="companies")
+    parser.add_argument("--years", type=int, default=30, help="years per company")
+    parser.add_argument(
+        "--metrics", type=int, default=26, help="raw metric columns per company"
+    )
+    parser.add_argument(
+        "--holders", type=int, default=10000, help="holders in the register"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="requests in flight"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured")
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="seconds before measuring"
+    )
+    parser.add_argument("--filter", default=None, help="only load matching routes")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    generate = args.data_dir is None
+    data_dir = (
+        Path(tempfile.mkdtemp(prefix="dashboard-load-"))
+        if generate
+        else Path(args.data_dir).resolve()
+    )
+    configure_data_dir(data_dir)
+    sys.path.insert(0, str(BACKEND_DIR))
+    try:
+        results = asyncio.run(
+            load_test(
+                args.companies,
+                args.years,
+                args.metrics,
+                args.holders,
+                args.concurrency,
+                args.duration,
+                args.warmup,
+                args.filter,
+                args.seed,
+                generate,
+            )
+        )
+    finally:
+        if generate:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(results)
+    if args.output:
+        document = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "params": {
+                    key: value
+                    for key, value in vars(args).items()
+                    if key not in ("output", "filter")
+                },
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(document, indent=2))
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
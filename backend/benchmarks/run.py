@@ -0,0 +1,167 @@
+"""
+Benchmark the services and HTTP routes on a synthetic universe.
+
+Usage:
+    python -m benchmarks.run [--companies N] [--years N] [--metrics N]
+        [--holders N] [--repeat N] [--filter TEXT] [--pdf] [--output FILE]
+        [--compare BASELINE] [--threshold FRACTION]
+
+Results are written as JSON; pass an earlier results file to --compare to
+report the change in median latency per case.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def git_commit() -> str:
+    """Return the current commit hash, or "" outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def data_environment(data_dir: Path) -> Dict[str, str]:
+    """Return the environment that points the app at a data directory."""
+    return {
+        "DATA_DIR": str(data_dir),
+        "RAW_DATA_DIR": str(data_dir / "raw"),
+        "PROCESSED_DATA_DIR": str(data_dir / "processed"),
+        "EXTRACTION_CACHE_DIR": str(data_dir / "cache" / "extraction"),
+        "MODEL_REGISTRY_DIR": str(data_dir / "models"),
+        "DEFAULT_COMPANY": "co00000",
+    }
+
+
+def configure_data_dir(data_dir: Path) -> None:
+    """
+    Point the app at an isolated data directory.
+
+    Must run before any app module is imported, since paths are read from
+    the environment at import time.
+    """
+    os.environ.update(data_environment(data_dir))
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """
+    Print the change in median latency of each case present in both runs.
+
+    Returns:
+        list: Names of the cases that slowed down by more than ``threshold``.
+    """
+    regressions = []
+    print(f"\n{'case':<52} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], current["median_ms"]
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<52} {before:>10.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", type=int, default=20, help="companies")
+    parser.add_argument("--years", type=int, default=20, help="years per company")
+    parser.add_argument(
+        "--metrics", type=int, default=26, help="raw metric columns per company"
+    )
+    parser.add_argument(
+        "--holders", type=int, default=10000, help="holders in the register"
+    )
+    parser.add_argument("--repeat", type=int, default=30, help="timed iterations")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--filter", default=None, help="only run matching cases")
+    parser.add_argument(
+        "--pdf", action="store_true", help="include annual report extraction"
+    )
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="baseline results JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="median slowdown reported as a regression (fraction)",
+    )
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="dashboard-bench-"))
+    configure_data_dir(data_dir)
+    sys.path.insert(0, str(BACKEND_DIR))
+    try:
+        import numpy
+        from benchmarks.suite import run
+
+        results = run(
+            args.companies,
+            args.years,
+            args.metrics,
+            args.repeat,
+            pdf=args.pdf,
+            pattern=args.filter,
+            seed=args.seed,
+            holders=args.holders,
+        )
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    document: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {
+                "companies": args.companies,
+                "years": args.years,
+                "metrics": args.metrics,
+                "holders": args.holders,
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2))
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by > {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Profile worker startup: imports, startup handlers and the first requests.
+
+Usage:
+    python -m benchmarks.startup [--repeat N] [--warmup TARGETS] [--top N]
+        [--depth N] [--output FILE]
+
+Every run starts a fresh interpreter, so nothing is shared with earlier
+runs except the operating system's file cache. The slowest imports of the
+last run are listed from ``python -X importtime``; at the default depth
+these are the modules imported by ``app.main`` itself.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Requests timed after startup, in order: (name, method, path, JSON body)
+FIRST_REQUESTS = [
+    ("financial.metrics", "GET", "/api/financial/metrics", None),
+    ("shareholders", "GET", "/api/shareholders/", None),
+    ("ai.forecast", "POST", "/api/ai/forecast", {"metric": "revenue", "years": 3}),
+]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+async def _profile_phases() -> Dict[str, float]:
+    """Time the phases of a cold worker in this interpreter, in milliseconds."""
+    timings = {}
+    started = time.perf_counter()
+    from app.main import app
+    from benchmarks.asgi_client import ASGIClient
+
+    timings["import"] = (time.perf_counter() - started) * 1000
+
+    client = ASGIClient(app)
+    started = time.perf_counter()
+    await client.startup()
+    timings["startup"] = (time.perf_counter() - started) * 1000
+
+    try:
+        for name, method, path, body in FIRST_REQUESTS:
+            started = time.perf_counter()
+            response = await client.request(method, path, json_body=body)
+            timings[f"first.{name}"] = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {path}: {response.status_code}")
+    finally:
+        await client.shutdown()
+    return timings
+
+
+def run_child(warmup: str, importtime: bool = False) -> Tuple[Dict[str, float], str]:
+    """
+    Profile one cold start in a new interpreter.
+
+    Returns:
+        tuple: Phase timings in milliseconds, and the ``-X importtime``
+        report if requested ("" otherwise).
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-m", "benchmarks.startup", "--child"]
+    env = dict(os.environ, WARMUP=warmup)
+    result = subprocess.run(
+        command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout), result.stderr
+
+
+def slowest_imports(report: str, top: int, depth: int) -> List[Tuple[str, float]]:
+    """
+    List the imports at one nesting depth with the highest cumulative time.
+
+    Args:
+        report (str): Output of ``python -X importtime``.
+        top (int): Number of modules to return.
+        depth (int): Nesting depth, 1 for the modules the profiled code
+            imports directly, 2 for the modules those import, and so on.
+
+    Returns:
+        list: (module, milliseconds) pairs, slowest first.
+    """
+    modules = []
+    for line in report.splitlines():
+        match = IMPORT_LINE.match(line)
+        # The indent is one space plus two per level of nesting
+        if match and len(match.group(3)) == 2 * depth - 1:
+            modules.append((match.group(4), int(match.group(2)) / 1000))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts to time")
+    parser.add_argument(
+        "--warmup", default="", help='WARMUP targets for the worker, e.g. "data,pool"'
+    )
+    parser.add_argument("--top", type=int, default=15, help="slowest imports listed")
+    parser.add_argument(
+        "--depth", type=int, default=2, help="import nesting depth listed"
+    )
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(BACKEND_DIR))
+        print(json.dumps(asyncio.run(_profile_phases())))
+        return
+
+    runs = [run_child(args.warmup)[0] for _ in range(max(0, args.repeat - 1))]
+    timings, report = run_child(args.warmup, importtime=True)
+    runs.append(timings)
+
+    phases = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    print(f"{'phase':<28} {'median ms':>10}")
+    for name, value in phases.items():
+        print(f"{name:<28} {value:>10.1f}")
+
+    imports = slowest_imports(report, args.top, args.depth)
+    print(f"\n{'import (cumulative)':<40} {'ms':>10}")
+    for module, value in imports:
+        print(f"{module:<40} {value:>10.1f}")
+
+    if args.output:
+        document: Dict[str, Any] = {
+            "params": {
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "depth": args.depth,
+            },
+            "phases_ms": phases,
+            "imports_ms": dict(imports),
+        }
+        Path(args.output).write_text(json.dumps(document, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+import asyncio
+import inspect
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.synthetic import generate_universe
+from app.main import app
+from app.services import ai_service
+from app.services.backtesting import backtest_company
+from app.services.data_processor import (
+    calculate_derived_metrics,
+    get_financial_data,
+    get_financial_data_range,
+    get_store,
+)
+from app.services.extraction_cache import ExtractionCache
+from app.services.shareholder_processor import get_shareholder_store
+from app.services.scenarios import run_scenario
+from app.services.pdf_parser import extract_jk_financials
+from app.utils.config import BASE_DIR
+from app.utils.http_cache import RESPONSE_CACHE
+
+# Annual report bundled with the repository
+SAMPLE_PDF = BASE_DIR / "data" / "raw" / "508_1653300092463.pdf"
+
+Operation = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class Case:
+    """One benchmarked operation, optionally with a per-iteration setup step."""
+
+    __slots__ = ("name", "run", "setup", "repeat")
+
+    def __init__(
+        self,
+        name: str,
+        run: Operation,
+        setup: Optional[Callable[[], None]] = None,
+        repeat: Optional[int] = None,
+    ):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.repeat = repeat
+
+
+async def _call(operation: Operation) -> Any:
+    result = operation()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Summarize per-iteration durations (seconds) in milliseconds."""
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    return {
+        "iterations": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": median * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_sec": 1.0 / median if median > 0 else float("inf"),
+    }
+
+
+async def measure(case: Case, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a case, excluding its setup step, after ``warmup`` untimed runs.
+
+    Returns:
+        dict: Summary statistics from ``summarize``.
+    """
+    repeat = case.repeat or repeat
+    for _ in range(warmup if case.repeat is None else 0):
+        if case.setup:
+            case.setup()
+        await _call(case.run)
+    durations = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        await _call(case.run)
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def _expect(status: int) -> Callable[[Any], Any]:
+    def check(response: Any) -> Any:
+        if response.status_code != status:
+            raise RuntimeError(
+                f"Expected {status}, got {response.status_code}: {response.content!r}"
+            )
+        return response
+
+    return check
+
+
+def _checked(request: Callable[[], Awaitable[Any]], status: int = 200) -> Operation:
+    check = _expect(status)
+
+    async def run() -> Any:
+        return check(await request())
+
+    return run
+
+
+def clear_ai_caches() -> None:
+    """Drop every cached forecast, statistic and response."""
+    ai_service._clear_caches(None)
+    RESPONSE_CACHE.clear()
+
+
+def build_cases(client: ASGIClient, companies: List[str], pdf: bool) -> List[Case]:
+    """
+    Build the benchmark cases over a generated universe.
+
+    Args:
+        client (ASGIClient): Client for the app.
+        companies (list): Identifiers of the generated companies.
+        pdf (bool): Include the (slow) annual report extraction cases.
+
+    Returns:
+        list: The cases, services first.
+    """
+    store = get_store()
+    first, last = int(store.years[0]), int(store.years[-1])
+    record = get_financial_data(last)[0]
+    other = companies[len(companies) // 2]
+    holder_year = get_shareholder_store().available_years[-1]
+    cycle = {"index": 0}
+
+    def next_company() -> str:
+        cycle["index"] = (cycle["index"] + 1) % len(companies)
+        return companies[cycle["index"]]
+
+    cases = [
+        Case(
+            "service.get_financial_data_range.full",
+            lambda: get_financial_data_range(first, last),
+        ),
+        Case(
+            "service.get_financial_data_range.projected_annual",
+            lambda: get_financial_data_range(first, last, ["revenue", "eps"], "year"),
+        ),
+        Case(
+            "service.get_financial_data_range.rotating_company",
+            lambda: get_financial_data_range(
+                first, last, ["revenue"], company=next_company()
+            ),
+        ),
+        Case(
+            "service.calculate_derived_metrics",
+            lambda: calculate_derived_metrics(record),
+        ),
+        Case(
+            "service.generate_forecast.cold",
+            lambda: ai_service.generate_forecast("revenue", 5),
+            setup=clear_ai_caches,
+        ),
+        Case(
+            "service.generate_forecast.warm",
+            lambda: ai_service.generate_forecast("revenue", 5),
+        ),
+        Case(
+            "service.generate_insight.cold",
+            lambda: ai_service.generate_insight("revenue"),
+            setup=clear_ai_caches,
+        ),
+        Case(
+            "service.generate_insight.warm",
+            lambda: ai_service.generate_insight("revenue"),
+        ),
+        Case(
+            "service.generate_insights.all_companies.cold",
+            lambda: ai_service.generate_insights(companies, ["revenue"]),
+            setup=clear_ai_caches,
+        ),
+        Case("service.backtest_company.all_metrics", lambda: backtest_company()),
+        Case(
+            "service.run_scenario.10k_paths.10_years",
+            lambda: run_scenario(["revenue", "net_profit"], years=10, paths=10000),
+        ),
+    ]
+
+    if pdf:
+        cache = ExtractionCache(Path(tempfile.mkdtemp()) / "extraction")
+        cases += [
+            Case(
+                "service.extract_jk_financials.cold",
+                lambda: extract_jk_financials(SAMPLE_PDF),
+                repeat=1,
+            ),
+            Case(
+                "service.extract_jk_financials.populate_cache",
+                lambda: extract_jk_financials(SAMPLE_PDF, cache=cache),
+                repeat=1,
+            ),
+            Case(
+                "service.extract_jk_financials.cached",
+                lambda: extract_jk_financials(SAMPLE_PDF, cache=cache),
+            ),
+        ]
+
+    range_path = f"/api/financial/range/{first}/{last}"
+    etag = {}
+
+    async def conditional_range() -> Any:
+        if "value" not in etag:
+            etag["value"] = (await client.get(range_path)).headers["etag"]
+        return await client.get(range_path, headers={"If-None-Match": etag["value"]})
+
+    cases += [
+        Case(
+            "http.financial.range.uncached",
+            _checked(lambda: client.get(range_path)),
+            setup=RESPONSE_CACHE.clear,
+        ),
+        Case("http.financial.range.cached", _checked(lambda: client.get(range_path))),
+        Case(
+            "http.financial.range.gzip",
+            _checked(
+                lambda: client.get(range_path, headers={"Accept-Encoding": "gzip"})
+            ),
+        ),
+        Case("http.financial.range.not_modified", _checked(conditional_range, 304)),
+        Case(
+            "http.financial.range.ndjson",
+            _checked(lambda: client.get(range_path, params={"format": "ndjson"})),
+        ),
+        Case(
+            "http.financial.company_year",
+            _checked(
+                lambda: client.get(
+                    f"/api/financial/{other}/{last}", params={"metrics": "revenue"}
+                )
+            ),
+        ),
+        Case(
+            "http.financial.screen",
+            _checked(
+                lambda: client.get(
+                    "/api/financial/screen",
+                    params={
+                        "year": last,
+                        "where": "debt_to_equity<1",
+                        "sort": "return_on_equity",
+                    },
+                )
+            ),
+        ),
+        Case(
+            "http.ai.forecast.cold",
+            _checked(
+                lambda: client.post(
+                    "/api/ai/forecast", {"metric": "revenue", "years": 5}
+                )
+            ),
+            setup=RESPONSE_CACHE.clear,
+        ),
+        Case(
+            "http.ai.forecast.cached",
+            _checked(
+                lambda: client.post(
+                    "/api/ai/forecast", {"metric": "revenue", "years": 5}
+                )
+            ),
+        ),
+        Case(
+            "http.ai.scenario.cold",
+            _checked(
+                lambda: client.post("/api/ai/scenario", {"years": 10, "paths": 10000})
+            ),
+            setup=RESPONSE_CACHE.clear,
+        ),
+        Case(
+            "http.ai.insights.cached",
+            _checked(lambda: client.post("/api/ai/insights", {"metric": "revenue"})),
+        ),
+        Case(
+            "http.shareholders.history",
+            _checked(lambda: client.get("/api/shareholders/history")),
+        ),
+        Case(
+            "http.shareholders.top",
+            _checked(
+                lambda: client.get(
+                    f"/api/shareholders/top/{holder_year}", params={"n": 100}
+                )
+            ),
+            setup=RESPONSE_CACHE.clear,
+        ),
+    ]
+    return cases
+
+
+async def run_suite(
+    companies: int,
+    years: int,
+    metrics: int,
+    repeat: int,
+    pdf: bool = False,
+    pattern: Optional[str] = None,
+    seed: int = 0,
+    holders: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Generate a universe, then time every case whose name contains ``pattern``.
+
+    Returns:
+        dict: Summary statistics per case name.
+    """
+    ids = generate_universe(companies, years, metrics, seed, holders)
+    client = ASGIClient(app)
+    await client.startup()
+    try:
+        results = {}
+        for case in build_cases(client, ids, pdf):
+            if pattern and pattern not in case.name:
+                continue
+            results[case.name] = await measure(case, repeat)
+            print(
+                f"{case.name:<52} {results[case.name]['median_ms']:>10.3f} ms"
+                f" {results[case.name]['p95_ms']:>10.3f} ms p95",
+                flush=True,
+            )
+        return results
+    finally:
+        await client.shutdown()
+
+
+def run(*args: Any, **kwargs: Any) -> Dict[str, Dict[str, float]]:
+    """Synchronous entry point for ``run_suite``."""
+    return asyncio.run(run_suite(*args, **kwargs))
@@ -0,0 +1,219 @@
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from app.models.financial import parse_financial_data, store_from_records
+from app.services.data_processor import (
+    SAMPLE_DATA,
+    _growth_factor,
+    company_paths,
+    materialize_derived_metrics,
+    write_store_columns,
+)
+from app.services.financial_store import FinancialStore
+from app.services.shareholder_processor import write_shareholder_columns
+from app.services.shareholder_store import ShareholderStore
+
+# Holder categories of a synthetic register, and the share of holders in each
+HOLDER_CATEGORIES = (
+    "Institutional Investors",
+    "Retail Investors",
+    "Company Executives",
+    "Other",
+)
+HOLDER_MIX = (0.05, 0.90, 0.01, 0.04)
+
+# Typical stake of a holder in each category, relative to a retail holder
+CATEGORY_STAKE = (50.0, 1.0, 20.0, 2.0)
+
+# Shares outstanding of the synthetic company, and the Pareto shape of stake
+# sizes (lower is more concentrated)
+SHARES_OUTSTANDING = 10_000_000_000
+STAKE_SHAPE = 1.2
+
+# Sample quarters every synthetic company is scaled from, parsed on first use
+_SEED: Optional[FinancialStore] = None
+
+
+def _seed_store() -> FinancialStore:
+    global _SEED
+    if _SEED is None:
+        _SEED = store_from_records(parse_financial_data(SAMPLE_DATA))
+    return _SEED
+
+
+def company_ids(companies: int) -> List[str]:
+    """Identifiers of a synthetic universe's companies; the first is the default."""
+    return [f"co{index:05d}" for index in range(companies)]
+
+
+def synthetic_store(
+    rng: np.random.Generator, years: int, metrics: int, last_year: int = 2024
+) -> FinancialStore:
+    """
+    Generate one company's quarterly history from the sample seed quarters.
+
+    Each company scales the seed quarters by a random size and grows every
+    metric by a noisy version of the sample projection growth each year.
+    Beyond the sample's raw metrics, ``metrics`` adds random-walk columns.
+
+    Args:
+        rng (Generator): Random source.
+        years (int): Number of years of history.
+        metrics (int): Number of raw metric columns.
+        last_year (int): The last year of history.
+
+    Returns:
+        FinancialStore: The company's store, before derived metrics.
+    """
+    seed = _seed_store()
+    seed_year = int(seed.years[-1])
+    base = seed.year_slice(seed_year, seed_year)
+    names = seed.metrics[:metrics]
+    names += [f"metric_{index:03d}" for index in range(metrics - len(names))]
+
+    quarters_per_year = base.stop - base.start
+    first_year = last_year - years + 1
+    index_years = np.repeat(np.arange(first_year, last_year + 1), quarters_per_year)
+    index_quarters = np.tile(seed.quarters[base], years)
+
+    size = rng.lognormal(0.0, 1.0)
+    columns: Dict[str, np.ndarray] = {}
+    for name in names:
+        quarters = (
+            seed.columns[name][base]
+            if name in seed.columns
+            else rng.uniform(1e3, 1e6, quarters_per_year)
+        )
+        growth = rng.normal(_growth_factor(name), 0.05, years).clip(0.5, 1.5)
+        # Growth path anchored at 1.0 in the seed year (or the nearest year)
+        path = np.cumprod(growth)
+        path /= path[min(years - 1, max(0, seed_year - first_year))]
+        noise = rng.normal(1.0, 0.02, (years, quarters_per_year))
+        columns[name] = (quarters[None, :] * size * path[:, None] * noise).ravel()
+
+    return FinancialStore(
+        index_years.astype(np.int16), index_quarters.astype(np.int8), columns
+    )
+
+
+def synthetic_shareholders(
+    rng: np.random.Generator, years: int, holders: int, last_year: int = 2024
+) -> ShareholderStore:
+    """
+    Generate a shareholder register of ``holders`` holders over ``years`` years.
+
+    Stake sizes are Pareto-distributed, so a few holders own much of the
+    company as in a real register, and scaled by category. Every stake
+    drifts by a random walk from year to year, and each holder holds for a
+    random run of consecutive years. Percentages of each year sum to 100.
+
+    Args:
+        rng (Generator): Random source.
+        years (int): Number of years of holdings.
+        holders (int): Number of distinct holders.
+        last_year (int): The last year of holdings.
+
+    Returns:
+        ShareholderStore: The register.
+    """
+    categories = rng.choice(len(HOLDER_CATEGORIES), holders, p=HOLDER_MIX)
+    stake = (rng.pareto(STAKE_SHAPE, holders) + 1) * np.take(CATEGORY_STAKE, categories)
+    stakes = stake * np.exp(np.cumsum(rng.normal(0.0, 0.15, (years, holders)), axis=0))
+
+    entry = rng.integers(0, years, holders)
+    leave = np.minimum(entry + rng.integers(1, years + 1, holders), years)
+    # The first holder holds throughout, so no year is empty
+    entry[0], leave[0] = 0, years
+    year_index = np.arange(years)[:, None]
+    active = (year_index >= entry) & (year_index < leave)
+    stakes = np.where(active, stakes, 0.0)
+    stakes /= stakes.sum(axis=1, keepdims=True)
+
+    # Row-major order sorts the holdings by year, then by holder
+    year_rows, codes = np.nonzero(active)
+    fractions = stakes[year_rows, codes]
+    return ShareholderStore(
+        (last_year - years + 1 + year_rows).astype(np.int16),
+        codes.astype(np.int32),
+        np.floor(fractions * SHARES_OUTSTANDING).astype(np.int64),
+        fractions * 100,
+        [f"Holder {index:07d}" for index in range(holders)],
+        categories=categories[codes].astype(np.int32),
+        category_labels=list(HOLDER_CATEGORIES),
+    )
+
+
+def write_company(company: str, index: int, years: int, metrics: int, seed: int) -> str:
+    """
+    Generate and write one company's column files.
+
+    Each company draws from its own stream of ``seed``, so a company's
+    data does not depend on how many companies are generated or where.
+    """
+    rng = np.random.default_rng([seed, index])
+    store = materialize_derived_metrics(synthetic_store(rng, years, metrics))
+    columns_dir, _ = company_paths(company)
+    write_store_columns(store, columns_dir)
+    return company
+
+
+def generate_universe(
+    companies: int,
+    years: int,
+    metrics: int,
+    seed: int = 0,
+    holders: int = 0,
+    executor: Optional[Executor] = None,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Write a synthetic universe as column files in the configured data directory.
+
+    The first company is written to the default company's location, the
+    others to their own partitions, exactly as the conversion job would.
+    Companies are generated in a process pool when there are several
+    workers; the processes inherit the configured data directory.
+
+    Args:
+        companies (int): Number of companies.
+        years (int): Years of quarterly history per company.
+        metrics (int): Raw metric columns per company.
+        seed (int): Random seed, so a universe can be regenerated exactly.
+        holders (int): Holders in the shareholder register, which covers the
+            same years; 0 leaves the shareholder data as it is.
+        executor (Executor, optional): Pool to generate the companies on.
+        workers (int, optional): Processes for a created pool. Defaults to
+            the CPU count; 1 generates in this process.
+
+    Returns:
+        list: The company identifiers.
+    """
+    ids = company_ids(companies)
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or companies == 1):
+        for index, company in enumerate(ids):
+            write_company(company, index, years, metrics, seed)
+    else:
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            list(
+                pool.map(
+                    write_company,
+                    ids,
+                    range(companies),
+                    [years] * companies,
+                    [metrics] * companies,
+                    [seed] * companies,
+                    chunksize=max(1, math.ceil(companies / (workers * 4))),
+                )
+            )
+        finally:
+            if pool is not executor:
+                pool.shutdown()
+
+    if holders:
+        rng = np.random.default_rng([seed, companies, holders])
+        write_shareholder_columns(synthetic_shareholders(rng, years, holders))
+    return ids
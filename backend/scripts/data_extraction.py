@@ -0,0 +1,92 @@
+"""
+Data extraction and conversion jobs for data/processed.
+
+Usage:
+    python scripts/data_extraction.py convert [--company ID]
+    python scripts/data_extraction.py ingest [--company ID] [--raw-dir DIR]
+        [--workers N] [--force]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.data_processor import (  # noqa: E402
+    COMPANY_PATTERN,
+    company_paths,
+    convert_financial_json,
+)
+from app.services.ingestion import ingest_directory  # noqa: E402
+from app.services.shareholder_processor import convert_shareholders_json  # noqa: E402
+from app.utils.config import DEFAULT_COMPANY  # noqa: E402
+
+
+def company(value: str) -> str:
+    """Validate a --company argument."""
+    if not COMPANY_PATTERN.match(value):
+        raise argparse.ArgumentTypeError(f"invalid company identifier: {value}")
+    return value
+
+
+def convert(args: argparse.Namespace) -> None:
+    """Convert the processed JSON files into memory-mappable column files."""
+    columns_dir, json_path = company_paths(args.company)
+    converters = [("financial", lambda: convert_financial_json(json_path, columns_dir))]
+    if args.company == DEFAULT_COMPANY:
+        converters.append(("shareholders", convert_shareholders_json))
+    for name, converter in converters:
+        manifest = converter()
+        print(f"{name}: {manifest['rows']} rows, version {manifest['version']}")
+
+
+def ingest(args: argparse.Namespace) -> None:
+    """Extract every annual report in a directory into data/processed."""
+    raw_dir = Path(args.raw_dir) if args.raw_dir else None
+    extracted = ingest_directory(
+        raw_dir, args.workers, force=args.force, company=args.company
+    )
+    if not extracted:
+        print("No new or modified reports")
+    for name, figures in extracted.items():
+        years = ", ".join(str(year) for year in sorted(figures)) or "no statements"
+        print(f"{name}: {years}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="convert data/processed JSON files to column files"
+    )
+    convert_parser.add_argument(
+        "--company", type=company, default=DEFAULT_COMPANY, help="company to convert"
+    )
+    convert_parser.set_defaults(func=convert)
+
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="extract annual report PDFs into data/processed"
+    )
+    ingest_parser.add_argument(
+        "--company", type=company, default=DEFAULT_COMPANY, help="company to ingest"
+    )
+    ingest_parser.add_argument(
+        "--raw-dir",
+        default=None,
+        help="directory of PDF reports (default: data/raw, or data/raw/<company>)",
+    )
+    ingest_parser.add_argument(
+        "--workers", type=int, default=None, help="number of worker processes"
+    )
+    ingest_parser.add_argument(
+        "--force", action="store_true", help="re-merge reports even if unchanged"
+    )
+    ingest_parser.set_defaults(func=ingest)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
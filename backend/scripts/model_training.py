@@ -0,0 +1,81 @@
+"""
+Train forecasting models offline and publish them to the model registry.
+
+Usage:
+    python scripts/model_training.py [--holdout N] [--registry-dir DIR]
+        [--models NAMES] [--all-companies] [--workers N]
+
+Every model in the model zoo is backtested on the default company's
+metrics and the best one per metric is published. With --all-companies,
+every company is also backtested in parallel and the number of metrics
+each model wins is reported.
+"""
+import argparse
+import math
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.backtesting import backtest_universe  # noqa: E402
+from app.services.model_registry import save_registry, train_models  # noqa: E402
+from app.utils.config import MODEL_REGISTRY_DIR  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--holdout", type=int, default=2, help="trailing years held out for scoring"
+    )
+    parser.add_argument(
+        "--registry-dir", default=str(MODEL_REGISTRY_DIR), help="model registry root"
+    )
+    parser.add_argument(
+        "--models", default=None, help='models to compare, e.g. "linear,ar"'
+    )
+    parser.add_argument(
+        "--all-companies",
+        action="store_true",
+        help="also backtest every company and count the best models",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes for --all-companies"
+    )
+    args = parser.parse_args()
+    models = args.models.split(",") if args.models else None
+
+    registry = train_models(holdout=args.holdout, models=models)
+    path = save_registry(registry, Path(args.registry_dir))
+
+    print(f"{'metric':<28} {'model':<14} {'mae':>16} {'rmse':>16} {'mape %':>8}")
+    for metric, model in registry["models"].items():
+        scores = model["evaluation"]
+        mape = scores.get("mape")
+        print(
+            f"{metric:<28} {model['kind']:<14} "
+            f"{scores.get('mae', math.nan):>16,.2f} "
+            f"{scores.get('rmse', math.nan):>16,.2f} "
+            f"{math.nan if mape is None else mape:>8.2f}"
+        )
+    print(f"Saved {len(registry['models'])} models to {path}")
+
+    if args.all_companies:
+        results = backtest_universe(
+            folds=args.holdout,
+            horizon=args.holdout,
+            models=models,
+            workers=args.workers,
+        )
+        wins = Counter(
+            summary["best"]
+            for metrics in results.values()
+            for summary in metrics.values()
+        )
+        print(f"\nBest model over {len(results)} companies:")
+        for name, count in wins.most_common():
+            print(f"{str(name):<14} {count:>8}")
+
+
+if __name__ == "__main__":
+    main()
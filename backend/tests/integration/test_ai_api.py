@@ -0,0 +1,305 @@
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_forecast_is_reproducible():
+    body = {"metric": "revenue", "years": 3}
+    first = client.post("/api/ai/forecast", json=body).json()["forecast"]
+    second = client.post("/api/ai/forecast", json=body).json()["forecast"]
+    assert first == second
+    assert [item["year"] for item in first] == [2025, 2026, 2027]
+
+
+def test_batch_forecast_matches_single_forecasts():
+    response = client.post(
+        "/api/ai/forecast/batch",
+        json={"metrics": ["revenue", "eps"], "horizons": [1, 3]},
+    )
+    assert response.status_code == 200
+    forecasts = response.json()["forecasts"]
+    single = client.post("/api/ai/forecast", json={"metric": "eps", "years": 3}).json()
+    assert forecasts["eps"] == [single["forecast"][0], single["forecast"][2]]
+    assert len(forecasts["revenue"]) == 2
+
+
+def test_unknown_metrics_are_rejected():
+    for path, body in (
+        ("/api/ai/forecast/batch", {"metrics": ["nope"]}),
+        ("/api/ai/forecast", {"metric": "revnue", "years": 3}),
+        ("/api/ai/insights", {"metric": "profitMargin"}),
+    ):
+        response = client.post(path, json=body)
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Unknown metrics")
+
+
+def test_forecast_horizons_are_validated():
+    from app.services import ai_service
+    from app.services.forecasting import finish_forecast
+
+    for years in (0, -2, 10000):
+        body = {"metric": "revenue", "years": years}
+        assert client.post("/api/ai/forecast", json=body).status_code == 422
+    for body in (
+        {"metrics": ["revenue"], "years": 0},
+        {"metrics": ["revenue"], "horizons": []},
+        {"metrics": ["revenue"], "horizons": [1, 0]},
+    ):
+        assert client.post("/api/ai/forecast/batch", json=body).status_code == 422
+
+    assert ai_service.generate_forecast("revenue", 0) == []
+    years, values = finish_forecast(["revenue"], 2024, np.empty((0, 1)), [])
+    assert len(years) == 0 and len(values["revenue"]) == 0
+
+
+def test_forecasts_and_insights_per_company(tmp_path, monkeypatch):
+    from app.api import ai as ai_api
+    from app.services import ai_service, data_processor
+    from app.utils.cache import LRUCache
+    from app.utils.file_utils import write_json
+
+    async def run_inline(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    # The partition only exists in this process, not in the CPU pool
+    monkeypatch.setattr(ai_api, "run_cpu", run_inline)
+    monkeypatch.setattr(data_processor, "COMPANIES_DIR", tmp_path)
+    monkeypatch.setattr(data_processor, "_STORES", LRUCache(4, "financial_stores"))
+    write_json(
+        tmp_path / "acme" / "financial_data.json",
+        {
+            str(year): [
+                {"quarter": f"Q{q}", "revenue": 100.0 * (year - 2015)}
+                for q in range(1, 5)
+            ]
+            for year in range(2016, 2024)
+        },
+    )
+
+    body = {"metric": "revenue", "years": 2, "seed": None, "company": "acme"}
+    acme = client.post("/api/ai/forecast", json=body).json()["forecast"]
+    assert [(point["year"], point["value"]) for point in acme] == [
+        (2024, 3600.0),
+        (2025, 4000.0),
+    ]
+    version = data_processor.get_store("acme").version
+    assert ("acme", "revenue", version) in ai_service._TREND_CACHE
+    default = client.post("/api/ai/forecast", json={**body, "company": "jkh"}).json()
+    assert default["forecast"] != acme
+
+    batch = client.post(
+        "/api/ai/forecast/batch",
+        json={
+            "metrics": ["revenue"],
+            "horizons": [1, 2],
+            "seed": None,
+            "company": "acme",
+        },
+    ).json()
+    assert batch["forecasts"]["revenue"] == acme
+
+    insight = client.post(
+        "/api/ai/insights", json={"metric": "revenue", "company": "acme"}
+    ).json()["insight"]
+    assert insight == ai_service.generate_insight("revenue", "acme")
+    assert insight != client.post("/api/ai/insights", json={"metric": "revenue"}).json()
+
+    for path, request in (
+        ("/api/ai/forecast", body),
+        ("/api/ai/forecast/batch", {"metrics": ["revenue"]}),
+        ("/api/ai/insights", {"metric": "revenue"}),
+    ):
+        response = client.post(path, json={**request, "company": "nope"})
+        assert response.status_code == 404
+
+
+def test_insight_statistics_are_cached_per_data_version():
+    from app.services import ai_service
+
+    first = client.post("/api/ai/insights", json={"metric": "revenue"}).json()
+    assert ai_service.generate_insight("revenue") == first["insight"]
+    hits = ai_service._STATISTICS_CACHE.hits
+    assert ai_service.generate_insight("revenue") == first["insight"]
+    assert "past 6 years" in first["insight"]
+    assert ai_service._STATISTICS_CACHE.hits == hits + 1
+
+    ai_service._clear_caches(None)
+    assert len(ai_service._STATISTICS_CACHE) == 0
+
+
+def test_batch_insights_match_single_insights():
+    response = client.post(
+        "/api/ai/insights/batch", json={"metrics": ["revenue", "current_ratio"]}
+    )
+    assert response.status_code == 200
+    companies = response.json()["companies"]
+    default = companies["jkh"]
+    assert set(default["insights"]) == {"revenue", "current_ratio"}
+    single = client.post("/api/ai/insights", json={"metric": "revenue"}).json()
+    assert default["insights"]["revenue"] == single["insight"]
+    assert default["statistics"]["revenue"]["count"] == 6
+
+    response = client.post("/api/ai/insights/batch", json={"metrics": ["nope"]})
+    assert response.status_code == 400
+    response = client.post("/api/ai/insights/batch", json={"companies": ["nope"]})
+    assert response.status_code == 404
+
+
+def test_forecasts_use_trained_registry(tmp_path):
+    from app.services import ai_service
+    from app.services.model_registry import save_registry, train_models
+    from app.services.model_zoo import MODELS, stack_states
+
+    fitted = client.post("/api/ai/forecast", json={"metric": "eps", "years": 2}).json()
+    linear = train_models(["eps"], holdout=1, models=["linear"])
+    assert set(linear["models"]["eps"]["evaluation"]) == {"mae", "rmse", "mape"}
+    save_registry(linear, tmp_path / "linear")
+    zoo = train_models(["eps"], holdout=1)
+    model = zoo["models"]["eps"]
+    assert set(model["backtest"]) == set(MODELS)
+    save_registry(zoo, tmp_path / "zoo")
+    try:
+        assert ai_service.load_model_registry(tmp_path / "linear")["models"]
+        served = client.post("/api/ai/forecast", json={"metric": "eps", "years": 2})
+        assert served.json() == fitted
+        trend_key = ("jkh", "eps", linear["data_version"])
+        assert trend_key not in ai_service._TREND_CACHE
+
+        ai_service.load_model_registry(tmp_path / "zoo")
+        served = client.post(
+            "/api/ai/forecast", json={"metric": "eps", "years": 2, "seed": None}
+        ).json()["forecast"]
+        state = stack_states([model["params"]])
+        expected = MODELS[model["kind"]].predict(state, [1, 2])[:, 0]
+        assert [point["value"] for point in served] == [
+            round(value, 2) for value in expected.tolist()
+        ]
+
+        listed = client.get("/api/ai/models").json()
+        assert [m["name"] for m in listed["models"]] == list(MODELS)
+        assert listed["registry"]["metrics"]["eps"]["model"] == model["kind"]
+    finally:
+        ai_service.load_model_registry(tmp_path / "missing")
+
+
+def test_registry_saves_never_share_a_version(tmp_path):
+    from app.services.model_registry import (
+        REGISTRY_FORMAT,
+        load_registry,
+        save_registry,
+    )
+
+    registry = {"format": REGISTRY_FORMAT, "data_version": "0123456789abcdef"}
+    first = save_registry(dict(registry, models={"eps": 1}), tmp_path)
+    second = save_registry(dict(registry, models={"eps": 2}), tmp_path)
+    assert first != second
+    assert load_registry(tmp_path)["version"] == second.name
+    assert load_registry(tmp_path)["models"] == {"eps": 2}
+
+
+def test_backtest_scores_every_model():
+    from app.services.model_zoo import MODELS
+
+    body = {"metrics": ["revenue", "eps"], "folds": 2, "horizon": 2}
+    response = client.post("/api/ai/backtest", json=body)
+    assert response.status_code == 200
+    result = response.json()["metrics"]
+    assert set(result) == {"revenue", "eps"}
+    for summary in result.values():
+        assert set(summary["scores"]) == set(MODELS)
+        assert summary["best"] in MODELS
+
+    only = client.post("/api/ai/backtest", json=dict(body, models=["ar"])).json()
+    assert only["metrics"]["eps"]["scores"] == {"ar": result["eps"]["scores"]["ar"]}
+
+    for bad in ({"models": ["nope"]}, {"metrics": ["nope"]}):
+        assert client.post("/api/ai/backtest", json=bad).status_code == 400
+    for bad in ({"folds": 0}, {"horizon": 11}):
+        assert client.post("/api/ai/backtest", json=bad).status_code == 422
+    schema = client.get("/openapi.json").json()["components"]["schemas"]
+    folds = schema["BacktestRequest"]["properties"]["folds"]
+    assert (folds["minimum"], folds["maximum"]) == (1, 10)
+    response = client.post("/api/ai/backtest", json={"company": "nope"})
+    assert response.status_code == 404
+
+
+def test_scenario_returns_fan_bands():
+    body = {"metrics": ["revenue", "net_profit"], "years": 10, "paths": 10000}
+    response = client.post("/api/ai/scenario", json=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["years"]) == 10
+    band = result["metrics"]["revenue"]["bands"][-1]
+    assert band["p5"] < band["p50"] < band["p95"]
+
+    shocked = client.post("/api/ai/scenario", json=dict(body, growth_shock=5)).json()
+    assert shocked["metrics"]["revenue"]["bands"][-1]["p50"] > band["p50"]
+
+    assert (
+        client.post("/api/ai/scenario", json={"metrics": ["nope"]}).status_code == 400
+    )
+    for bad in (
+        {"paths": 0},
+        {"years": 1000},
+        {"metrics": []},
+        {"metrics": ["revenue", "eps"] * 50},
+        {"percentiles": [50] * 100},
+        {"percentiles": [101]},
+        {"growth_shock": -100},
+        {"volatility": -1},
+    ):
+        assert client.post("/api/ai/scenario", json=bad).status_code == 422
+
+    repeated = client.post(
+        "/api/ai/scenario", json=dict(body, metrics=["revenue", "net_profit"] * 5)
+    )
+    assert repeated.status_code == 200
+    assert repeated.json() == result
+    response = client.post("/api/ai/scenario", json={"company": "nope"})
+    assert response.status_code == 404
+
+
+def test_full_cpu_queue_sheds_load(monkeypatch):
+    from app.services import executor
+
+    busy = executor.BoundedExecutor(1, 1, factory=ThreadPoolExecutor, name="cpu")
+    release = threading.Event()
+    busy.submit(release.wait)
+    monkeypatch.setattr(executor, "CPU_EXECUTOR", busy)
+    try:
+        response = client.post("/api/ai/insights", json={"metric": "dividend_yield"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+    finally:
+        release.set()
+        busy.shutdown()
+
+
+def test_ingestion_jobs_report_status(tmp_path, monkeypatch):
+    from app.api import jobs
+
+    monkeypatch.setattr(
+        jobs, "ingest_directory", lambda **kwargs: {"a.pdf": {2024: {}}}
+    )
+    submitted = client.post("/api/jobs/ingest", json={"company": "acme"})
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job"]["id"]
+
+    for _ in range(100):
+        job = client.get(f"/api/jobs/{job_id}").json()["job"]
+        if job["status"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert job["result"] == {"a.pdf": [2024]}
+    assert job["params"]["company"] == "acme"
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.post("/api/jobs/ingest", json={"company": "../x"}).status_code == 400
+    for workers in (0, 500):
+        response = client.post("/api/jobs/ingest", json={"workers": workers})
+        assert response.status_code == 422
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from app.main import app
+from app.services.financial_store import QUARTERS
+
+
+async def _open_session(queue: asyncio.Queue, disconnected: asyncio.Event):
+    """Run GET /api/events on the app, putting each body chunk on ``queue``."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/events/",
+        "raw_path": b"/api/events/",
+        "query_string": b"",
+        "headers": [],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers = dict(message["headers"])
+            await queue.put(headers[b"content-type"])
+        elif message.get("body"):
+            await queue.put(message["body"])
+
+    await app(scope, receive, send)
+
+
+def _event(frame: bytes):
+    fields = dict(line.split(": ", 1) for line in frame.decode().splitlines() if line)
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_sessions_are_sent_data_changes(tmp_path, monkeypatch):
+    from app.services import data_processor, events
+    from app.utils.cache import LRUCache
+    from app.utils.file_utils import write_json
+
+    monkeypatch.setattr(data_processor, "COMPANIES_DIR", tmp_path)
+    monkeypatch.setattr(data_processor, "_STORES", LRUCache(4, "financial_stores"))
+    path = tmp_path / "acme" / "financial_data.json"
+    write_json(path, {"2020": [{"quarter": q, "revenue": 1.0} for q in QUARTERS]})
+    version = data_processor.get_store("acme").version
+
+    async def scenario():
+        chunks, disconnected = asyncio.Queue(), asyncio.Event()
+        session = asyncio.ensure_future(_open_session(chunks, disconnected))
+        assert (await chunks.get()).startswith(b"text/event-stream")
+        kind, versions = _event(await chunks.get())
+        assert kind == "versions" and versions["financial"]["acme"] == version
+
+        data = {"2020": [{"quarter": q, "revenue": 2.0} for q in QUARTERS[:1]]}
+        data["2020"] += [{"quarter": q, "revenue": 1.0} for q in QUARTERS[1:]]
+        data["2021"] = [{"quarter": "Q1", "revenue": 3.0}]
+        write_json(path, data)
+        assert events.check_for_updates()["financial"] == ["acme"]
+
+        kind, change = _event(await asyncio.wait_for(chunks.get(), 5))
+        assert kind == "financial" and change["previous_version"] == version
+        assert change["delta"]["added"] == [{"year": 2021, "quarter": "Q1"}]
+        assert change["delta"]["changed"] == [{"year": 2020, "quarter": "Q1"}]
+
+        disconnected.set()
+        await asyncio.wait_for(session, 5)
+        assert events.BROADCASTER.subscribers == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,220 @@
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.financial_store import QUARTERS
+
+client = TestClient(app)
+
+
+def test_metrics_catalogue_is_reachable():
+    response = client.get("/api/financial/metrics")
+    assert response.status_code == 200
+    assert "revenue" in response.json()["core_metrics"]
+
+
+def test_year_projection_returns_only_requested_metrics():
+    response = client.get("/api/financial/2020", params={"metrics": "revenue,eps"})
+    assert response.status_code == 200
+    records = response.json()
+    assert len(records) == 4
+    assert set(records[0]) == {"year", "quarter", "revenue", "eps"}
+
+
+def test_range_aggregates_to_years():
+    quarterly = client.get(
+        "/api/financial/range/2019/2020", params={"metrics": "revenue"}
+    ).json()
+    annual = client.get(
+        "/api/financial/range/2019/2020",
+        params={"metrics": "revenue,net_asset_per_share", "granularity": "year"},
+    ).json()
+    assert [record["year"] for record in annual] == [2019, 2020]
+    assert annual[0]["revenue"] == sum(r["revenue"] for r in quarterly[:4])
+    assert "quarter" not in annual[0]
+
+
+def test_unknown_metric_and_missing_year():
+    assert (
+        client.get("/api/financial/2020", params={"metrics": "nope"}).status_code == 400
+    )
+    assert client.get("/api/financial/1990").status_code == 404
+    assert (
+        client.get("/api/financial/2020", params={"granularity": "week"}).status_code
+        == 422
+    )
+
+
+def test_responses_carry_etags_and_revalidate():
+    first = client.get("/api/financial/range/2019/2024")
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+    assert etag.endswith('-gz"')
+
+    second = client.get(
+        "/api/financial/range/2019/2024", headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+
+    plain = client.get(
+        "/api/financial/range/2019/2024", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["etag"] == etag.replace("-gz", "")
+    assert plain.json() == first.json()
+
+    # Each encoding revalidates against its own ETag only
+    for encoding, tag, status in (
+        ("identity", etag, 200),
+        ("identity", plain.headers["etag"], 304),
+        ("gzip", plain.headers["etag"], 200),
+    ):
+        response = client.get(
+            "/api/financial/range/2019/2024",
+            headers={"Accept-Encoding": encoding, "If-None-Match": tag},
+        )
+        assert response.status_code == status
+
+
+def test_range_streams_ndjson_and_csv():
+    response = client.get(
+        "/api/financial/range/2019/2020",
+        params={"metrics": "revenue", "format": "ndjson"},
+    )
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    expected = client.get(
+        "/api/financial/range/2019/2020", params={"metrics": "revenue"}
+    ).json()
+    assert lines == expected
+
+    export = client.get(
+        "/api/financial/export",
+        params={"metrics": "revenue,eps", "granularity": "year", "format": "csv"},
+    )
+    rows = list(csv.DictReader(io.StringIO(export.text)))
+    assert list(rows[0]) == ["year", "revenue", "eps"]
+    assert rows[0]["year"] == "2019"
+    assert "attachment" in export.headers["content-disposition"]
+
+
+def test_company_partitions_load_lazily(tmp_path, monkeypatch):
+    from app.services import data_processor
+    from app.utils.cache import LRUCache
+    from app.utils.file_utils import write_json
+
+    monkeypatch.setattr(data_processor, "COMPANIES_DIR", tmp_path)
+    monkeypatch.setattr(data_processor, "_STORES", LRUCache(1, "financial_stores"))
+    for company, revenue in (("acme", 100.0), ("globex", 200.0)):
+        write_json(
+            tmp_path / company / "financial_data.json",
+            {"2020": [{"quarter": q, "revenue": revenue} for q in QUARTERS]},
+        )
+
+    assert client.get("/api/financial/companies").json()["companies"][1:] == [
+        "acme",
+        "globex",
+    ]
+    acme = client.get("/api/financial/acme/2020", params={"metrics": "revenue"})
+    assert [record["revenue"] for record in acme.json()] == [100.0] * 4
+    globex = client.get(
+        "/api/financial/globex/range/2020/2020", params={"granularity": "year"}
+    )
+    assert globex.json()[0]["revenue"] == 800.0
+    assert list(data_processor._STORES._data) == ["globex"]
+
+    assert client.get("/api/financial/initech/2020").status_code == 404
+    assert client.get("/api/financial/acme/2019").status_code == 404
+
+
+def test_screen_filters_and_ranks_companies(tmp_path, monkeypatch):
+    from app.services import data_processor
+    from app.utils.file_utils import write_json
+
+    monkeypatch.setattr(data_processor, "COMPANIES_DIR", tmp_path)
+    for company, debt in (("acme", 100.0), ("globex", 900.0), ("initech", 300.0)):
+        write_json(
+            tmp_path / company / "financial_data.json",
+            {
+                "2023": [
+                    {
+                        "quarter": q,
+                        "net_profit": debt / 10,
+                        "shareholders_equity": 500.0,
+                        "long_term_debt": debt,
+                    }
+                    for q in QUARTERS
+                ]
+            },
+        )
+
+    response = client.get(
+        "/api/financial/screen",
+        params={
+            "year": 2023,
+            "where": ["debt_to_equity<1", "long_term_debt<=1000"],
+            "sort": "return_on_equity",
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["company"] for item in body["results"]] == ["initech", "acme"]
+    assert body["results"][0]["debt_to_equity"] == 0.6
+    assert body["matched"] == 2
+
+    ascending = client.get(
+        "/api/financial/screen",
+        params={"year": 2023, "sort": "long_term_debt", "order": "asc", "limit": 1},
+    ).json()
+    assert ascending["results"] == [{"company": "acme", "long_term_debt": 100.0}]
+
+    bad = client.get("/api/financial/screen", params={"year": 2023, "where": "x<1"})
+    assert bad.status_code == 400
+
+
+def test_screen_maps_annual_files_and_rereads_changed_companies(tmp_path, monkeypatch):
+    from app.services import data_processor, screening
+    from app.utils.cache import LRUCache
+    from app.utils.file_utils import write_json
+
+    monkeypatch.setattr(data_processor, "COMPANIES_DIR", tmp_path)
+    monkeypatch.setattr(data_processor, "_STORES", LRUCache(4, "financial_stores"))
+    monkeypatch.setattr(screening, "_PANELS", LRUCache(4, "screening_panels"))
+    monkeypatch.setattr(screening, "DATA_RELOAD_INTERVAL", 0)
+
+    def convert(company, debt):
+        columns_dir, json_path = data_processor.company_paths(company)
+        records = [{"quarter": q, "long_term_debt": debt} for q in QUARTERS]
+        write_json(json_path, {"2023": records})
+        data_processor.convert_financial_json(json_path, columns_dir)
+
+    for company, debt in (("acme", 100.0), ("globex", 900.0)):
+        convert(company, debt)
+    years, metrics, values = data_processor.read_annual_table(
+        data_processor.company_paths("acme")[0]
+    )
+    assert years.tolist() == [2023]
+    assert values[0, metrics.index("long_term_debt")] == 100.0
+
+    read = []
+    company_year = screening.company_year
+    monkeypatch.setattr(
+        screening,
+        "company_year",
+        lambda company, *args: read.append(company) or company_year(company, *args),
+    )
+    params = {"year": 2023, "sort": "long_term_debt", "order": "asc", "limit": 2}
+    first = client.get("/api/financial/screen", params=params).json()
+    assert [item["company"] for item in first["results"]] == ["acme", "globex"]
+    assert read == ["jkh", "acme", "globex"]
+    assert "acme" not in data_processor._STORES
+
+    read.clear()
+    convert("globex", 50.0)
+    second = client.get("/api/financial/screen", params=params).json()
+    assert [item["company"] for item in second["results"]] == ["globex", "acme"]
+    assert read == ["globex"]
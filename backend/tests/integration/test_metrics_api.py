@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils import metrics
+
+client = TestClient(app)
+
+
+def test_metrics_report_routes_spans_and_caches():
+    assert client.get("/api/financial/2023").status_code == 200
+    assert client.get("/api/financial/1990").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/financial/{year}",status="200"}' in text
+    )
+    assert 'route="/api/financial/{year}",status="404"' in text
+    assert 'span_duration_seconds_count{span="data.slice"}' in text
+    assert 'cache_hits{name="responses"}' in text
+
+
+def test_collected_spans_are_recorded_once():
+    def work():
+        with metrics.span("test.collect"):
+            return 42
+
+    before = metrics.SPAN_LATENCY.snapshot().get(("test.collect",))
+    result, spans = metrics.collect_spans(work)
+    assert result == 42
+    assert metrics.SPAN_LATENCY.snapshot().get(("test.collect",)) == before
+    metrics.merge_spans(spans)
+    assert "test.collect" in metrics.render_prometheus()
+
+
+def test_profiler_routes_are_hidden_by_default():
+    assert client.post("/debug/profiler/start").status_code == 404
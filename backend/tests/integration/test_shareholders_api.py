@@ -0,0 +1,74 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.shareholder_store import ShareholderStore
+
+client = TestClient(app)
+
+
+def test_category_history_and_changes():
+    history = client.get(
+        "/api/shareholders/history",
+        params={"categories": "Retail Investors", "start_year": 2022},
+    ).json()
+    assert history["years"] == [2022, 2023, 2024]
+    assert history["series"]["Retail Investors"]["percentage"] == [23, 20, 17]
+
+    changes = client.get(
+        "/api/shareholders/changes", params={"categories": "Retail Investors"}
+    ).json()
+    assert changes["years"] == [2020, 2021, 2022, 2023, 2024]
+    assert changes["series"]["Retail Investors"]["shares"][0] == -200000
+
+    response = client.get("/api/shareholders/history", params={"categories": "nope"})
+    assert response.status_code == 400
+
+
+def test_ranges_outside_the_data_are_empty():
+    for route in ("history", "changes"):
+        for params in (
+            {"end_year": 1990},
+            {"start_year": 2030},
+            {"start_year": 2023, "end_year": 2021},
+        ):
+            data = client.get(f"/api/shareholders/{route}", params=params).json()
+            assert data["years"] == []
+            for series in data["series"].values():
+                assert series == {"shares": [], "percentage": []}
+
+
+def test_top_holders():
+    top = client.get("/api/shareholders/top/2024", params={"n": 2}).json()
+    assert [holder["name"] for holder in top["holders"]] == [
+        "Institutional Investors",
+        "Retail Investors",
+    ]
+    assert top["percentage"] == 75
+    assert client.get("/api/shareholders/top/1990").status_code == 404
+
+
+def test_individual_holders_aggregate_by_category():
+    rng = np.random.default_rng(0)
+    data = {
+        year: [
+            {
+                "name": f"Holder {i}",
+                "category": "Institutional" if i % 4 == 0 else "Retail",
+                "shares": int(shares),
+                "percentage": float(shares) / 1e6,
+            }
+            for i, shares in enumerate(rng.integers(1, 10000, size=5000))
+        ]
+        for year in (2023, 2024)
+    }
+    store = ShareholderStore.from_records(data)
+    years, shares, _ = store.category_matrix()
+    assert years.tolist() == [2023, 2024]
+    institutional = store.category_labels.index("Institutional")
+    assert shares[institutional, 1] == sum(
+        item["shares"] for item in data[2024] if item["category"] == "Institutional"
+    )
+
+    top = store.to_records(store.top_holders(2024, 3))
+    expected = sorted(data[2024], key=lambda item: -item["shares"])[:3]
+    assert [item["shares"] for item in top] == [item["shares"] for item in expected]
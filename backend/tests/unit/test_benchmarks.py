@@ -0,0 +1,60 @@
+import asyncio
+import numpy as np
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.load import build_targets, run_load, uncovered_routes
+from benchmarks.suite import summarize
+from benchmarks.synthetic import synthetic_shareholders, synthetic_store
+from app.main import app
+
+
+def test_synthetic_store_has_requested_shape():
+    store = synthetic_store(np.random.default_rng(0), years=12, metrics=30)
+    assert len(store) == 48
+    assert int(store.years[0]) == 2013 and int(store.years[-1]) == 2024
+    assert len(store.metrics) == 30
+    assert "metric_000" in store.columns
+
+
+def test_synthetic_register_sums_to_whole_company():
+    store = synthetic_shareholders(np.random.default_rng(0), years=10, holders=500)
+    assert store.available_years == list(range(2015, 2025))
+    assert np.all(np.diff(store.years) >= 0)
+    years, _, percentage = store.category_matrix()
+    np.testing.assert_allclose(percentage.sum(axis=0), 100.0)
+    assert len(store.labels) == 500
+
+
+def test_asgi_client_round_trip():
+    async def main():
+        client = ASGIClient(app)
+        first = await client.get("/api/financial/range/2019/2020")
+        second = await client.get(
+            "/api/financial/range/2019/2020",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        streamed = await client.get(
+            "/api/financial/range/2019/2020", params={"format": "ndjson"}
+        )
+        return first, second, streamed
+
+    first, second, streamed = asyncio.run(main())
+    assert first.status_code == 200 and len(first.json()) == 8
+    assert second.status_code == 304
+    assert len(streamed.content.splitlines()) == 8
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.001, 0.002, 0.003])
+    assert summary["median_ms"] == 2.0
+    assert summary["iterations"] == 3
+
+
+def test_load_harness_covers_every_route():
+    targets = build_targets(["jkh"], [2019, 2020], [2019, 2020])
+    assert uncovered_routes(app, targets) == []
+
+    cheap = [t for t in targets if t.route.startswith("/api/financial/range")]
+    results = asyncio.run(run_load(ASGIClient(app), cheap, concurrency=4, duration=0.2))
+    assert results["total"]["requests"] > 0
+    assert results["total"]["errors"] == 0
+    assert results["total"]["p99_ms"] >= results["total"]["p50_ms"]
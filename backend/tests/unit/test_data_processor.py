@@ -0,0 +1,126 @@
+import numpy as np
+from app.services.data_processor import (
+    convert_financial_json,
+    get_financial_data,
+    get_financial_data_range,
+    get_store,
+    load_financial_store,
+)
+from app.utils.config import FINANCIAL_JSON
+
+
+def test_year_data_has_four_quarters():
+    data = get_financial_data(2019)
+    assert [item["quarter"] for item in data] == ["Q1", "Q2", "Q3", "Q4"]
+    assert data[0]["revenue"] == 200000
+
+
+def test_missing_year_returns_empty():
+    assert get_financial_data(1990) == {}
+    assert get_financial_data_range(1990, 1995) == []
+
+
+def test_range_is_contiguous_slice():
+    rows = get_store().year_slice(2021, 2022)
+    assert rows.stop - rows.start == 8
+    data = get_financial_data_range(2021, 2022)
+    assert [item["year"] for item in data] == [2021] * 4 + [2022] * 4
+
+
+def test_projected_years_grow_from_previous_year():
+    previous = get_financial_data(2020)
+    current = get_financial_data(2021)
+    for before, after in zip(previous, current):
+        assert after["quarter"] == before["quarter"]
+        assert after["revenue"] == before["revenue"] * 1.15
+
+
+def test_converted_columns_are_memory_mapped(tmp_path, monkeypatch):
+    from app.services import data_processor
+
+    manifest = convert_financial_json(FINANCIAL_JSON, tmp_path)
+    with monkeypatch.context() as patch:
+        # Derived columns are read from the files, not computed again
+        patch.setattr(data_processor, "derive_metrics", None)
+        store = load_financial_store(tmp_path, tmp_path / "missing.json")
+    assert isinstance(store.columns["revenue"], np.memmap)
+    assert isinstance(store.columns["revenue_growth"], np.memmap)
+    assert store.version == manifest["version"]
+    assert (
+        store.to_records()
+        == load_financial_store(tmp_path / "missing", FINANCIAL_JSON).to_records()
+    )
+
+
+def test_replaced_column_versions_are_deleted(tmp_path):
+    from app.utils.file_utils import read_columns, write_columns
+
+    (tmp_path / "annual").mkdir()
+    versions = [
+        write_columns(tmp_path, {"values": np.arange(n)})["version"] for n in (1, 2, 3)
+    ]
+    kept = sorted(path.name for path in tmp_path.iterdir() if path.is_dir())
+    assert kept == sorted(["annual"] + versions[1:])
+    assert read_columns(tmp_path)[1]["values"].tolist() == [0, 1, 2]
+
+
+def test_merged_financials_are_apportioned_to_quarters(tmp_path):
+    from app.services.ingestion import merge_financials
+
+    json_path = tmp_path / "financial_data.json"
+    merge_financials(
+        {2030: {"revenue": 400.0, "total_assets": 1000.0}},
+        json_path,
+        tmp_path / "financial",
+    )
+    store = load_financial_store(tmp_path / "financial", json_path)
+    assert store.column("revenue").tolist() == [100.0] * 4
+    assert store.column("total_assets").tolist() == [1000.0] * 4
+
+
+def test_lru_cache_evicts_least_recently_used():
+    from app.utils.cache import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_derived_metrics_are_materialized_for_every_advertised_metric():
+    from app.services.data_processor import (
+        DERIVED_METRICS,
+        advertised_metrics,
+        derive_metrics,
+    )
+
+    store = get_store()
+    assert set(advertised_metrics()) <= set(store.columns)
+    derived = derive_metrics(store.years, store.quarters, store.columns)
+    assert tuple(derived) == DERIVED_METRICS
+    q1_2019, q1_2020 = get_financial_data(2019)[0], get_financial_data(2020)[0]
+    assert q1_2019["gross_profit_margin"] == 40.0
+    assert q1_2019["revenue_growth"] is None
+    assert q1_2020["revenue_growth"] == 50.0
+    assert q1_2020["current_ratio"] == 571000 / 336000
+
+
+def test_calculate_derived_metrics_does_not_mutate_input():
+    from app.services.data_processor import calculate_derived_metrics
+
+    data = {"revenue": 200.0, "cost_of_sales": 150.0, "net_profit": 20.0}
+    result = calculate_derived_metrics(data)
+    assert result["gross_profit_margin"] == 25.0
+    assert result["net_profit_margin"] == 10.0
+    assert "gross_profit_margin" not in data
+    assert "revenue_growth" not in result
+
+
+def test_year_chunks_hold_whole_years():
+    store = get_store()
+    rows = store.year_slice(2019, 2024)
+    chunks = list(store.year_chunks(rows, 6))
+    assert [chunk.stop - chunk.start for chunk in chunks] == [8, 8, 8]
+    assert chunks[0].start == rows.start and chunks[-1].stop == rows.stop
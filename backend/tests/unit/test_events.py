@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import numpy as np
+from app.api import events as events_api
+from app.services.events import BROADCASTER, Broadcaster
+from app.services.financial_store import FinancialStore, diff_stores
+
+
+async def _frames(stream, count):
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(count)]
+
+
+def test_events_fan_out_and_replay_after_reconnect():
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=4, history_size=8, name="test")
+        first, second = broadcaster.stream(), broadcaster.stream()
+        pending = [asyncio.ensure_future(_frames(s, 2)) for s in (first, second)]
+        await asyncio.sleep(0.01)
+        assert broadcaster.subscribers == 2
+
+        # Published from another thread, as reload listeners may be
+        publisher = threading.Thread(
+            target=lambda: [broadcaster.publish("financial", {"n": n}) for n in (1, 2)]
+        )
+        publisher.start()
+        publisher.join()
+        received = await asyncio.gather(*pending)
+        assert received[0] == received[1]
+        assert received[0][0].startswith(b"id: 1\nevent: financial\ndata: ")
+        await first.aclose()
+        await second.aclose()
+        assert broadcaster.subscribers == 0
+
+        broadcaster.publish("models", {"n": 3})
+        replayed = await _frames(broadcaster.stream(last_event_id=1), 2)
+        assert [frame.split(b"\n")[0] for frame in replayed] == [b"id: 2", b"id: 3"]
+
+        # A session that fell too far behind is told to refetch instead
+        lagging = broadcaster.stream()
+        waiting = asyncio.ensure_future(_frames(lagging, 1))
+        await asyncio.sleep(0.01)
+        for n in range(10):
+            broadcaster.publish("financial", {"n": n})
+        await asyncio.sleep(0.01)
+        assert b"event: resync" in (await waiting)[0]
+        assert broadcaster.stats()["resyncs"] >= 1
+        await lagging.aclose()
+
+        # Ids from before a restart cannot be replayed
+        stale = await _frames(broadcaster.stream(last_event_id=99), 1)
+        assert b"event: resync" in stale[0]
+
+    asyncio.run(scenario())
+
+
+def test_change_during_the_versions_snapshot_is_sent(monkeypatch):
+    def current_versions():
+        # A change lands while the session's snapshot is being taken
+        BROADCASTER.publish("shareholders", {"version": "new"})
+        return {"shareholders": "old"}
+
+    monkeypatch.setattr(events_api, "current_versions", current_versions)
+
+    async def scenario():
+        session = events_api._session(None)
+        frames = await _frames(session, 2)
+        await session.aclose()
+        return frames
+
+    versions, change = asyncio.run(scenario())
+    assert b"event: versions" in versions
+    assert b"event: shareholders" in change and b'"new"' in change
+
+
+def test_store_diff_lists_changed_periods_and_metrics():
+    old = FinancialStore(
+        np.array([2020, 2020], dtype=np.int16),
+        np.array([1, 2], dtype=np.int8),
+        {"revenue": np.array([1.0, np.nan]), "eps": np.array([1.0, 2.0])},
+    )
+    new = FinancialStore(
+        np.array([2020, 2020, 2020], dtype=np.int16),
+        np.array([1, 2, 3], dtype=np.int8),
+        {"revenue": np.array([1.0, np.nan, 3.0]), "dps": np.array([0.5] * 3)},
+    )
+    assert diff_stores(old, new) == {
+        "added": [{"year": 2020, "quarter": "Q3"}],
+        "removed": [],
+        "changed": [],
+        "added_metrics": ["dps"],
+        "removed_metrics": ["eps"],
+    }
+    new.columns["revenue"][1] = 2.0
+    assert diff_stores(old, new)["changed"] == [{"year": 2020, "quarter": "Q2"}]
@@ -0,0 +1,9 @@
+import json
+from app.utils.http_cache import serialize
+
+
+def test_serialize_writes_compact_valid_json():
+    payload = {2020: [None, True, float("nan"), float("-inf"), 2.5, "é"]}
+    body = serialize(payload)
+    assert body == '{"2020":[null,true,null,null,2.5,"é"]}'.encode("utf-8")
+    assert json.loads(body) == {"2020": [None, True, None, None, 2.5, "é"]}
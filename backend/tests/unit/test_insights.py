@@ -0,0 +1,51 @@
+import numpy as np
+from app.services.insights import TRENDS, compute_statistics, render_insight
+
+YEARS = np.arange(2018, 2024)
+
+
+def test_statistics_of_many_series_at_once():
+    values = np.array(
+        [
+            [100, 110, 121, 133.1, 146.41, 161.051],
+            [np.nan, 100, np.nan, 80, 60, np.nan],
+            [5, 5, 5, 5, 5, 5],
+            [np.nan] * 5 + [1.0],
+        ]
+    )
+    stats = compute_statistics(YEARS, values)
+
+    assert stats["count"].tolist() == [6, 3, 6, 1]
+    assert [TRENDS[code] for code in stats["trend"]] == [
+        "consistently increasing",
+        "consistently decreasing",
+        "stable",
+        "insufficient data",
+    ]
+    np.testing.assert_allclose(stats["cagr"][0], 10.0)
+    np.testing.assert_allclose(stats["volatility"][0], 0.0, atol=1e-9)
+
+    # Gaps are skipped: the last two observations are 2021 and 2022
+    assert stats["latest"][1] == 60 and stats["previous"][1] == 80
+    np.testing.assert_allclose(stats["percent_change"][1], -25.0)
+    np.testing.assert_allclose(stats["cagr"][1], ((60 / 100) ** (1 / 3) - 1) * 100)
+    np.testing.assert_allclose(stats["mean"][1], 80.0)
+    assert np.isnan(stats["previous"][3]) and np.isnan(stats["cagr"][3])
+
+
+def test_render_insight_skips_undefined_sentences():
+    stats = {
+        "count": 3,
+        "mean": 10.0,
+        "std": 1.0,
+        "latest": 5.0,
+        "previous": -5.0,
+        "percent_change": -200.0,
+        "cagr": None,
+        "volatility": None,
+        "trend": "generally increasing",
+    }
+    insight = render_insight("revenue", stats)
+    assert insight.startswith("Revenue has shown a generally increasing trend")
+    assert "CAGR" not in insight
+    assert insight.endswith("This indicates challenging market conditions.")
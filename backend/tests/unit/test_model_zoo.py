@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from app.services.backtesting import backtest, backtest_universe, select_best
+from app.services.model_zoo import (
+    AGGREGATIONS,
+    MODELS,
+    SeriesPanel,
+    stack_states,
+    state_column,
+)
+
+YEARS = np.arange(2012, 2024)
+
+
+def _panel() -> SeriesPanel:
+    """A linear trend and a seasonal quarterly series with a growing level."""
+    t = np.arange(len(YEARS) * 4, dtype=np.float64)
+    trend = 100 + 2.5 * t
+    seasonal = 50 + t + np.tile([10.0, -5.0, -15.0, 10.0], len(YEARS))
+    quarterly = np.stack([trend, seasonal], axis=-1).reshape(len(YEARS), 4, 2)
+    return SeriesPanel(
+        YEARS,
+        quarterly.sum(axis=1),
+        quarterly,
+        np.array([AGGREGATIONS.index("sum")] * 2),
+    )
+
+
+def test_every_model_extrapolates_a_linear_trend():
+    panel = _panel()
+    expected = np.array(
+        [[100 + 2.5 * q for q in range(44 + 4 * h, 48 + 4 * h)] for h in (1, 2)]
+    ).sum(axis=1)
+    for model in MODELS.values():
+        predicted = model.predict(model.fit(panel.select([0])), [1, 2])
+        assert predicted.shape == (2, 1)
+        # The ridge penalty shrinks the lag coefficients, and so the trend
+        rtol = 0.05 if model.name == "ridge" else 0.01
+        np.testing.assert_allclose(
+            predicted[:, 0], expected, rtol=rtol, err_msg=model.name
+        )
+
+
+def test_states_round_trip_through_registry_entries():
+    panel = _panel()
+    for model in MODELS.values():
+        state = model.fit(panel)
+        stacked = stack_states([state_column(state, j) for j in range(2)])
+        np.testing.assert_allclose(
+            model.predict(stacked, [1, 3]), model.predict(state, [1, 3])
+        )
+
+
+def test_short_histories_predict_nan():
+    panel = _panel().head(2)
+    assert np.isnan(MODELS["ar"].predict(MODELS["ar"].fit(panel), [1])).all()
+    assert np.isnan(MODELS["ridge"].predict(MODELS["ridge"].fit(panel), [1])).all()
+
+
+def test_backtest_picks_the_best_model_per_series():
+    panel = _panel()
+    scores = backtest(panel, list(MODELS), folds=3, horizon=2)
+
+    assert set(scores) == set(MODELS)
+    assert scores["linear"]["rmse"].shape == (2,)
+    np.testing.assert_allclose(scores["linear"]["rmse"], 0.0, atol=1e-6)
+    assert (scores["ridge"]["rmse"] > 1).all()
+    assert select_best({name: scores[name] for name in ("ridge", "linear")}) == [
+        "linear",
+        "linear",
+    ]
+    assert select_best({"a": {"rmse": np.array([np.nan])}}) == [None]
+
+
+def test_backtest_universe_matches_single_company():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sharded = backtest_universe(
+            metrics=["revenue", "eps", "net_profit"], executor=pool, workers=4
+        )
+        whole = backtest_universe(
+            metrics=["revenue", "eps", "net_profit"], executor=pool, workers=1
+        )
+    assert sharded == whole
+    company = next(iter(whole))
+    assert set(whole[company]) == {"revenue", "eps", "net_profit"}
+    assert whole[company]["revenue"]["best"] in MODELS
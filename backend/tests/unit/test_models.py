@@ -0,0 +1,77 @@
+import pytest
+from app.models.financial import parse_financial_data, store_from_records
+from app.models.shareholder import parse_shareholder_data, store_from_holdings
+from app.services.data_processor import SAMPLE_DATA, convert_financial_json
+from app.services.financial_store import FinancialStore
+from app.services.shareholder_processor import SAMPLE_SHAREHOLDERS
+from app.services.shareholder_store import ShareholderStore
+from app.utils.file_utils import write_json
+
+
+def test_financial_records_build_the_same_store():
+    records = parse_financial_data(SAMPLE_DATA)
+    assert [(r.year, r.label) for r in records[:2]] == [(2019, "Q1"), (2019, "Q2")]
+    store = store_from_records(records)
+    assert store.version == FinancialStore.from_records(SAMPLE_DATA).version
+
+
+def test_invalid_financial_data_lists_every_problem():
+    data = {
+        "2020": [
+            {"quarter": "Q1", "revenue": "12,000"},
+            {"quarter": "Q1", "revenue": 1.0},
+            {"quarter": "Q5", "revenue": 1.0},
+            {"quarter": "Q2", "revenue": True, "net_profit": None},
+        ],
+        "20x1": [],
+    }
+    with pytest.raises(ValueError) as error:
+        parse_financial_data(data)
+    message = str(error.value)
+    for problem in (
+        "revenue is not a number: '12,000'",
+        "2020 Q1: listed twice",
+        "'Q5' is not a quarter",
+        "revenue is not a number: True",
+        "'20x1' is not a year",
+    ):
+        assert problem in message
+
+
+def test_invalid_file_is_rejected_before_columns_are_written(tmp_path):
+    json_path = tmp_path / "financial_data.json"
+    write_json(json_path, {"2020": [{"quarter": "Q1", "revenue": "n/a"}]})
+    with pytest.raises(ValueError, match="revenue is not a number"):
+        convert_financial_json(json_path, tmp_path / "columns")
+    assert not (tmp_path / "columns").exists()
+
+
+def test_holdings_build_the_same_store():
+    data = dict(SAMPLE_SHAREHOLDERS)
+    data[2024] = [
+        {"name": "Fund A", "category": "Funds", "percentage": 60, "shares": 6},
+        {"name": "Fund B", "category": "Funds", "percentage": 40, "shares": 4},
+    ]
+    holdings = parse_shareholder_data(data)
+    store = store_from_holdings(holdings)
+    assert store.version == ShareholderStore.from_records(data).version
+    assert store.category_labels[-1] == "Funds"
+
+
+def test_invalid_holdings_are_rejected():
+    data = {
+        2020: [
+            {"name": "A", "percentage": 120, "shares": 10},
+            {"name": "B", "percentage": 10, "shares": -1},
+            {"name": "C", "percentage": 10, "shares": 10},
+            {"name": "C", "percentage": 10, "shares": 10},
+            {"percentage": 10, "shares": 10},
+        ]
+    }
+    with pytest.raises(ValueError) as error:
+        parse_shareholder_data(data)
+    message = str(error.value)
+    assert "A: percentage must be from 0 to 100" in message
+    assert "B: shares must be a whole number >= 0" in message
+    assert "C: listed twice" in message
+    assert "holding without a name" in message
@@ -0,0 +1,143 @@
+from app.services.extraction_cache import ExtractionCache, file_digest
+from app.services.pdf_parser import (
+    classify_page,
+    extract_jk_financials,
+    parse_number,
+    process_tables,
+)
+
+INCOME_ROWS = [
+    ["For the year ended 31 March", "Note", "2022", "2021", "2022", "2021"],
+    ["In Rs.'000s", "", "", "", "", ""],
+    ["Total revenue", "14", "218,074", "127,675", "1,875", "1,637"],
+    ["Cost of sales", "", "(180,430)", "(108,747)", "(1,085)", "(957)"],
+    ["Administrative expenses", "", "(14,762)", "(12,927)", "(1,283)", "(1,050)"],
+    ["Other operating expenses", "16.2", "(12,456)", "(1,314)", "(514)", "(21)"],
+    ["Profit for the year", "", "20,442", "3,950", "24,381", "10,565"],
+]
+
+POSITION_ROWS = [
+    ["As at 31 March", "Note", "2022", "2021", "2022", "2021"],
+    ["Current assets", "", "", "", "", ""],
+    ["Inventories", "30", "36,224", "54,296", "-", "-"],
+    ["", "", "238,929", "166,491", "112,915", "53,647"],
+    ["Non-current liabilities", "", "", "", "", ""],
+    ["", "", "258,095", "222,101", "67,773", "44,410"],
+    ["Current liabilities", "", "", "", "", ""],
+    ["", "", "129,608", "71,705", "8,970", "4,140"],
+]
+
+
+def test_classify_page_uses_opening_heading():
+    assert classify_page("Income Statement\nGROUP COMPANY") == "income_statement"
+    assert classify_page("Statement of Cash Flows\n") == "cash_flow"
+    assert classify_page("Contents\nIncome Statement 206") is None
+
+
+def test_parse_number():
+    assert parse_number("1,234") == 1234.0
+    assert parse_number("(1,234.5)") == -1234.5
+    assert parse_number("-") == 0.0
+    assert parse_number("16.2") == 16.2
+    assert parse_number("Note") is None
+
+
+def test_process_tables_uses_group_columns():
+    result = process_tables(
+        [
+            {"statement": "income_statement", "rows": INCOME_ROWS},
+            {"statement": "financial_position", "rows": POSITION_ROWS},
+        ]
+    )
+    assert sorted(result) == [2021, 2022]
+    assert result[2022]["revenue"] == 218074000.0
+    assert result[2022]["cost_of_sales"] == 180430000.0
+    assert result[2022]["operating_expenses"] == (14762 + 12456) * 1000.0
+    assert result[2021]["net_profit"] == 3950000.0
+    assert result[2022]["current_assets"] == 238929.0
+    assert result[2022]["total_liabilities"] == 258095.0 + 129608.0
+
+
+def test_unchanged_report_is_served_from_cache(tmp_path):
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"not parsed when cached")
+    cache = ExtractionCache(tmp_path / "cache")
+    cache.put_file(file_digest(report), [], {2022: {"revenue": 1.0}})
+
+    assert extract_jk_financials(report, cache=cache) == {2022: {"revenue": 1.0}}
+
+
+def _stub_pages(monkeypatch, digests, statements):
+    """Stub the PDF readers; return the pages each one was asked for."""
+    from app.services import pdf_parser
+
+    calls = {"scan": [], "extract": []}
+
+    def scan_pages(pdf_path, pages):
+        calls["scan"].extend(pages)
+        return {page: statements[page] for page in pages if page in statements}
+
+    def extract_page_tables(pdf_path, page):
+        calls["extract"].append(page)
+        return [INCOME_ROWS]
+
+    monkeypatch.setattr(pdf_parser, "page_digests", lambda pdf_path: list(digests))
+    monkeypatch.setattr(pdf_parser, "scan_pages", scan_pages)
+    monkeypatch.setattr(pdf_parser, "extract_page_tables", extract_page_tables)
+    return calls
+
+
+def test_only_changed_pages_are_extracted_again(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    report = tmp_path / "report.pdf"
+    cache = ExtractionCache(tmp_path / "cache")
+    statements = {2: "income_statement", 3: "income_statement"}
+
+    with ThreadPoolExecutor(1) as executor:
+        report.write_bytes(b"first edition")
+        calls = _stub_pages(monkeypatch, ["a", "b", "c"], statements)
+        first = extract_jk_financials(report, executor=executor, cache=cache)
+        assert calls == {"scan": [1, 2, 3], "extract": [2, 3]}
+
+        # A revised edition changes page 3 only
+        report.write_bytes(b"revised edition")
+        calls = _stub_pages(monkeypatch, ["a", "b", "c2"], statements)
+        second = extract_jk_financials(report, executor=executor, cache=cache)
+        assert calls == {"scan": [3], "extract": [3]}
+
+    assert first == second
+    assert second[2022]["revenue"] == 218074000.0
+
+
+def test_unchanged_reports_are_not_ingested_again(tmp_path, monkeypatch):
+    from app.services import ingestion
+
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    (raw_dir / "2022.pdf").write_bytes(b"annual report")
+    json_path = tmp_path / "processed" / "financial_data.json"
+    columns_dir = tmp_path / "processed" / "financial"
+    extracted = []
+
+    def extract(path, **kwargs):
+        extracted.append(path.name)
+        return {2022: {"revenue": 400.0}}
+
+    monkeypatch.setattr(ingestion, "extract_jk_financials", extract)
+    monkeypatch.setattr(
+        ingestion, "company_paths", lambda company: (columns_dir, json_path)
+    )
+    monkeypatch.setattr(ingestion, "reload_financial_data", lambda company: None)
+    cache = ExtractionCache(tmp_path / "cache")
+
+    assert list(ingestion.ingest_directory(raw_dir, workers=1, cache=cache)) == [
+        "2022.pdf"
+    ]
+    stored = json_path.read_bytes()
+    manifest = (columns_dir / "manifest.json").read_bytes()
+
+    assert ingestion.ingest_directory(raw_dir, workers=1, cache=cache) == {}
+    assert extracted == ["2022.pdf"]
+    assert json_path.read_bytes() == stored
+    assert (columns_dir / "manifest.json").read_bytes() == manifest
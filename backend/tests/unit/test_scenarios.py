@@ -0,0 +1,64 @@
+import numpy as np
+from app.services.scenarios import (
+    MODES,
+    estimate_dynamics,
+    fan_bands,
+    run_scenario,
+    simulate_paths,
+    standard_draws,
+)
+
+NAMES = ["revenue", "net_profit_margin", "free_cash_flow"]
+HISTORY = np.array(
+    [
+        [100.0, 10.0, -5.0],
+        [110.0, 11.0, 5.0],
+        [121.0, 12.0, np.nan],
+        [133.1, 12.5, 15.0],
+    ]
+)
+
+
+def test_dynamics_depend_on_the_kind_of_series():
+    dynamics = estimate_dynamics(NAMES, HISTORY)
+
+    assert [MODES[code] for code in dynamics["mode"]] == ["growth", "margin", "level"]
+    np.testing.assert_allclose(dynamics["last"], [133.1, 12.5, 15.0])
+    np.testing.assert_allclose(dynamics["drift"][0], np.log(1.1))
+    assert dynamics["drift"][1] == 0
+    # Revenue grew by exactly 10% a year; the volatility floor keeps its bands open
+    assert (dynamics["volatility"] > 0).all()
+
+
+def test_shocks_move_the_simulated_paths():
+    dynamics = estimate_dynamics(NAMES, HISTORY)
+    draws = standard_draws(NAMES, 2000, 3)
+    assert draws.shape == (3, 3, 2000)
+    np.testing.assert_array_equal(draws[0], standard_draws(NAMES[:1], 2000, 3)[0])
+
+    base = fan_bands(simulate_paths(dynamics, draws))
+    shocked = fan_bands(simulate_paths(dynamics, draws, 10.0, 2.0))
+    np.testing.assert_allclose(
+        shocked["p50"][0] / base["p50"][0], 1.1 ** np.arange(1, 4)
+    )
+    np.testing.assert_allclose(shocked["p50"][1] - base["p50"][1], 2.0)
+    assert (base["p5"] < base["p50"]).all() and (base["p50"] < base["p95"]).all()
+
+    calm = fan_bands(simulate_paths(dynamics, draws, volatility=0.0))
+    np.testing.assert_allclose(calm["p5"], calm["p95"])
+    np.testing.assert_allclose(calm["p50"][0], 133.1 * 1.1 ** np.arange(1, 4))
+
+
+def test_scenarios_are_reproducible_and_consistent_with_revenue():
+    metrics = ["revenue", "net_profit", "net_profit_margin"]
+    first = run_scenario(metrics, years=3, paths=500, volatility=0.0)
+    assert first == run_scenario(metrics, years=3, paths=500, volatility=0.0)
+
+    bands = {m: first["metrics"][m]["bands"][0] for m in metrics}
+    assert first["metrics"]["net_profit"]["assumptions"]["mode"] == "share_of_revenue"
+    np.testing.assert_allclose(
+        bands["net_profit"]["p50"],
+        bands["revenue"]["p50"] * bands["net_profit_margin"]["p50"] / 100,
+        rtol=1e-3,
+    )
+    assert set(bands["revenue"]) == {"year", "p5", "p50", "p95", "mean"}
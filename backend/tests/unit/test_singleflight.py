@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    started = []
+
+    async def compute():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("k", compute) for _ in range(10)))
+        later = await flights.do("k", compute)
+        return results, later
+
+    results, later = asyncio.run(main())
+    assert len(started) == 2
+    assert all(result is results[0] for result in results)
+    assert later == {"value": 42}
+    assert flights.stats()["shared"] == 9
+    assert len(flights) == 0
+
+
+def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(flights.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert [str(error) for error in errors] == ["boom"] * 3
+    with pytest.raises(ValueError):
+        asyncio.run(flights.do("k", fail))
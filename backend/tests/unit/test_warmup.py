@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from app.services.executor import BoundedExecutor
+from app.services.warmup import warm_pool, warm_up
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def test_app_import_defers_pdf_libraries():
+    code = "import sys, app.main; print(sorted({'camelot', 'pdfplumber'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_warm_up_runs_requested_steps():
+    timings = warm_up(["data"])
+    assert list(timings) == ["data"]
+    assert timings["data"] >= 0
+
+    with pytest.raises(ValueError, match="nope"):
+        warm_up(["data", "nope"])
+
+
+def test_warm_pool_warms_every_process():
+    executor = BoundedExecutor(3, 3, name="warmup-test")
+    try:
+        pids = warm_pool(executor)
+        assert len(set(pids)) == 3
+        assert set(pids) == set(executor.pool._processes)
+    finally:
+        executor.shutdown()
@@ -53,3 +53,18 @@ export const fetchShareholdersData = async (year) => {
     throw error;
   }
 };
+
+// Live data-version changes, pushed by the server as they happen. Calls
+// onEvent(type, data) for each event and returns a function that closes the
+// connection; the browser reconnects by itself if it drops.
+export const subscribeToUpdates = (onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/events/`);
+  ["versions", "financial", "shareholders", "models", "resync"].forEach(
+    (type) => {
+      source.addEventListener(type, (event) =>
+        onEvent(type, JSON.parse(event.data))
+      );
+    }
+  );
+  return () => source.close();
+};